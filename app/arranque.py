@@ -0,0 +1,157 @@
+"""
+Arranque de la aplicación (lifespan de FastAPI).
+
+Al importar la aplicación no se toca la base de datos. Al iniciar cada
+worker, antes de aceptar peticiones:
+
+1. Se verifica la versión del esquema con una sola consulta. Las migraciones
+   se aplican una vez con `python -m app.migraciones`; con
+   `DB_AUTO_MIGRAR=true` el arranque las aplica si faltan.
+2. Se abren `DB_POOL_PRECALENTAR` conexiones del pool de escritura y otras
+   tantas del de lectura.
+3. Se carga el índice en memoria de asignaciones (`app.grafo`) que responde
+   los endpoints de colaboradores y proyectos relacionados.
+4. Se ejecutan peticiones internas de calentamiento contra los endpoints de
+   lectura, para que la compilación de consultas de SQLAlchemy, la
+   construcción de validadores y serializadores y la importación perezosa de
+   módulos ocurran antes de la primera petición real.
+
+Se registra en el log (`app.arranque`) y en `/metrics` cuánto tardó el
+arranque y, luego, cuánto tardó en enviarse la primera respuesta real.
+
+Mientras la aplicación está en marcha, una tarea de fondo aplica la
+retención y la compactación del registro de cambios cada
+`CAMBIOS_MANTENIMIENTO_SEGUNDOS` (ver `app.cambios`) y, con
+`DB_ESCRITOR_AGRUPADO=true`, el hilo del escritor agrupado confirma las
+escrituras encoladas (ver `app.escritor`); al terminar se aplican las que
+queden en la cola antes de cerrar los pools.
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import anyio
+
+from app.cambios import mantener_periodicamente
+from app.config import settings
+from app.database import engine, engine_lectura, precalentar_pool
+from app.escritor import escritor
+from app.grafo import indice_asignaciones
+from app.metricas import metricas
+from app.migraciones import verificar_esquema
+
+logger = logging.getLogger("app.arranque")
+
+# Endpoints de lectura que se ejercitan al iniciar; los ids 0 no existen y
+# recorren el camino de 404 sin llenar la caché de respuestas.
+RUTAS_CALENTAMIENTO = (
+    "/empleado/?limit=1",
+    "/proyecto/?limit=1",
+    "/empleado/buscar?q=a&limit=1",
+    "/proyecto/buscar?q=a&limit=1",
+    "/proyecto/stats",
+    "/proyecto/costos?limit=1",
+    "/cambios?limit=1",
+    "/empleado/0/colaboradores",
+    "/empleado/0",
+    "/proyecto/0",
+)
+
+
+async def _peticion_interna(app, ruta: str) -> int:
+    """
+    Ejecuta un GET contra la aplicación ASGI sin pasar por la red.
+
+    Returns:
+        int: Código de estado de la respuesta
+    """
+    path, _, query = ruta.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"calentamiento")],
+        "client": ("127.0.0.1", 0),
+        "server": ("calentamiento", 80),
+    }
+    estado = 500
+
+    async def recibir():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def enviar(mensaje):
+        nonlocal estado
+        if mensaje["type"] == "http.response.start":
+            estado = mensaje["status"]
+
+    await app(scope, recibir, enviar)
+    return estado
+
+
+async def calentar_rutas(app) -> dict[str, int]:
+    """
+    Ejecuta las peticiones de `RUTAS_CALENTAMIENTO`.
+
+    Un error en una de ellas se registra pero no impide el arranque.
+
+    Args:
+        app: Aplicación FastAPI
+
+    Returns:
+        dict[str, int]: Código de estado por ruta
+    """
+    estados = {}
+    for ruta in RUTAS_CALENTAMIENTO:
+        try:
+            estados[ruta] = await _peticion_interna(app, ruta)
+        except Exception:
+            logger.exception("Error en la petición de calentamiento %s", ruta)
+            estados[ruta] = 500
+    return estados
+
+
+def _cargar_indice():
+    with engine_lectura.connect() as conexion:
+        indice_asignaciones.cargar(conexion)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Verifica el esquema, precalienta los pools, carga el índice de
+    asignaciones y calienta las rutas; inicia el mantenimiento del registro de
+    cambios y el escritor agrupado, y al terminar los detiene y cierra los pools.
+
+    Raises:
+        RuntimeError: Si el esquema está desactualizado y DB_AUTO_MIGRAR no está activo
+    """
+    inicio = time.perf_counter()
+    version = await anyio.to_thread.run_sync(verificar_esquema, engine, settings.auto_migrar)
+    conexiones = await anyio.to_thread.run_sync(precalentar_pool, settings.pool_precalentar, engine)
+    if engine_lectura is not engine:
+        conexiones += await anyio.to_thread.run_sync(precalentar_pool, settings.pool_precalentar, engine_lectura)
+    await anyio.to_thread.run_sync(_cargar_indice)
+    estados = await calentar_rutas(app) if settings.calentar_rutas else {}
+    # Las peticiones de calentamiento no cuentan en las métricas
+    metricas.reiniciar()
+    duracion = time.perf_counter() - inicio
+    metricas.marcar_arranque(inicio, duracion)
+    logger.info("Aplicación lista en %.1f ms (esquema v%s, %s conexión(es) precalentada(s), %s ruta(s) calentada(s))",
+                duracion * 1000, version, conexiones, len(estados))
+    if settings.escritor_agrupado:
+        escritor.iniciar()
+    async with anyio.create_task_group() as tareas:
+        if settings.cambios_mantenimiento_segundos > 0:
+            tareas.start_soon(mantener_periodicamente, engine, settings.cambios_mantenimiento_segundos)
+        yield
+        tareas.cancel_scope.cancel()
+    await anyio.to_thread.run_sync(escritor.detener)
+    engine.dispose()
+    engine_lectura.dispose()
@@ -0,0 +1,188 @@
+"""
+Búsqueda de texto completo sobre empleados y proyectos (SQLite FTS5).
+
+Filtrar con `LIKE '%texto%'` obliga a recorrer toda la tabla. En su lugar se
+mantiene un índice invertido FTS5 por entidad:
+
+- `empleado_fts`: `nombre` y `especialidad` de `empleado`
+- `proyecto_fts`: `nombre` y `descripcion` de `proyecto`
+
+Son tablas de contenido externo (no duplican el texto, lo leen de la tabla
+base) y se mantienen sincronizadas con triggers AFTER INSERT/UPDATE/DELETE,
+de modo que cualquier escritura (endpoints individuales, carga masiva o SQL
+directo) actualiza el índice en la misma transacción.
+
+El tokenizador `unicode61 remove_diacritics 2` ignora mayúsculas y acentos
+("José" coincide con "jose"). También pliega la ñ a n: "pena" encuentra
+"Peña", ya que unicode61 no permite conservar solo esa letra. Cada palabra
+de la búsqueda se trata como prefijo ("desa" encuentra "Desarrollador") y los
+resultados se ordenan por relevancia (bm25), con el nombre pesando el doble
+que el otro campo.
+
+Uso:
+    python -m app.busqueda  # reconstruye y optimiza los índices
+"""
+
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import and_, column, func, literal_column, or_, select, table, text
+
+from app.models import Empleado, Proyecto
+from app.paginacion import codificar_cursor_rango, decodificar_cursor_rango
+from app.serializacion import columnas
+
+# entidad -> (tabla base, columnas indexadas)
+INDICES = {
+    Empleado: ("empleado", ("nombre", "especialidad")),
+    Proyecto: ("proyecto", ("nombre", "descripcion")),
+}
+
+# Peso de cada columna en bm25, en el orden de INDICES
+PESOS = (2.0, 1.0)
+
+_PALABRA = re.compile(r"\w+")
+
+
+def _es_sqlite(conexion) -> bool:
+    return conexion.dialect.name == "sqlite"
+
+
+def crear_indices(conexion):
+    """
+    Crea las tablas FTS5 y sus triggers, y las llena desde las tablas base.
+
+    En bases de datos que no son SQLite no hace nada (la búsqueda responde 501).
+
+    Args:
+        conexion: Conexión de SQLAlchemy (dentro de una transacción)
+    """
+    if not _es_sqlite(conexion):
+        return
+    for tabla, campos in INDICES.values():
+        fts = f"{tabla}_fts"
+        lista = ", ".join(campos)
+        nuevos = ", ".join(f"new.{campo}" for campo in campos)
+        viejos = ", ".join(f"old.{campo}" for campo in campos)
+        conexion.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({lista}, content='{tabla}', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+        conexion.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+            f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+        ))
+        conexion.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END"
+        ))
+        conexion.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+            f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+        ))
+    reconstruir(conexion)
+
+
+def reconstruir(conexion, optimizar: bool = False):
+    """
+    Regenera los índices FTS5 desde las tablas base.
+
+    Args:
+        conexion: Conexión de SQLAlchemy (dentro de una transacción)
+        optimizar: Si además se fusionan los segmentos del índice
+    """
+    if not _es_sqlite(conexion):
+        return
+    for tabla, _ in INDICES.values():
+        fts = f"{tabla}_fts"
+        conexion.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        if optimizar:
+            conexion.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('optimize')"))
+
+
+def consulta_fts(q: str) -> str:
+    """
+    Convierte el texto de búsqueda en una consulta FTS5 de prefijos.
+
+    Cada palabra se entrecomilla (así los operadores de FTS5 en el texto del
+    usuario no tienen efecto) y se marca como prefijo; todas deben aparecer.
+
+    Args:
+        q: Texto ingresado por el usuario
+
+    Returns:
+        str: Consulta MATCH, p. ej. '"ana"* "desa"*'
+
+    Raises:
+        HTTPException 400: Si el texto no contiene ninguna palabra
+    """
+    palabras = _PALABRA.findall(q)
+    if not palabras:
+        raise HTTPException(status_code=400, detail="La búsqueda debe contener al menos una palabra")
+    return " ".join(f'"{palabra}"*' for palabra in palabras)
+
+
+def buscar(session, entidad, q: str, cursor: str | None, limite: int, filtros=()):
+    """
+    Busca en el índice FTS5 de una entidad, con resultados ordenados por relevancia.
+
+    La paginación es por cursor sobre (relevancia, id): cada página continúa
+    después del último resultado de la anterior, sin OFFSET. Si el contenido
+    cambia entre páginas, la relevancia de los resultados puede cambiar.
+
+    Args:
+        session: Sesión de base de datos
+        entidad: Empleado o Proyecto
+        q: Texto de búsqueda
+        cursor: Cursor de la página anterior (o None para la primera)
+        limite: Cantidad máxima de resultados por página
+        filtros: Condiciones adicionales sobre la entidad (p. ej. por estado)
+
+    Returns:
+        tuple: (filas de la página con las columnas de la entidad, cursor siguiente o None)
+
+    Raises:
+        HTTPException 400: Si la búsqueda o el cursor no son válidos
+        HTTPException 501: Si la base de datos no es SQLite
+    """
+    if not _es_sqlite(session.get_bind()):
+        raise HTTPException(status_code=501, detail="La búsqueda de texto requiere SQLite (FTS5)")
+    tabla, _ = INDICES[entidad]
+    fts = f"{tabla}_fts"
+    indice = table(fts, column("rowid"))
+    coincidencias = (
+        select(indice.c.rowid.label("id"), func.bm25(literal_column(fts), *PESOS).label("rango"))
+        .where(literal_column(fts).op("MATCH")(consulta_fts(q)))
+        .subquery()
+    )
+    rango = coincidencias.c.rango
+    query = (
+        select(*columnas(entidad), rango)
+        .join(coincidencias, coincidencias.c.id == entidad.id)
+        .where(*filtros)
+    )
+    if cursor:
+        rango_anterior, ultimo_id = decodificar_cursor_rango(cursor)
+        query = query.where(or_(rango > rango_anterior, and_(rango == rango_anterior, entidad.id > ultimo_id)))
+    filas = session.execute(query.order_by(rango, entidad.id).limit(limite + 1)).all()
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor_rango(filas[-1].rango, filas[-1].id)
+    return filas, siguiente
+
+
+def main():
+    from app.database import engine
+
+    with engine.begin() as conexion:
+        if not _es_sqlite(conexion):
+            print("La búsqueda de texto solo está disponible en SQLite")
+            return
+        reconstruir(conexion, optimizar=True)
+    print("Índices de búsqueda reconstruidos")
+
+
+if __name__ == "__main__":
+    main()
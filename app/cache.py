@@ -0,0 +1,265 @@
+"""
+Caché de respuestas serializadas para los endpoints de detalle.
+
+Los endpoints de lectura más usados (`GET /empleado/{id}`, `GET /proyecto/{id}`
+y sus sub-recursos) guardan el JSON ya serializado, con clave por id de la
+entidad. Los endpoints de escritura invalidan exactamente las claves afectadas,
+incluyendo el otro lado de la relación many-to-many.
+
+Junto a cada respuesta se guarda su ETag (ver `app.etag`), de modo que un
+GET condicional con la respuesta en caché se resuelve sin consultar la base
+de datos.
+
+El backend por defecto es un LRU con TTL en memoria del proceso; cualquier
+clase que implemente `CacheBackend` (p. ej. sobre Redis) puede reemplazarlo
+con `configurar_backend`. Con varios workers cada uno tiene su propia caché en
+memoria: la invalidación es local y el TTL acota cuánto puede durar una
+respuesta desactualizada en los demás.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from fastapi import Response
+from sqlmodel import select
+
+from app.config import settings
+from app.etag import etag_coincide, respuesta_no_modificada
+from app.models import EmpleadoProyecto, Proyecto
+
+# Valor cacheado: (ETag o None, cuerpo JSON serializado)
+Entrada = tuple[str | None, bytes]
+
+
+class CacheBackend(ABC):
+    """Interfaz de un backend de caché de respuestas serializadas."""
+
+    @abstractmethod
+    def get(self, clave: str) -> Entrada | None:
+        """Devuelve el valor cacheado o None si no existe o expiró."""
+
+    @abstractmethod
+    def generacion(self, clave: str) -> tuple:
+        """Devuelve la generación actual de la clave (cambia al invalidarla)."""
+
+    @abstractmethod
+    def set(self, clave: str, valor: Entrada, generacion: tuple):
+        """Guarda el valor solo si la clave no se invalidó desde `generacion`."""
+
+    @abstractmethod
+    def invalidar(self, claves: Iterable[str]):
+        """Elimina las claves e incrementa su generación."""
+
+    @abstractmethod
+    def estadisticas(self) -> dict:
+        """Contadores de aciertos, fallos, invalidaciones y tamaño."""
+
+
+class CacheLRU(CacheBackend):
+    """
+    Caché LRU con TTL en memoria, segura para uso desde varios hilos.
+
+    Attributes:
+        max_entradas: Cantidad máxima de claves; al superarla se descarta la menos usada
+        ttl: Segundos de vida de cada entrada
+    """
+
+    def __init__(self, max_entradas: int, ttl: float):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos: OrderedDict[str, tuple[float, Entrada]] = OrderedDict()
+        self._generaciones: dict[str, int] = {}
+        self._epoca = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.descartes = 0
+
+    def get(self, clave: str) -> Entrada | None:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._datos[clave]
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def generacion(self, clave: str) -> tuple:
+        with self._lock:
+            return self._epoca, self._generaciones.get(clave, 0)
+
+    def set(self, clave: str, valor: Entrada, generacion: tuple):
+        with self._lock:
+            if (self._epoca, self._generaciones.get(clave, 0)) != generacion:
+                return
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.descartes += 1
+
+    def invalidar(self, claves: Iterable[str]):
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+                self._generaciones[clave] = self._generaciones.get(clave, 0) + 1
+                self.invalidaciones += 1
+            # Las generaciones solo hacen falta mientras haya lecturas en curso;
+            # al podarlas se cambia de época para que esas lecturas no guarden.
+            if len(self._generaciones) > 2 * self.max_entradas:
+                self._generaciones.clear()
+                self._epoca += 1
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "backend": "lru",
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 4) if total else 0.0,
+                "invalidaciones": self.invalidaciones,
+                "descartes": self.descartes,
+            }
+
+
+_backend: CacheBackend = CacheLRU(settings.cache_max_entradas, settings.cache_ttl)
+
+
+def configurar_backend(backend: CacheBackend):
+    """Reemplaza el backend de caché (p. ej. por uno compartido entre procesos)."""
+    global _backend
+    _backend = backend
+
+
+def obtener_backend() -> CacheBackend:
+    """Devuelve el backend de caché en uso."""
+    return _backend
+
+
+# Claves por entidad y sub-recurso
+def clave_empleado(empleado_id: int) -> str:
+    return f"empleado:{empleado_id}"
+
+
+def clave_proyectos_del_empleado(empleado_id: int) -> str:
+    return f"empleado:{empleado_id}:proyectos"
+
+
+def clave_proyecto(proyecto_id: int) -> str:
+    return f"proyecto:{proyecto_id}"
+
+
+def clave_empleados_del_proyecto(proyecto_id: int) -> str:
+    return f"proyecto:{proyecto_id}:empleados"
+
+
+def respuesta_cacheada(clave: str, construir: Callable[[], bytes],
+                       calcular_etag: Callable[[], str | None] | None = None,
+                       if_none_match: str | None = None) -> Response:
+    """
+    Devuelve la respuesta JSON cacheada, o la construye y la guarda.
+
+    La generación de la clave se lee antes de consultar la base de datos: si
+    una escritura invalida la clave mientras se construye la respuesta, el
+    resultado (posiblemente desactualizado) no se guarda. Por la misma razón el
+    ETag se calcula antes que el cuerpo: ante una escritura concurrente el ETag
+    puede quedar más viejo que el cuerpo, nunca más nuevo.
+
+    Args:
+        clave: Clave de la caché
+        construir: Función que consulta la base de datos y devuelve el JSON;
+                   puede lanzar HTTPException (p. ej. 404), que no se cachea
+        calcular_etag: Función que devuelve el ETag actual (None si el recurso no existe)
+        if_none_match: Encabezado If-None-Match de la petición
+
+    Returns:
+        Response: Respuesta application/json con ETag, o 304 si el ETag coincide
+    """
+    entrada = _backend.get(clave) if settings.cache_habilitado else None
+    if entrada is None:
+        generacion = _backend.generacion(clave)
+        etag = calcular_etag() if calcular_etag else None
+        if etag and etag_coincide(if_none_match, etag):
+            return respuesta_no_modificada(etag)
+        entrada = (etag, construir())
+        if settings.cache_habilitado:
+            _backend.set(clave, entrada, generacion)
+    etag, cuerpo = entrada
+    if etag and etag_coincide(if_none_match, etag):
+        return respuesta_no_modificada(etag)
+    return Response(content=cuerpo, media_type="application/json", headers={"ETag": etag} if etag else None)
+
+
+def invalidar(claves: Iterable[str]):
+    """Invalida las claves indicadas en el backend en uso."""
+    _backend.invalidar(set(claves))
+
+
+def claves_por_empleados(session, empleado_ids: Iterable[int]) -> set[str]:
+    """
+    Claves afectadas por un cambio en los datos de empleados (o su eliminación).
+
+    Incluye el detalle y los proyectos de cada empleado, el detalle y el equipo
+    de los proyectos donde participan, y el detalle de los proyectos que
+    gerencian (que incluye los datos del gerente).
+
+    Debe llamarse antes de confirmar una eliminación, mientras las
+    asignaciones todavía existen.
+    """
+    empleado_ids = set(empleado_ids)
+    if not empleado_ids:
+        return set()
+    claves = set()
+    for empleado_id in empleado_ids:
+        claves |= {clave_empleado(empleado_id), clave_proyectos_del_empleado(empleado_id)}
+    miembros = session.exec(select(EmpleadoProyecto.proyecto_id).where(EmpleadoProyecto.empleado_id.in_(empleado_ids))).all()
+    for proyecto_id in miembros:
+        claves |= {clave_proyecto(proyecto_id), clave_empleados_del_proyecto(proyecto_id)}
+    gerenciados = session.exec(select(Proyecto.id).where(Proyecto.gerente_id.in_(empleado_ids))).all()
+    claves |= {clave_proyecto(proyecto_id) for proyecto_id in gerenciados}
+    return claves
+
+
+def claves_por_proyectos(session, proyecto_ids: Iterable[int], gerente_ids: Iterable[int] = ()) -> set[str]:
+    """
+    Claves afectadas por un cambio en los datos de proyectos (o su eliminación).
+
+    Incluye el detalle y el equipo de cada proyecto, el detalle y los proyectos
+    de sus miembros (que incluyen un resumen del proyecto) y los proyectos de su
+    gerente actual. `gerente_ids` permite agregar gerentes adicionales, p. ej. el
+    nuevo gerente cuando se reasigna.
+
+    Debe llamarse antes de confirmar el cambio, para ver los miembros y el
+    gerente anteriores.
+    """
+    proyecto_ids = set(proyecto_ids)
+    claves = {clave_proyectos_del_empleado(gerente_id) for gerente_id in gerente_ids}
+    if not proyecto_ids:
+        return claves
+    for proyecto_id in proyecto_ids:
+        claves |= {clave_proyecto(proyecto_id), clave_empleados_del_proyecto(proyecto_id)}
+    miembros = session.exec(select(EmpleadoProyecto.empleado_id).where(EmpleadoProyecto.proyecto_id.in_(proyecto_ids))).all()
+    for empleado_id in miembros:
+        claves |= {clave_empleado(empleado_id), clave_proyectos_del_empleado(empleado_id)}
+    gerentes = session.exec(select(Proyecto.gerente_id).where(Proyecto.id.in_(proyecto_ids))).all()
+    claves |= {clave_proyectos_del_empleado(gerente_id) for gerente_id in gerentes}
+    return claves
+
+
+def claves_por_asignaciones(proyecto_id: int, empleado_ids: Iterable[int]) -> set[str]:
+    """Claves afectadas al asignar o desasignar empleados de un proyecto."""
+    claves = {clave_proyecto(proyecto_id), clave_empleados_del_proyecto(proyecto_id)}
+    for empleado_id in empleado_ids:
+        claves |= {clave_empleado(empleado_id), clave_proyectos_del_empleado(empleado_id)}
+    return claves
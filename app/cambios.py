@@ -0,0 +1,184 @@
+"""
+Registro de cambios (outbox transaccional) y su mantenimiento.
+
+Cada endpoint de escritura agrega a la tabla `cambio`, en la misma
+transacción que la modificación, una fila por entidad afectada: empleados y
+proyectos creados, actualizados o eliminados, y asignaciones y
+desasignaciones en `EmpleadoProyecto` (incluidas las que la base de datos
+elimina en cascada junto con un empleado o un proyecto). Si la transacción
+se revierte, el cambio tampoco queda registrado.
+
+Los consumidores leen los cambios posteriores a la última secuencia que
+procesaron (`GET /cambios?since=`), en lugar de volver a listar las tablas.
+
+El registro se mantiene acotado con:
+
+- Retención: se eliminan los cambios más antiguos que
+  `CAMBIOS_RETENCION_HORAS`.
+- Compactación (`CAMBIOS_COMPACTAR`): de varios cambios sobre la misma
+  entidad o asignación se conserva solo el último. Un consumidor que se
+  pone al día sigue viendo el estado final de cada entidad.
+
+El mantenimiento se ejecuta cada `CAMBIOS_MANTENIMIENTO_SEGUNDOS` dentro de
+la aplicación, o a mano:
+
+Uso:
+    python -m app.cambios  # aplica la retención y la compactación
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+import anyio
+from sqlalchemy import delete, exists, func, insert, literal, select
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.models import Cambio, EmpleadoProyecto
+from app.serializacion import columnas
+
+logger = logging.getLogger("app.cambios")
+
+
+def _ahora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def registrar(session, entidad: str, operacion: str, ids):
+    """
+    Registra un cambio por cada id, con una sola sentencia INSERT.
+
+    Debe llamarse antes de confirmar la transacción de la escritura.
+
+    Args:
+        session: Sesión de base de datos
+        entidad: "empleado" o "proyecto"
+        operacion: "creado", "actualizado" o "eliminado"
+        ids: IDs de las entidades afectadas
+    """
+    fecha = _ahora()
+    filas = [{"entidad": entidad, "entidad_id": entidad_id, "operacion": operacion, "fecha": fecha}
+             for entidad_id in ids]
+    if filas:
+        session.execute(insert(Cambio), filas)
+
+
+def registrar_asignaciones(session, operacion: str, proyecto_id: int, empleado_ids):
+    """
+    Registra la asignación o desasignación de empleados a un proyecto.
+
+    Args:
+        session: Sesión de base de datos
+        operacion: "asignado" o "desasignado"
+        proyecto_id: ID del proyecto
+        empleado_ids: IDs de los empleados
+    """
+    fecha = _ahora()
+    filas = [{"entidad": "asignacion", "entidad_id": proyecto_id, "empleado_id": empleado_id,
+              "operacion": operacion, "fecha": fecha}
+             for empleado_id in empleado_ids]
+    if filas:
+        session.execute(insert(Cambio), filas)
+
+
+def registrar_desasignaciones(session, *condiciones):
+    """
+    Registra como desasignadas las asignaciones que cumplen las condiciones.
+
+    Se llama antes de eliminar empleados o proyectos, cuyas asignaciones
+    elimina la base de datos en cascada. Usa `INSERT ... SELECT`, sin leer las
+    asignaciones en Python.
+
+    Args:
+        session: Sesión de base de datos
+        condiciones: Filtros sobre EmpleadoProyecto (p. ej. `EmpleadoProyecto.proyecto_id.in_(ids)`)
+    """
+    session.execute(insert(Cambio).from_select(
+        ["entidad", "entidad_id", "empleado_id", "operacion", "fecha"],
+        select(literal("asignacion"), EmpleadoProyecto.proyecto_id, EmpleadoProyecto.empleado_id,
+               literal("desasignado"), literal(_ahora(), Cambio.__table__.c.fecha.type))
+        .where(*condiciones)
+        .order_by(EmpleadoProyecto.proyecto_id, EmpleadoProyecto.empleado_id),
+    ))
+
+
+def leer_cambios(session, desde: int, limite: int) -> list[dict]:
+    """
+    Devuelve los cambios posteriores a una secuencia, en orden.
+
+    Args:
+        session: Sesión de base de datos
+        desde: Última secuencia ya procesada por el consumidor
+        limite: Cantidad máxima de cambios
+
+    Returns:
+        list[dict]: Cambios como dicts con los campos de `Cambio`
+    """
+    filas = session.exec(select(*columnas(Cambio)).where(Cambio.secuencia > desde)
+                         .order_by(Cambio.secuencia).limit(limite)).all()
+    return [fila._asdict() for fila in filas]
+
+
+def mantener(conexion, retencion_horas: int = settings.cambios_retencion_horas,
+             compactar: bool = settings.cambios_compactar) -> dict:
+    """
+    Aplica la retención y la compactación del registro de cambios.
+
+    Args:
+        conexion: Conexión o sesión de base de datos (dentro de una transacción)
+        retencion_horas: Antigüedad máxima de los cambios; 0 los conserva todos
+        compactar: Si se eliminan los cambios reemplazados por uno posterior de
+                   la misma entidad o asignación
+
+    Returns:
+        dict: Cambios eliminados por retención y por compactación
+    """
+    vencidos = compactados = 0
+    if retencion_horas > 0:
+        limite = _ahora() - timedelta(hours=retencion_horas)
+        vencidos = conexion.execute(delete(Cambio).where(Cambio.fecha < limite)).rowcount
+    if compactar:
+        posterior = aliased(Cambio)
+        compactados = conexion.execute(delete(Cambio).where(exists().where(
+            posterior.entidad == Cambio.entidad,
+            posterior.entidad_id == Cambio.entidad_id,
+            func.coalesce(posterior.empleado_id, 0) == func.coalesce(Cambio.empleado_id, 0),
+            posterior.secuencia > Cambio.secuencia,
+        ))).rowcount
+    return {"vencidos": vencidos, "compactados": compactados}
+
+
+async def mantener_periodicamente(engine, intervalo: int):
+    """
+    Ejecuta `mantener` cada `intervalo` segundos, hasta que se cancele.
+
+    Un error se registra en el log y no detiene las ejecuciones siguientes.
+
+    Args:
+        engine: Motor de base de datos (de escritura)
+        intervalo: Segundos entre ejecuciones
+    """
+    def _mantener():
+        with engine.begin() as conexion:
+            return mantener(conexion)
+
+    while True:
+        await anyio.sleep(intervalo)
+        try:
+            resultado = await anyio.to_thread.run_sync(_mantener)
+            logger.info("Registro de cambios: %s vencido(s), %s compactado(s)",
+                        resultado["vencidos"], resultado["compactados"])
+        except Exception:
+            logger.exception("Error en el mantenimiento del registro de cambios")
+
+
+def main():
+    from app.database import engine
+
+    with engine.begin() as conexion:
+        resultado = mantener(conexion)
+    print(f"Cambios eliminados: {resultado['vencidos']} por retención, {resultado['compactados']} por compactación")
+
+
+if __name__ == "__main__":
+    main()
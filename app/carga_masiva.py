@@ -0,0 +1,137 @@
+"""
+Utilidades para operaciones masivas (bulk) de creación y actualización.
+
+Los elementos se validan uno por uno con los mismos esquemas que los
+endpoints individuales, pero las verificaciones contra la base de datos se
+hacen con una consulta `IN` por lote y las inserciones con sentencias
+multi-fila dentro de una sola transacción.
+"""
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlmodel import select
+
+from app.models import Empleado, ErrorItemBulk
+
+MAX_ITEMS_BULK = 5000
+
+
+def verificar_tamano(items: list):
+    """
+    Rechaza lotes vacíos o demasiado grandes.
+
+    Raises:
+        HTTPException 400: Si la lista está vacía o supera MAX_ITEMS_BULK
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="La lista de elementos está vacía")
+    if len(items) > MAX_ITEMS_BULK:
+        raise HTTPException(status_code=400, detail=f"Se permiten como máximo {MAX_ITEMS_BULK} elementos por petición")
+
+
+def _mensaje_validacion(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(parte) for parte in detalle['loc']) or 'item'}: {detalle['msg']}"
+        for detalle in error.errors()
+    )
+
+
+def validar_items(items: list, esquema, indice_inicial: int = 0):
+    """
+    Valida cada elemento con un esquema Pydantic, sin detenerse en el primer error.
+
+    Args:
+        items: Elementos recibidos (dicts)
+        esquema: Esquema de validación (p. ej. EmpleadoCreate)
+        indice_inicial: Índice del primer elemento (para lotes parciales)
+
+    Returns:
+        tuple: (lista de (índice, modelo validado), lista de ErrorItemBulk)
+    """
+    validos, errores = [], []
+    for indice, item in enumerate(items, start=indice_inicial):
+        try:
+            validos.append((indice, esquema.model_validate(item)))
+        except ValidationError as error:
+            errores.append(ErrorItemBulk(indice=indice, codigo=400, detalle=_mensaje_validacion(error)))
+    return validos, errores
+
+
+def ids_existentes(session, columna, ids) -> set:
+    """
+    Devuelve cuáles de los ids dados existen, con una sola consulta `IN`.
+
+    Args:
+        session: Sesión de base de datos
+        columna: Columna de id (p. ej. Empleado.id)
+        ids: Ids a verificar
+
+    Returns:
+        set: Ids que existen en la base de datos
+    """
+    ids = set(ids)
+    if not ids:
+        return set()
+    return set(session.exec(select(columna).where(columna.in_(ids))).all())
+
+
+def verificar_gerentes(session, validos: list, errores: list) -> list:
+    """
+    Descarta los elementos cuyo gerente no existe, verificando todos los gerente_id a la vez.
+
+    Args:
+        session: Sesión de base de datos
+        validos: Lista de (índice, modelo) con atributo gerente_id
+        errores: Lista de errores a la que se agregan los rechazados
+
+    Returns:
+        list: Elementos cuyo gerente existe
+    """
+    existentes = ids_existentes(session, Empleado.id, (item.gerente_id for _, item in validos))
+    aceptados = []
+    for indice, item in validos:
+        if item.gerente_id in existentes:
+            aceptados.append((indice, item))
+        else:
+            errores.append(ErrorItemBulk(indice=indice, codigo=404,
+                                         detalle=f"Gerente con id {item.gerente_id} no encontrado"))
+    return aceptados
+
+
+def insertar_en_lote(session, entidad, filas: list[dict]) -> list[int]:
+    """
+    Inserta filas con sentencias INSERT multi-fila y devuelve los ids generados.
+
+    SQLAlchemy agrupa las filas en sentencias `INSERT ... VALUES (...), (...)`
+    con RETURNING. No se usa `sort_by_parameter_order`, porque en SQLite obliga
+    a insertar fila por fila; en su lugar se ordenan los ids devueltos, que la
+    base de datos asigna en orden creciente de inserción dentro de la transacción.
+
+    Args:
+        session: Sesión de base de datos
+        entidad: Modelo de tabla
+        filas: Valores de cada fila
+
+    Returns:
+        list[int]: Ids generados, en el mismo orden que `filas`
+    """
+    if not filas:
+        return []
+    sentencia = insert(entidad).returning(entidad.id)
+    return sorted(session.scalars(sentencia, filas).all())
+
+
+def actualizar_en_lote(session, entidad, filas: list[dict]):
+    """
+    Actualiza filas por clave primaria con una sentencia UPDATE ejecutada en lote.
+
+    Incrementa además la versión de cada fila (ver `app.etag`).
+
+    Args:
+        session: Sesión de base de datos
+        entidad: Modelo de tabla
+        filas: Valores de cada fila, incluyendo la clave primaria `id`
+    """
+    if filas:
+        session.execute(update(entidad).values(version=entidad.version + 1), filas)
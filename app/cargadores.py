@@ -0,0 +1,228 @@
+"""
+Consulta compuesta resuelta con cargadores por lotes (estilo DataLoader).
+
+Un tablero que muestra un proyecto, su gerente, su equipo y los demás
+proyectos de cada integrante necesita, con los endpoints de detalle, una
+petición por integrante y varias consultas por petición. `POST /consulta`
+recibe en cambio la selección anidada completa (ver `ConsultaCompuesta`) y la
+resuelve nivel por nivel:
+
+1. Junta los ids de cada tipo de entidad que aparecen en el nivel y los carga
+   con una sola consulta `IN` por tipo (`Cargador`). Las filas ya cargadas en
+   un nivel anterior se reutilizan sin volver a consultarlas.
+2. Para cada relación pedida en el nivel, obtiene con una sola consulta los
+   ids relacionados de todos los padres a la vez; esos ids forman el nivel
+   siguiente.
+
+El número de consultas depende de la profundidad de la selección y de las
+relaciones pedidas en cada nivel, no de cuántos proyectos o empleados
+aparecen: como máximo una por tipo de entidad y una por relación en cada nivel.
+"""
+
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.models import Empleado, Proyecto, EmpleadoProyecto, EmpleadoResumen, ProyectoConRelaciones
+from app.serializacion import columnas, campos_solicitados
+
+# Niveles de relaciones anidadas admitidos debajo de la raíz
+PROFUNDIDAD_MAXIMA = 4
+# Máximo de objetos en una respuesta (contando cada aparición)
+MAXIMO_OBJETOS = 20000
+
+
+class Cargador:
+    """
+    Carga filas de una entidad por id, en lotes y con caché durante la consulta.
+
+    Attributes:
+        entidad: Modelo de tabla
+        filas: ID -> dict con las columnas del esquema (None si no existe)
+    """
+
+    def __init__(self, session, entidad, modelo):
+        self.session = session
+        self.entidad = entidad
+        self.modelo = modelo
+        self.filas = {}
+
+    def cargar(self, ids) -> None:
+        """Carga con una consulta `IN` los ids que todavía no se consultaron."""
+        pendientes = set(ids).difference(self.filas)
+        if not pendientes:
+            return
+        query = select(*columnas(self.entidad, self.modelo)).where(self.entidad.id.in_(pendientes))
+        for fila in self.session.exec(query):
+            self.filas[fila.id] = fila._asdict()
+        for entidad_id in pendientes:
+            self.filas.setdefault(entidad_id, None)
+
+
+def _equipos(session, proyecto_ids) -> dict:
+    query = (select(EmpleadoProyecto.proyecto_id, EmpleadoProyecto.empleado_id)
+             .where(EmpleadoProyecto.proyecto_id.in_(proyecto_ids)).order_by(EmpleadoProyecto.empleado_id))
+    return _agrupar(session.exec(query))
+
+
+def _proyectos_asignados(session, empleado_ids) -> dict:
+    query = (select(EmpleadoProyecto.empleado_id, EmpleadoProyecto.proyecto_id)
+             .where(EmpleadoProyecto.empleado_id.in_(empleado_ids)).order_by(EmpleadoProyecto.proyecto_id))
+    return _agrupar(session.exec(query))
+
+
+def _proyectos_gerenciados(session, empleado_ids) -> dict:
+    query = select(Proyecto.gerente_id, Proyecto.id).where(Proyecto.gerente_id.in_(empleado_ids)).order_by(Proyecto.id)
+    return _agrupar(session.exec(query))
+
+
+def _agrupar(pares) -> dict:
+    grupos = {}
+    for padre_id, hijo_id in pares:
+        grupos.setdefault(padre_id, []).append(hijo_id)
+    return grupos
+
+
+# Tipo -> (modelo de tabla, esquema de sus campos)
+ENTIDADES = {
+    "empleado": (Empleado, EmpleadoResumen),
+    "proyecto": (Proyecto, ProyectoConRelaciones),
+}
+
+# (tipo, relación) -> (tipo relacionado, consulta de ids relacionados por padre).
+# Sin consulta, la relación es un solo objeto cuyo id es una columna del padre
+# (`<relación>_id`, p. ej. gerente_id); con consulta, es una lista.
+RELACIONES = {
+    ("proyecto", "gerente"): ("empleado", None),
+    ("proyecto", "empleados"): ("empleado", _equipos),
+    ("empleado", "proyectos"): ("proyecto", _proyectos_asignados),
+    ("empleado", "proyectos_gerente"): ("proyecto", _proyectos_gerenciados),
+}
+
+
+class _Pedido:
+    """Objetos de un tipo pedidos en un nivel con una misma selección, y dónde van en la respuesta."""
+    __slots__ = ("tipo", "seleccion", "campos", "raiz", "destinos")
+
+    def __init__(self, tipo: str, seleccion, campos, raiz: bool = False):
+        self.tipo = tipo
+        self.seleccion = seleccion
+        self.campos = campos
+        self.raiz = raiz
+        # (contenedor, clave o None para agregar a una lista, id)
+        self.destinos = []
+
+
+def _preparar(tipo: str, seleccion, profundidad: int = 0) -> dict:
+    """
+    Valida una selección y precalcula sus campos.
+
+    Returns:
+        dict: id(selección) -> campos pedidos (None para todos), de esta selección y las anidadas
+
+    Raises:
+        HTTPException 400: Si algún campo no existe o se supera PROFUNDIDAD_MAXIMA
+    """
+    if profundidad > PROFUNDIDAD_MAXIMA:
+        raise HTTPException(status_code=400,
+                            detail=f"La consulta admite hasta {PROFUNDIDAD_MAXIMA} niveles de relaciones anidadas")
+    entidad, modelo = ENTIDADES[tipo]
+    campos = {id(seleccion): campos_solicitados(",".join(seleccion.campos), entidad, modelo, parametro="campos")}
+    for (origen, relacion), (destino, _) in RELACIONES.items():
+        anidada = getattr(seleccion, relacion) if origen == tipo else None
+        if anidada is not None:
+            campos.update(_preparar(destino, anidada, profundidad + 1))
+    return campos
+
+
+def resolver(session, consulta) -> dict:
+    """
+    Resuelve una consulta compuesta nivel por nivel, con cargadores por lotes.
+
+    Args:
+        session: Sesión de base de datos
+        consulta: ConsultaCompuesta con una o dos raíces
+
+    Returns:
+        dict: "proyectos" y "empleados" (en el orden pedido, sin repetidos) con
+        lo seleccionado, y "faltantes" con los ids raíz que no existen
+
+    Raises:
+        HTTPException 400: Si no hay ninguna raíz, algún campo no existe, la
+                           selección es demasiado profunda o la respuesta supera
+                           MAXIMO_OBJETOS
+    """
+    raices = [(tipo, raiz) for tipo, raiz in (("proyecto", consulta.proyectos), ("empleado", consulta.empleados))
+              if raiz is not None]
+    if not raices:
+        raise HTTPException(status_code=400, detail="La consulta debe incluir proyectos o empleados")
+    campos = {}
+    for tipo, raiz in raices:
+        campos.update(_preparar(tipo, raiz))
+
+    cargadores = {tipo: Cargador(session, *ENTIDADES[tipo]) for tipo in ENTIDADES}
+    resultado = {f"{tipo}s": [] for tipo, _ in raices}
+    resultado["faltantes"] = {}
+    nivel = []
+    for tipo, raiz in raices:
+        pedido = _Pedido(tipo, raiz, campos[id(raiz)], raiz=True)
+        pedido.destinos = [(resultado[f"{tipo}s"], None, entidad_id) for entidad_id in dict.fromkeys(raiz.ids)]
+        nivel.append(pedido)
+
+    objetos = 0
+    while nivel:
+        # 1. Una consulta por tipo de entidad con todos los ids del nivel
+        for tipo, cargador in cargadores.items():
+            cargador.cargar(entidad_id for pedido in nivel if pedido.tipo == tipo
+                            for _, _, entidad_id in pedido.destinos)
+
+        # Objetos del nivel por pedido: (id, dict de la respuesta)
+        creados = []
+        for pedido in nivel:
+            filas = cargadores[pedido.tipo].filas
+            objetos_pedido = []
+            for contenedor, clave, entidad_id in pedido.destinos:
+                fila = filas[entidad_id]
+                if fila is None:
+                    # Solo los ids raíz pueden faltar: los relacionados salen de la base de datos
+                    if pedido.raiz:
+                        resultado["faltantes"].setdefault(f"{pedido.tipo}s", []).append(entidad_id)
+                    continue
+                objeto = {campo: fila[campo] for campo in pedido.campos} if pedido.campos else dict(fila)
+                if clave is None:
+                    contenedor.append(objeto)
+                else:
+                    contenedor[clave] = objeto
+                objetos_pedido.append((entidad_id, objeto))
+            objetos += len(objetos_pedido)
+            creados.append((pedido, objetos_pedido))
+        if objetos > MAXIMO_OBJETOS:
+            raise HTTPException(status_code=400,
+                                detail=f"La consulta devolvería más de {MAXIMO_OBJETOS} objetos; reduzca los ids o la selección")
+
+        # 2. Una consulta por relación con los padres de todo el nivel
+        relacionados = {}
+        for (origen, relacion), (_, consulta_ids) in RELACIONES.items():
+            padres = {entidad_id for pedido, objetos_pedido in creados
+                      if pedido.tipo == origen and getattr(pedido.seleccion, relacion) is not None
+                      for entidad_id, _ in objetos_pedido}
+            if padres and consulta_ids is not None:
+                relacionados[origen, relacion] = consulta_ids(session, padres)
+        siguiente = []
+        for pedido, objetos_pedido in creados:
+            for (origen, relacion), (destino, consulta_ids) in RELACIONES.items():
+                anidada = getattr(pedido.seleccion, relacion) if origen == pedido.tipo else None
+                if anidada is None:
+                    continue
+                hijo = _Pedido(destino, anidada, campos[id(anidada)])
+                filas = cargadores[pedido.tipo].filas
+                for entidad_id, objeto in objetos_pedido:
+                    if consulta_ids is None:
+                        objeto[relacion] = None
+                        hijo.destinos.append((objeto, relacion, filas[entidad_id][f"{relacion}_id"]))
+                    else:
+                        objeto[relacion] = []
+                        hijo.destinos += [(objeto[relacion], None, hijo_id)
+                                          for hijo_id in relacionados[origen, relacion].get(entidad_id, [])]
+                siguiente.append(hijo)
+        nivel = siguiente
+    return resultado
@@ -0,0 +1,116 @@
+"""
+Configuración de la aplicación.
+
+Los valores se leen de variables de entorno al importar el módulo, con
+valores por defecto pensados para desarrollo local con SQLite.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+
+def _env_str(nombre: str, defecto: str) -> str:
+    return os.getenv(nombre, defecto)
+
+
+def _env_int(nombre: str, defecto: int) -> int:
+    valor = os.getenv(nombre)
+    return int(valor) if valor not in (None, "") else defecto
+
+
+def _env_bool(nombre: str, defecto: bool) -> bool:
+    valor = os.getenv(nombre)
+    if valor in (None, ""):
+        return defecto
+    return valor.strip().lower() in ("1", "true", "si", "sí", "yes", "on")
+
+
+# Perfiles de PRAGMAs que se aplican a cada conexión SQLite nueva
+PERFILES_SQLITE = {
+    # Sin ajustes: el comportamiento por defecto de SQLite
+    "ninguno": {},
+    # WAL permite lectores concurrentes con un escritor; synchronous=NORMAL es
+    # seguro bajo WAL y evita un fsync por commit; busy_timeout espera al
+    # bloqueo en lugar de fallar con "database is locked".
+    "rendimiento": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Configuración de la base de datos y de la caché.
+
+    Attributes:
+        database_url: URL de SQLAlchemy (DATABASE_URL)
+        database_url_lectura: URL de una réplica para las lecturas; vacía usa la base principal (DATABASE_URL_LECTURA)
+        lectura_separada: Atender los GET con un pool de lectura propio (DB_LECTURA_SEPARADA)
+        leer_escrituras_segundos: Segundos que un cliente lee de la base principal después de escribir, 0 lo desactiva (DB_LEER_ESCRITURAS_SEGUNDOS)
+        pool_size: Conexiones persistentes del pool (DB_POOL_SIZE)
+        max_overflow: Conexiones adicionales sobre pool_size (DB_MAX_OVERFLOW)
+        pool_timeout: Segundos de espera por una conexión libre (DB_POOL_TIMEOUT)
+        pool_recycle: Segundos tras los que se recicla una conexión, -1 desactiva (DB_POOL_RECYCLE)
+        pool_pre_ping: Verificar la conexión antes de usarla (DB_POOL_PRE_PING)
+        echo: Mostrar el SQL ejecutado (DB_ECHO)
+        sqlite_perfil: Perfil de PRAGMAs para SQLite, ver PERFILES_SQLITE (DB_SQLITE_PERFIL)
+        auto_migrar: Aplicar las migraciones pendientes al iniciar en lugar de fallar (DB_AUTO_MIGRAR)
+        pool_precalentar: Conexiones que se abren al iniciar, 0 desactiva (DB_POOL_PRECALENTAR)
+        calentar_rutas: Ejecutar peticiones internas de calentamiento al iniciar (ARRANQUE_CALENTAR)
+        cache_habilitado: Cachear las respuestas de los endpoints de detalle (CACHE_HABILITADO)
+        cache_max_entradas: Máximo de respuestas en la caché en memoria (CACHE_MAX_ENTRADAS)
+        cache_ttl: Segundos de vida de cada respuesta cacheada (CACHE_TTL)
+        metricas_habilitadas: Medir latencia, SQL y tamaño de respuesta por ruta (METRICAS_HABILITADAS)
+        metricas_lento_ms: Umbral en ms del log de peticiones lentas, 0 lo desactiva (METRICAS_LENTO_MS)
+        cambios_retencion_horas: Horas que se conservan los cambios del registro, 0 los conserva todos (CAMBIOS_RETENCION_HORAS)
+        cambios_compactar: Conservar solo el último cambio de cada entidad o asignación (CAMBIOS_COMPACTAR)
+        cambios_mantenimiento_segundos: Segundos entre mantenimientos del registro, 0 lo desactiva (CAMBIOS_MANTENIMIENTO_SEGUNDOS)
+        cambios_sondeo_ms: Intervalo en ms con que el stream SSE busca cambios nuevos (CAMBIOS_SONDEO_MS)
+        escritor_agrupado: Agrupar las escrituras de una sola fila en transacciones por lotes (DB_ESCRITOR_AGRUPADO)
+        escritor_ventana_ms: Milisegundos que el escritor espera por más operaciones para un lote (DB_ESCRITOR_VENTANA_MS)
+        escritor_lote_max: Máximo de operaciones por transacción del escritor (DB_ESCRITOR_LOTE_MAX)
+        escritor_cola_max: Máximo de operaciones en cola; con la cola llena se responde 503 (DB_ESCRITOR_COLA_MAX)
+    """
+    database_url: str = field(default_factory=lambda: _env_str("DATABASE_URL", "sqlite:///Proyectos.db"))
+    database_url_lectura: str = field(default_factory=lambda: _env_str("DATABASE_URL_LECTURA", ""))
+    lectura_separada: bool = field(default_factory=lambda: _env_bool("DB_LECTURA_SEPARADA", True))
+    leer_escrituras_segundos: int = field(default_factory=lambda: _env_int("DB_LEER_ESCRITURAS_SEGUNDOS", 5))
+    pool_size: int = field(default_factory=lambda: _env_int("DB_POOL_SIZE", 20))
+    max_overflow: int = field(default_factory=lambda: _env_int("DB_MAX_OVERFLOW", 20))
+    pool_timeout: int = field(default_factory=lambda: _env_int("DB_POOL_TIMEOUT", 30))
+    pool_recycle: int = field(default_factory=lambda: _env_int("DB_POOL_RECYCLE", -1))
+    pool_pre_ping: bool = field(default_factory=lambda: _env_bool("DB_POOL_PRE_PING", False))
+    echo: bool = field(default_factory=lambda: _env_bool("DB_ECHO", False))
+    sqlite_perfil: str = field(default_factory=lambda: _env_str("DB_SQLITE_PERFIL", "rendimiento"))
+    auto_migrar: bool = field(default_factory=lambda: _env_bool("DB_AUTO_MIGRAR", False))
+    pool_precalentar: int = field(default_factory=lambda: _env_int("DB_POOL_PRECALENTAR", 5))
+    calentar_rutas: bool = field(default_factory=lambda: _env_bool("ARRANQUE_CALENTAR", True))
+    cache_habilitado: bool = field(default_factory=lambda: _env_bool("CACHE_HABILITADO", True))
+    cache_max_entradas: int = field(default_factory=lambda: _env_int("CACHE_MAX_ENTRADAS", 10000))
+    cache_ttl: int = field(default_factory=lambda: _env_int("CACHE_TTL", 60))
+    metricas_habilitadas: bool = field(default_factory=lambda: _env_bool("METRICAS_HABILITADAS", True))
+    metricas_lento_ms: int = field(default_factory=lambda: _env_int("METRICAS_LENTO_MS", 0))
+    cambios_retencion_horas: int = field(default_factory=lambda: _env_int("CAMBIOS_RETENCION_HORAS", 168))
+    cambios_compactar: bool = field(default_factory=lambda: _env_bool("CAMBIOS_COMPACTAR", True))
+    cambios_mantenimiento_segundos: int = field(default_factory=lambda: _env_int("CAMBIOS_MANTENIMIENTO_SEGUNDOS", 3600))
+    cambios_sondeo_ms: int = field(default_factory=lambda: _env_int("CAMBIOS_SONDEO_MS", 500))
+    escritor_agrupado: bool = field(default_factory=lambda: _env_bool("DB_ESCRITOR_AGRUPADO", False))
+    escritor_ventana_ms: int = field(default_factory=lambda: _env_int("DB_ESCRITOR_VENTANA_MS", 2))
+    escritor_lote_max: int = field(default_factory=lambda: _env_int("DB_ESCRITOR_LOTE_MAX", 200))
+    escritor_cola_max: int = field(default_factory=lambda: _env_int("DB_ESCRITOR_COLA_MAX", 10000))
+
+    def __post_init__(self):
+        if self.sqlite_perfil not in PERFILES_SQLITE:
+            raise ValueError(
+                f"DB_SQLITE_PERFIL desconocido: '{self.sqlite_perfil}'. "
+                f"Opciones: {', '.join(PERFILES_SQLITE)}"
+            )
+
+
+settings = Settings()
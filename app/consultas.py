@@ -0,0 +1,162 @@
+"""
+Construcción de consultas con carga anticipada de relaciones.
+
+En lugar de dejar que la serialización de los esquemas de respuesta dispare
+cargas perezosas (una consulta extra por relación, o por fila en listados),
+cada endpoint pide la entidad junto con un plan de carga derivado de su
+modelo de respuesta:
+
+- Relaciones a un solo objeto (p. ej. `Proyecto.gerente`) -> `joinedload`
+- Relaciones a listas (p. ej. `Proyecto.empleados`) -> `selectinload`
+
+Así cada endpoint de detalle ejecuta un número fijo y pequeño de consultas.
+"""
+
+from functools import lru_cache
+from typing import get_args
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import select
+
+
+def modelo_anidado(anotacion):
+    """Devuelve el modelo Pydantic contenido en una anotación (p. ej. List[X] -> X)."""
+    if isinstance(anotacion, type) and issubclass(anotacion, BaseModel):
+        return anotacion
+    for argumento in get_args(anotacion):
+        modelo = modelo_anidado(argumento)
+        if modelo is not None:
+            return modelo
+    return None
+
+
+def _opciones(entidad, modelo_respuesta, padre=None) -> list:
+    relaciones = inspect(entidad).relationships
+    opciones = []
+    for nombre, campo in modelo_respuesta.model_fields.items():
+        if nombre not in relaciones:
+            continue
+        relacion = relaciones[nombre]
+        atributo = getattr(entidad, nombre)
+        if padre is None:
+            cargador = selectinload(atributo) if relacion.uselist else joinedload(atributo)
+        elif relacion.uselist:
+            cargador = padre.selectinload(atributo)
+        else:
+            cargador = padre.joinedload(atributo)
+        opciones.append(cargador)
+        submodelo = modelo_anidado(campo.annotation)
+        if submodelo is not None:
+            opciones.extend(_opciones(relacion.mapper.class_, submodelo, cargador))
+    return opciones
+
+
+@lru_cache(maxsize=None)
+def plan_de_carga(entidad, modelo_respuesta) -> tuple:
+    """
+    Calcula las opciones de carga necesarias para serializar un modelo de respuesta.
+
+    Recorre los campos del modelo de respuesta que corresponden a relaciones de
+    la entidad (incluyendo relaciones anidadas) y elige `joinedload` o
+    `selectinload` según la cardinalidad. El resultado se cachea por par
+    (entidad, modelo de respuesta).
+
+    Args:
+        entidad: Modelo de tabla (p. ej. Proyecto)
+        modelo_respuesta: Esquema de respuesta (p. ej. ProyectoConRelaciones)
+
+    Returns:
+        tuple: Opciones para `select(...).options(*plan)`
+    """
+    return tuple(_opciones(entidad, modelo_respuesta))
+
+
+def opciones_de_relaciones(entidad, *relaciones: str) -> tuple:
+    """
+    Opciones de carga para una lista explícita de relaciones de la entidad.
+
+    Útil para endpoints cuya respuesta no es un esquema (p. ej. un dict).
+
+    Args:
+        entidad: Modelo de tabla
+        relaciones: Nombres de las relaciones a cargar
+
+    Returns:
+        tuple: Opciones para `select(...).options(*opciones)`
+    """
+    mapeo = inspect(entidad).relationships
+    return tuple(
+        selectinload(getattr(entidad, nombre)) if mapeo[nombre].uselist else joinedload(getattr(entidad, nombre))
+        for nombre in relaciones
+    )
+
+
+def obtener_con_relaciones(session, entidad, entidad_id: int, modelo_respuesta=None, relaciones: tuple = ()):
+    """
+    Obtiene una entidad por id cargando de antemano las relaciones indicadas.
+
+    Args:
+        session: Sesión de base de datos
+        entidad: Modelo de tabla
+        entidad_id: ID de la entidad
+        modelo_respuesta: Esquema de respuesta del que se deriva el plan de carga
+        relaciones: Nombres de relaciones adicionales a cargar
+
+    Returns:
+        La entidad con sus relaciones cargadas, o None si no existe
+    """
+    opciones = ()
+    if modelo_respuesta is not None:
+        opciones += plan_de_carga(entidad, modelo_respuesta)
+    if relaciones:
+        opciones += opciones_de_relaciones(entidad, *relaciones)
+    query = select(entidad).where(inspect(entidad).primary_key[0] == entidad_id).options(*opciones)
+    return session.exec(query).first()
+
+
+def obtener_varios_con_relaciones(session, entidad, entidad_ids, modelo_respuesta) -> dict:
+    """
+    Obtiene varias entidades por id con una consulta `IN` y el plan de carga del modelo de respuesta.
+
+    Las relaciones se cargan para todas a la vez (una consulta por relación de
+    lista, con `selectinload`), no una vez por entidad.
+
+    Args:
+        session: Sesión de base de datos
+        entidad: Modelo de tabla
+        entidad_ids: IDs a obtener
+        modelo_respuesta: Esquema de respuesta del que se deriva el plan de carga
+
+    Returns:
+        dict: ID -> entidad con sus relaciones cargadas (sin los ids que no existen)
+    """
+    columna_id = inspect(entidad).primary_key[0]
+    query = select(entidad).where(columna_id.in_(set(entidad_ids))).options(*plan_de_carga(entidad, modelo_respuesta))
+    return {instancia.id: instancia for instancia in session.exec(query).all()}
+
+
+def separar_ids(texto: str, maximo: int) -> list[int]:
+    """
+    Convierte una lista de ids separados por comas (p. ej. "3,1,7") en enteros.
+
+    Args:
+        texto: IDs separados por comas
+        maximo: Cantidad máxima de ids admitida
+
+    Returns:
+        list[int]: IDs en el orden recibido
+
+    Raises:
+        HTTPException 400: Si algún id no es un entero o hay más de `maximo`
+    """
+    partes = [parte.strip() for parte in texto.split(",") if parte.strip()]
+    try:
+        ids = [int(parte) for parte in partes]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids debe ser una lista de enteros separados por comas")
+    if not ids or len(ids) > maximo:
+        raise HTTPException(status_code=400, detail=f"ids debe tener entre 1 y {maximo} elementos")
+    return ids
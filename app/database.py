@@ -1,41 +1,310 @@
 """
 Configuración de la base de datos SQLModel.
 
-Este módulo configura la conexión a la base de datos SQLite
+Este módulo configura la conexión a la base de datos a partir de
+`app.config.settings` (SQLite por defecto, o cualquier URL de SQLAlchemy)
 y proporciona funciones para crear tablas y gestionar sesiones.
+
+Hay dos motores, cada uno con su pool:
+
+- `engine`: base principal, para las escrituras (`WriteSessionDep`).
+- `engine_lectura`: para los GET (`ReadSessionDep`). Usa la réplica de
+  `DATABASE_URL_LECTURA` si se configura; con SQLite en archivo, conexiones
+  de solo lectura (URI `mode=ro`) que bajo WAL leen sin esperar a los
+  escritores. Así las lecturas no compiten por las conexiones del pool de
+  escritura.
+
+Después de una escritura, el cliente recibe la cookie `leer_escrituras`, y
+mientras dura (`DB_LEER_ESCRITURAS_SEGUNDOS`) sus GET leen de la base
+principal, de modo que ve sus propios cambios aunque la réplica tenga retraso.
 """
 
-from sqlmodel import Session, create_engine, SQLModel
-from fastapi import Depends
+from sqlmodel import Session, create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from fastapi import Depends, Request
 from typing import Annotated
+from contextlib import asynccontextmanager
+import anyio
+
+from app.config import settings, PERFILES_SQLITE
+from app.migraciones import migrar
+from app.metricas import instrumentar_engine
+
+
+def _es_sqlite_en_memoria(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def aplicar_pragmas_sqlite(engine, pragmas: dict):
+    """
+    Registra un hook que aplica PRAGMAs a cada conexión SQLite nueva.
+
+    Los PRAGMAs son por conexión, por eso se aplican en el evento `connect`
+    del pool y no una sola vez al crear el motor.
 
-# Motor de base de datos SQLite
-engine = create_engine('sqlite:///Proyectos.db')
+    Args:
+        engine: Motor de SQLAlchemy sobre SQLite
+        pragmas: Diccionario nombre -> valor (p. ej. {"journal_mode": "WAL"})
+    """
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _al_conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre}={valor}")
+        cursor.close()
+
+
+def url_solo_lectura(url):
+    """
+    Convierte una URL de SQLite en archivo en una URI de solo lectura.
+
+    `sqlite:///Proyectos.db` pasa a `sqlite:///file:Proyectos.db?mode=ro&uri=true`.
+
+    Args:
+        url: URL de SQLAlchemy (objeto URL)
+
+    Returns:
+        URL: La misma base de datos, abierta en modo de solo lectura
+    """
+    return url.set(database=f"file:{url.database}", query={**url.query, "mode": "ro", "uri": "true"})
+
+
+def crear_engine(database_url: str = settings.database_url, solo_lectura: bool = False):
+    """
+    Crea un motor de base de datos con la configuración de `settings`.
+
+    - Bases de datos con pool (SQLite en archivo, PostgreSQL, MySQL...):
+      usa pool_size, max_overflow, pool_timeout, pool_recycle y pool_pre_ping.
+    - SQLite: activa `foreign_keys` en cada conexión (SQLite no aplica las
+      claves foráneas ni sus `ON DELETE CASCADE` sin él) y aplica además el
+      perfil de PRAGMAs configurado. Con `solo_lectura` activa `query_only` y
+      omite `journal_mode`, que solo puede cambiar una conexión de escritura.
+    - Con métricas habilitadas, registra los hooks que cuentan las sentencias
+      SQL y su duración por petición (ver `app.metricas`).
+
+    Args:
+        database_url: URL de SQLAlchemy de la base de datos
+        solo_lectura: Si el motor solo se usa para leer
+
+    Returns:
+        Engine: Motor de SQLAlchemy
+    """
+    url = make_url(database_url)
+    argumentos = {"echo": settings.echo}
+    if not _es_sqlite_en_memoria(url):
+        argumentos.update(
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+            pool_pre_ping=settings.pool_pre_ping,
+        )
+    motor = create_engine(url, **argumentos)
+    if url.get_backend_name() == "sqlite":
+        pragmas = {"foreign_keys": "ON", **PERFILES_SQLITE[settings.sqlite_perfil]}
+        if solo_lectura:
+            pragmas.pop("journal_mode", None)
+            pragmas["query_only"] = "ON"
+        aplicar_pragmas_sqlite(motor, pragmas)
+    if settings.metricas_habilitadas:
+        instrumentar_engine(motor)
+    return motor
+
+
+def crear_engine_lectura(motor_escritura, database_url: str = settings.database_url,
+                         database_url_lectura: str = settings.database_url_lectura):
+    """
+    Crea el motor de las lecturas, con su propio pool.
+
+    - Con `database_url_lectura` (una réplica): un motor sobre esa URL.
+    - Con SQLite en archivo: conexiones de solo lectura sobre el mismo archivo.
+    - Con otra base de datos sin réplica: un segundo pool sobre la base principal.
+    - Con SQLite en memoria (cada conexión es otra base de datos) o con
+      `DB_LECTURA_SEPARADA=false`: el mismo motor de escritura.
+
+    Args:
+        motor_escritura: Motor de la base principal
+        database_url: URL de la base principal
+        database_url_lectura: URL de la réplica de lectura (vacía si no hay)
+
+    Returns:
+        Engine: Motor de SQLAlchemy para las lecturas
+    """
+    if not settings.lectura_separada:
+        return motor_escritura
+    if database_url_lectura:
+        return crear_engine(database_url_lectura, solo_lectura=True)
+    url = make_url(database_url)
+    if _es_sqlite_en_memoria(url):
+        return motor_escritura
+    if url.get_backend_name() == "sqlite":
+        url = url_solo_lectura(url)
+    return crear_engine(url, solo_lectura=True)
+
+
+# Motores de base de datos: principal (escrituras) y de lectura
+engine = crear_engine()
+engine_lectura = crear_engine_lectura(engine)
+
+# Limitan las sesiones abiertas a la capacidad de cada pool (ver get_session)
+_limitador_sesiones = anyio.CapacityLimiter(settings.pool_size + settings.max_overflow)
+_limitador_lectura = (_limitador_sesiones if engine_lectura is engine
+                      else anyio.CapacityLimiter(settings.pool_size + settings.max_overflow))
+
+# Cookie que marca a un cliente que acaba de escribir (lectura de sus propias escrituras)
+COOKIE_LEER_ESCRITURAS = "leer_escrituras"
 
 
 def create_tables():
     """
-    Crea todas las tablas definidas en los modelos SQLModel.
+    Crea o actualiza las tablas e índices definidos en los modelos SQLModel.
 
-    Se ejecuta automáticamente al iniciar la aplicación.
+    Aplica las migraciones pendientes de `app.migraciones`, por lo que también
+    lleva al esquema actual una base de datos creada con una versión anterior.
+    La aplicación no la ejecuta al importarse: al iniciar solo verifica la
+    versión del esquema (ver `app.arranque`); las migraciones se aplican con
+    `python -m app.migraciones`.
     """
-    SQLModel.metadata.create_all(engine)
+    migrar(engine)
 
 
-def get_session():
+def precalentar_pool(cantidad: int, motor=engine) -> int:
     """
-    Generador de sesiones de base de datos.
+    Abre conexiones del pool por adelantado y las devuelve al pool.
+
+    Así las primeras peticiones no pagan la apertura de la conexión ni la
+    aplicación de los PRAGMAs de SQLite.
+
+    Args:
+        cantidad: Conexiones a abrir (como máximo `pool_size`)
+        motor: Motor cuyo pool se precalienta
+
+    Returns:
+        int: Conexiones abiertas (0 con SQLite en memoria, que no usa pool)
+    """
+    cantidad = min(cantidad, settings.pool_size)
+    if cantidad <= 0 or _es_sqlite_en_memoria(motor.url):
+        return 0
+    conexiones = []
+    try:
+        for _ in range(cantidad):
+            conexion = motor.connect()
+            conexiones.append(conexion)
+            conexion.exec_driver_sql("SELECT 1")
+    finally:
+        for conexion in conexiones:
+            conexion.close()
+    return len(conexiones)
+
+
+async def get_session(request: Request):
+    """
+    Generador de sesiones de escritura, sobre la base principal.
+
+    Marca la petición como escritura: si termina con éxito, el cliente recibe
+    la cookie de lectura de sus propias escrituras (ver `MiddlewareLeerEscrituras`).
 
     Yields:
         Session: Sesión de SQLModel para operaciones de BD
 
     Usage:
-        async def endpoint(session: SessionDep):
+        def endpoint(session: WriteSessionDep):
             # usar session aquí
+
+    Note:
+        Los endpoints que usan la sesión se declaran con `def` (no `async def`):
+        la sesión es síncrona y FastAPI ejecuta esos endpoints en su threadpool,
+        de modo que una consulta lenta no bloquea el event loop.
+
+        La sesión conserva su conexión hasta que se envía la respuesta, y FastAPI
+        también serializa la respuesta en el threadpool. Si hubiera más sesiones
+        abiertas que conexiones, los hilos podrían quedar todos esperando una
+        conexión mientras las peticiones que las tienen esperan un hilo libre.
+        Por eso el número de sesiones abiertas se limita a la capacidad del pool,
+        y la espera ocurre aquí, en el event loop, sin ocupar un hilo.
+    """
+    async with sesion_escritura(request) as session:
+        yield session
+
+
+@asynccontextmanager
+async def sesion_escritura(request: Request):
+    """
+    Abre una sesión de escritura para la petición, dentro del límite del pool (ver `get_session`).
+
+    Yields:
+        Session: Sesión de SQLModel para operaciones de BD
+    """
+    request.state.escritura = True
+    async with _limitador_sesiones:
+        with Session(engine) as session:
+            yield session
+
+
+@asynccontextmanager
+async def sesion_lectura(request: Request):
     """
-    with Session(engine) as session:
+    Abre una sesión de lectura para la petición, dentro del límite de su pool.
+
+    Usa el motor de lectura, salvo que el cliente tenga la cookie de lectura de
+    sus propias escrituras: entonces lee de la base principal, para no ver una
+    réplica anterior a su último cambio.
+
+    Yields:
+        Session: Sesión de SQLModel para consultas
+    """
+    if request.cookies.get(COOKIE_LEER_ESCRITURAS):
+        motor, limitador = engine, _limitador_sesiones
+    else:
+        motor, limitador = engine_lectura, _limitador_lectura
+    async with limitador:
+        with Session(motor) as session:
+            yield session
+
+
+async def get_session_lectura(request: Request):
+    """
+    Generador de sesiones de lectura, para los endpoints GET (ver `sesion_lectura`).
+
+    Yields:
+        Session: Sesión de SQLModel para consultas
+    """
+    async with sesion_lectura(request) as session:
         yield session
 
 
-# Tipo anotado para inyección de dependencias
-SessionDep = Annotated[Session, Depends(get_session)]
\ No newline at end of file
+class MiddlewareLeerEscrituras:
+    """
+    Middleware ASGI que agrega la cookie de lectura de sus propias escrituras.
+
+    Se agrega a las respuestas exitosas (código menor que 400) de las peticiones
+    que usaron una sesión de escritura. La cookie dura `DB_LEER_ESCRITURAS_SEGUNDOS`.
+    """
+
+    def __init__(self, app, segundos: int = settings.leer_escrituras_segundos):
+        self.app = app
+        self.cookie = (f"{COOKIE_LEER_ESCRITURAS}=1; Max-Age={segundos}; Path=/; HttpOnly; SameSite=Lax").encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensaje):
+            if (mensaje["type"] == "http.response.start" and mensaje["status"] < 400
+                    and scope.get("state", {}).get("escritura")):
+                mensaje["headers"] = [*mensaje.get("headers", []), (b"set-cookie", self.cookie)]
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+
+# Tipos anotados para inyección de dependencias
+WriteSessionDep = Annotated[Session, Depends(get_session)]
+ReadSessionDep = Annotated[Session, Depends(get_session_lectura)]
+# Nombre anterior de la sesión de escritura
+SessionDep = WriteSessionDep
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Escritor agrupado (group commit) para las escrituras de una sola fila.
+
+Sin él, cada `POST /empleado/`, `PATCH /empleado/{id}` o
+`POST /proyecto/{id}/asignar` confirma su propia transacción: con SQLite,
+un bloqueo exclusivo y una sincronización a disco por petición, lo que
+limita las escrituras a unos cientos por segundo.
+
+Con `DB_ESCRITOR_AGRUPADO=true`, esos endpoints encolan su operación y un
+único hilo escritor:
+
+1. Toma la primera operación de la cola y espera hasta
+   `DB_ESCRITOR_VENTANA_MS` (o hasta juntar `DB_ESCRITOR_LOTE_MAX`) por más.
+2. Aplica el lote en una sola transacción, cada operación dentro de un
+   SAVEPOINT: si una falla (p. ej. el 404 o el 409 que el endpoint devolvería
+   sin agrupar), solo se revierte esa operación y su petición recibe el error.
+3. Confirma una vez y entrega a cada petición su propio resultado.
+
+Cada operación es una función `aplicar(session, *args)` que hace sus
+escrituras sin confirmar, toma los valores de la respuesta y devuelve una
+función sin argumentos que, ya confirmada la transacción, invalida lo que
+corresponda y devuelve esos valores. El hilo escritor solo confirma: esa
+función la ejecuta cada petición (ver `escribir`), así la invalidación y la
+respuesta no demoran el lote siguiente. No debe usar la sesión, que para
+entonces ya está cerrada. La misma operación se usa sin agrupar.
+
+La profundidad de la cola y el tamaño y la duración de los lotes se exponen
+en `/metrics`.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+import anyio
+from fastapi import Depends, HTTPException, Request
+from sqlmodel import Session
+from typing import Annotated
+
+from app.config import settings
+from app.database import engine, sesion_escritura
+from app.metricas import Histograma, BUCKETS_LATENCIA
+
+logger = logging.getLogger("app.escritor")
+
+BUCKETS_LOTE = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Marca de fin en la cola: el hilo termina después de aplicar lo encolado antes
+_FIN = object()
+
+
+class _Operacion:
+    __slots__ = ("aplicar", "args", "loop", "futuro")
+
+    def __init__(self, aplicar, args, loop, futuro):
+        self.aplicar = aplicar
+        self.args = args
+        self.loop = loop
+        self.futuro = futuro
+
+
+def _resolver(futuro: asyncio.Future, resultado, error):
+    # La petición pudo haberse cancelado (cliente desconectado) mientras esperaba
+    if futuro.cancelled():
+        return
+    if error is not None:
+        futuro.set_exception(error)
+    else:
+        futuro.set_result(resultado)
+
+
+class EscritorAgrupado:
+    """
+    Hilo escritor que aplica las operaciones encoladas en transacciones por lotes.
+
+    Attributes:
+        motor: Motor de base de datos (de escritura)
+        ventana: Segundos que se espera por más operaciones después de la primera
+        lote_max: Máximo de operaciones por transacción
+    """
+
+    def __init__(self, motor, ventana_ms: int = settings.escritor_ventana_ms,
+                 lote_max: int = settings.escritor_lote_max, cola_max: int = settings.escritor_cola_max):
+        self.motor = motor
+        self.ventana = ventana_ms / 1000
+        self.lote_max = lote_max
+        self._cola = queue.Queue(maxsize=cola_max)
+        self._hilo: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.tamano_lote = Histograma(BUCKETS_LOTE)
+        self.duracion_lote = Histograma(BUCKETS_LATENCIA)
+        self.operaciones = {"ok": 0, "error": 0}
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None
+
+    def iniciar(self):
+        """Inicia el hilo escritor."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name="escritor-agrupado", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        """Aplica las operaciones ya encoladas y detiene el hilo escritor."""
+        if self._hilo is not None:
+            self._cola.put(_FIN)
+            self._hilo.join()
+            self._hilo = None
+
+    async def enviar(self, aplicar, *args):
+        """
+        Encola una operación y espera su resultado.
+
+        Args:
+            aplicar: Función `aplicar(session, *args)` que devuelve la función posterior al commit
+            args: Argumentos de la operación
+
+        Returns:
+            La función posterior al commit, para ejecutarla en la petición
+
+        Raises:
+            HTTPException 503: Si la cola está llena
+            Exception: El error de la operación (p. ej. HTTPException 404/409)
+        """
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        try:
+            self._cola.put_nowait(_Operacion(aplicar, args, loop, futuro))
+        except queue.Full:
+            raise HTTPException(status_code=503, detail="Cola de escritura llena, reintente en unos segundos")
+        return await futuro
+
+    def _ejecutar(self):
+        terminar = False
+        while not terminar:
+            primera = self._cola.get()
+            if primera is _FIN:
+                break
+            lote = [primera]
+            limite = time.monotonic() + self.ventana
+            while len(lote) < self.lote_max:
+                try:
+                    operacion = self._cola.get(timeout=max(limite - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if operacion is _FIN:
+                    terminar = True
+                    break
+                lote.append(operacion)
+            self._aplicar_lote(lote)
+
+    def _aplicar_lote(self, lote: list[_Operacion]):
+        inicio = time.perf_counter()
+        # Operación -> (resultado, error)
+        resueltas = {}
+        try:
+            with Session(self.motor) as session:
+                if self.motor.dialect.name == "sqlite":
+                    # Toma el bloqueo de escritura al empezar y hace que los
+                    # SAVEPOINT queden dentro de esta transacción (el driver
+                    # sqlite3 no abre una por su cuenta antes de un SAVEPOINT).
+                    session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+                pendientes = []
+                for operacion in lote:
+                    try:
+                        with session.begin_nested():
+                            despues = operacion.aplicar(session, *operacion.args)
+                        pendientes.append((operacion, despues))
+                    except Exception as error:
+                        resueltas[operacion] = (None, error)
+                session.commit()
+                for operacion, despues in pendientes:
+                    resueltas[operacion] = (despues, None)
+        except Exception as error:
+            logger.exception("Error al aplicar un lote de %s escritura(s)", len(lote))
+            for operacion in lote:
+                resueltas.setdefault(operacion, (None, error))
+        with self._lock:
+            self.tamano_lote.observar(len(lote))
+            self.duracion_lote.observar(time.perf_counter() - inicio)
+            for _, error in resueltas.values():
+                self.operaciones["error" if error is not None else "ok"] += 1
+        for operacion, (resultado, error) in resueltas.items():
+            operacion.loop.call_soon_threadsafe(_resolver, operacion.futuro, resultado, error)
+
+    def exportar(self) -> str:
+        """
+        Métricas del escritor en formato de texto de Prometheus ("" si no está activo).
+
+        Returns:
+            str: Profundidad de la cola, operaciones por resultado y tamaño y duración de los lotes
+        """
+        if not self.activo:
+            return ""
+        with self._lock:
+            lineas = ["# HELP db_write_queue_depth Operaciones en la cola del escritor agrupado",
+                      "# TYPE db_write_queue_depth gauge",
+                      f"db_write_queue_depth {self._cola.qsize()}",
+                      "# HELP db_write_operations_total Operaciones aplicadas por el escritor agrupado",
+                      "# TYPE db_write_operations_total counter"]
+            lineas += [f'db_write_operations_total{{result="{resultado}"}} {cantidad}'
+                       for resultado, cantidad in self.operaciones.items()]
+            lineas += ["# HELP db_write_batch_size Operaciones por transacción del escritor agrupado",
+                       "# TYPE db_write_batch_size histogram",
+                       *self.tamano_lote.lineas("db_write_batch_size", 'writer="agrupado"'),
+                       "# HELP db_write_batch_duration_seconds Duración de cada lote, hasta entregar los resultados",
+                       "# TYPE db_write_batch_duration_seconds histogram",
+                       *self.duracion_lote.lineas("db_write_batch_duration_seconds", 'writer="agrupado"')]
+        return "\n".join(lineas) + "\n"
+
+
+# Escritor del proceso; el lifespan lo inicia si DB_ESCRITOR_AGRUPADO está activo
+escritor = EscritorAgrupado(engine)
+
+
+def _aplicar_y_confirmar(session, aplicar, args):
+    despues = aplicar(session, *args)
+    session.commit()
+    return despues()
+
+
+async def escribir(session: Session | None, aplicar, *args):
+    """
+    Ejecuta una operación de escritura, agrupada o en la sesión de la petición.
+
+    Args:
+        session: Sesión de la petición, o None si el escritor agrupado está activo
+        aplicar: Función `aplicar(session, *args)` que hace las escrituras sin
+                 confirmar y devuelve la función posterior al commit
+        args: Argumentos de la operación
+
+    Returns:
+        El valor que devuelve la función posterior al commit
+    """
+    if session is None:
+        despues = await escritor.enviar(aplicar, *args)
+        return await anyio.to_thread.run_sync(despues)
+    return await anyio.to_thread.run_sync(_aplicar_y_confirmar, session, aplicar, args)
+
+
+async def get_session_agrupable(request: Request):
+    """
+    Sesión de escritura para los endpoints que admiten el escritor agrupado.
+
+    Con el escritor activo no abre sesión (devuelve None) ni ocupa un lugar del
+    pool: la petición solo espera su turno en la cola. Sin él, es `get_session`.
+
+    Yields:
+        Session | None: Sesión de SQLModel, o None si las escrituras se agrupan
+    """
+    if escritor.activo:
+        request.state.escritura = True
+        yield None
+        return
+    async with sesion_escritura(request) as session:
+        yield session
+
+
+# Sesión de escritura de los endpoints que se pueden agrupar (ver `escribir`)
+QueuedWriteSessionDep = Annotated[Session | None, Depends(get_session_agrupable)]
@@ -0,0 +1,156 @@
+"""
+Versionado de filas y ETags para GET condicionales.
+
+`Empleado` y `Proyecto` tienen una columna `version` que los endpoints de
+escritura incrementan. El ETag de una respuesta se calcula a partir de los
+pares (id, version) de todas las filas que la componen, incluyendo las filas
+relacionadas a través de `EmpleadoProyecto`: si cambia una fila o se agrega o
+quita una asignación, el conjunto cambia y con él el ETag.
+
+Calcular el ETag requiere solo una consulta sobre columnas indexadas, sin
+cargar las entidades ni serializar la respuesta; si coincide con el
+`If-None-Match` de la petición se responde 304 sin cuerpo.
+"""
+
+import hashlib
+
+from fastapi import Response
+from sqlalchemy import literal, select, union_all, update
+
+from app.models import Empleado, EmpleadoProyecto, Proyecto
+
+
+def incrementar_version(objeto):
+    """
+    Marca una entidad para incrementar su versión al confirmar la transacción.
+
+    Se asigna la expresión `version + 1` en lugar de un valor calculado en
+    Python, de modo que dos escrituras concurrentes no generen la misma versión.
+
+    Args:
+        objeto: Instancia de Empleado o Proyecto cargada en la sesión
+    """
+    objeto.version = type(objeto).version + 1
+
+
+def incrementar_versiones(session, entidad, ids):
+    """
+    Incrementa la versión de varias filas con una sola sentencia UPDATE.
+
+    Args:
+        session: Sesión de base de datos
+        entidad: Empleado o Proyecto
+        ids: Ids de las filas a incrementar
+    """
+    ids = set(ids)
+    if ids:
+        session.execute(update(entidad).where(entidad.id.in_(ids)).values(version=entidad.version + 1))
+
+
+def etag_de_versiones(filas) -> str:
+    """
+    Calcula un ETag débil a partir de tuplas de versiones.
+
+    Args:
+        filas: Tuplas que identifican el estado de la respuesta, p. ej. (tipo, id, version)
+
+    Returns:
+        str: ETag débil, p. ej. W/"3f2a..."
+    """
+    contenido = repr(sorted(tuple(fila) for fila in filas)).encode()
+    return f'W/"{hashlib.blake2b(contenido, digest_size=12).hexdigest()}"'
+
+
+def etag_coincide(if_none_match: str | None, etag: str) -> bool:
+    """
+    Indica si el encabezado If-None-Match coincide con el ETag (comparación débil).
+
+    Args:
+        if_none_match: Valor del encabezado (lista separada por comas o "*")
+        etag: ETag actual del recurso
+    """
+    if not if_none_match:
+        return False
+    candidatos = {valor.strip().removeprefix("W/") for valor in if_none_match.split(",")}
+    return "*" in candidatos or etag.removeprefix("W/") in candidatos
+
+
+def respuesta_no_modificada(etag: str) -> Response:
+    """Respuesta 304 sin cuerpo con el ETag actual."""
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def _etag_con_raiz(session, raiz: str, *consultas) -> str | None:
+    """
+    Ejecuta las consultas de versiones en un solo UNION ALL y calcula el ETag.
+
+    Returns:
+        str | None: ETag, o None si la entidad raíz no existe
+    """
+    filas = session.execute(union_all(*consultas)).all()
+    if not any(fila[0] == raiz for fila in filas):
+        return None
+    return etag_de_versiones(filas)
+
+
+def _select_versiones(entidad, tipo: str):
+    """SELECT (tipo, id, version) sobre una entidad versionada."""
+    return select(literal(tipo), entidad.id, entidad.version)
+
+
+def _version_empleado(empleado_id: int):
+    return _select_versiones(Empleado, "empleado").where(Empleado.id == empleado_id)
+
+
+def _version_proyecto(proyecto_id: int):
+    return _select_versiones(Proyecto, "proyecto").where(Proyecto.id == proyecto_id)
+
+
+def _proyectos_de_empleado(empleado_id: int):
+    return (_select_versiones(Proyecto, "miembro_de")
+            .join(EmpleadoProyecto, EmpleadoProyecto.proyecto_id == Proyecto.id)
+            .where(EmpleadoProyecto.empleado_id == empleado_id))
+
+
+def _empleados_de_proyecto(proyecto_id: int):
+    return (_select_versiones(Empleado, "miembro")
+            .join(EmpleadoProyecto, EmpleadoProyecto.empleado_id == Empleado.id)
+            .where(EmpleadoProyecto.proyecto_id == proyecto_id))
+
+
+def etag_empleado(session, empleado_id: int) -> str | None:
+    """ETag de GET /empleado/{id}: el empleado y los proyectos donde participa."""
+    return _etag_con_raiz(session, "empleado", _version_empleado(empleado_id), _proyectos_de_empleado(empleado_id))
+
+
+def etag_proyectos_del_empleado(session, empleado_id: int) -> str | None:
+    """ETag de GET /empleado/{id}/proyectos: además, los proyectos que gerencia."""
+    gerenciados = _select_versiones(Proyecto, "gerencia").where(Proyecto.gerente_id == empleado_id)
+    return _etag_con_raiz(session, "empleado", _version_empleado(empleado_id),
+                          _proyectos_de_empleado(empleado_id), gerenciados)
+
+
+def etag_proyecto(session, proyecto_id: int) -> str | None:
+    """ETag de GET /proyecto/{id}: el proyecto, su gerente y sus empleados."""
+    gerente = (_select_versiones(Empleado, "gerente")
+               .join(Proyecto, Proyecto.gerente_id == Empleado.id)
+               .where(Proyecto.id == proyecto_id))
+    return _etag_con_raiz(session, "proyecto", _version_proyecto(proyecto_id), gerente,
+                          _empleados_de_proyecto(proyecto_id))
+
+
+def etag_empleados_del_proyecto(session, proyecto_id: int) -> str | None:
+    """ETag de GET /proyecto/{id}/empleados: el proyecto y sus empleados."""
+    return _etag_con_raiz(session, "proyecto", _version_proyecto(proyecto_id), _empleados_de_proyecto(proyecto_id))
+
+
+def etag_de_pagina(items, next_cursor: str | None) -> str:
+    """ETag de una página de un listado: ids y versiones de sus elementos y el cursor siguiente."""
+    return etag_de_versiones([("item", item.id, item.version) for item in items] + [("cursor", next_cursor or "", 0)])
+
+
+def etag_con_campos(etag: str | None, campos: tuple[str, ...] | None) -> str | None:
+    """ETag de una representación con `fields=`, distinto del de la representación completa."""
+    if etag is None or not campos:
+        return etag
+    return etag_de_versiones([("etag", etag, 0), ("campos", ",".join(campos), 0)])
@@ -0,0 +1,60 @@
+"""
+Exportación en streaming (NDJSON) de los listados.
+
+Las filas se leen con un cursor del lado del servidor (`yield_per`) y se
+escriben en la respuesta lote a lote, de modo que la memoria usada es
+constante sin importar cuántas filas tenga la tabla. Las consultas
+seleccionan columnas (ver `app.serializacion.columnas`), y cada fila se
+codifica directamente a JSON sin crear objetos ORM ni volver a validarla.
+"""
+
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from starlette.concurrency import iterate_in_threadpool
+
+from app.database import engine_lectura, _limitador_lectura
+from app.serializacion import a_json
+
+TAMANO_LOTE_EXPORTACION = 1000
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+
+
+def _lotes_ndjson(session, query, tamano_lote: int):
+    """Genera las filas de la consulta como líneas JSON, un lote a la vez."""
+    resultado = session.exec(query.execution_options(yield_per=tamano_lote))
+    for lote in resultado.partitions():
+        yield b"".join(a_json(fila._asdict()) + b"\n" for fila in lote)
+
+
+async def _generar_ndjson(query, tamano_lote: int):
+    """
+    Envía la exportación con su propia sesión, sobre el motor de lectura.
+
+    Se ejecuta mientras se envía la respuesta, después de que el endpoint ya
+    retornó, y conserva la conexión hasta el final: por eso ocupa un lugar del
+    límite de sesiones de lectura durante todo el stream (ver `get_session`).
+    Las filas se leen en el threadpool.
+    """
+    async with _limitador_lectura:
+        with Session(engine_lectura) as session:
+            async for lote in iterate_in_threadpool(_lotes_ndjson(session, query, tamano_lote)):
+                yield lote
+
+
+def respuesta_ndjson(query, nombre_archivo: str, tamano_lote: int = TAMANO_LOTE_EXPORTACION) -> StreamingResponse:
+    """
+    Construye una respuesta NDJSON en streaming para una consulta `select`.
+
+    Args:
+        query: Consulta de columnas (`select(*columnas(Entidad))`) con los filtros ya aplicados
+        nombre_archivo: Nombre sugerido para la descarga
+        tamano_lote: Filas leídas de la base de datos por lote
+
+    Returns:
+        StreamingResponse: Respuesta con una línea JSON por fila
+    """
+    return StreamingResponse(
+        _generar_ndjson(query, tamano_lote),
+        media_type=MEDIA_TYPE_NDJSON,
+        headers={"Content-Disposition": f'attachment; filename="{nombre_archivo}"'},
+    )
@@ -0,0 +1,306 @@
+"""
+Índice en memoria del grafo de asignaciones (empleados ↔ proyectos).
+
+`EmpleadoProyecto` forma un grafo bipartito. El índice guarda sus listas de
+adyacencia en los dos sentidos (proyectos de cada empleado y empleados de
+cada proyecto), de modo que "¿con quién trabajó este empleado?" o "¿qué
+proyectos comparten integrantes con este?" se responden recorriendo
+memoria, sin una consulta por proyecto o por empleado.
+
+El índice se carga completo al iniciar la aplicación y luego se mantiene
+incrementalmente: antes de cada consulta se aplican, en orden de secuencia,
+los cambios de asignaciones del registro de cambios (`app.cambios`)
+posteriores al último aplicado. Es la única forma en que cambia: los
+endpoints de escritura no lo modifican directamente, ya que una
+modificación hecha fuera de ese orden podría deshacer un cambio posterior
+ya aplicado. Así también refleja lo que escribieron otros workers. Si pasó
+más de la mitad de la retención del registro sin sincronizar, se vuelve a
+cargar completo.
+
+`verificar` compara el índice con el mismo cálculo hecho en SQL con un
+self-join de `EmpleadoProyecto`.
+
+Uso:
+    python -m app.grafo                  # verifica todos los nodos
+    python -m app.grafo --muestra 500    # verifica 500 nodos al azar
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.models import Cambio, EmpleadoProyecto
+from app.serializacion import columnas
+
+
+def _a_dos_saltos(origen: int, ida: dict, vuelta: dict) -> Counter:
+    """
+    Nodos del mismo lado que `origen` a dos saltos en el grafo bipartito.
+
+    Returns:
+        Counter: Nodo -> cantidad de nodos intermedios (del otro lado) en común
+    """
+    conteo = Counter()
+    for intermedio in ida.get(origen, ()):
+        conteo.update(vuelta.get(intermedio, ()))
+    conteo.pop(origen, None)
+    return conteo
+
+
+def _cercanos(origen: int, ida: dict, vuelta: dict, profundidad: int) -> list[tuple[int, int, int]]:
+    """
+    Vecinos del mismo lado hasta la profundidad indicada (1 o 2).
+
+    A distancia 1, `en_comun` cuenta los nodos intermedios compartidos (p. ej.
+    proyectos en común); a distancia 2, los vecinos de distancia 1 a través de
+    los que se llega.
+
+    Returns:
+        list[tuple[int, int, int]]: (id, distancia, en_comun), por distancia,
+        luego más en común primero y luego id
+    """
+    nivel1 = _a_dos_saltos(origen, ida, vuelta)
+    resultado = [(nodo, 1, comun) for nodo, comun in nivel1.items()]
+    if profundidad >= 2:
+        nivel2 = Counter()
+        for vecino in nivel1:
+            nivel2.update(_a_dos_saltos(vecino, ida, vuelta).keys())
+        resultado += [(nodo, 2, comun) for nodo, comun in nivel2.items()
+                      if nodo != origen and nodo not in nivel1]
+    resultado.sort(key=lambda item: (item[1], -item[2], item[0]))
+    return resultado
+
+
+class IndiceAsignaciones:
+    """
+    Listas de adyacencia del grafo bipartito de asignaciones, seguras entre hilos.
+
+    Attributes:
+        proyectos_de: Empleado -> conjunto de proyectos donde está asignado
+        empleados_de: Proyecto -> conjunto de empleados asignados
+        secuencia: Última secuencia del registro de cambios aplicada
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.proyectos_de: dict[int, set[int]] = {}
+        self.empleados_de: dict[int, set[int]] = {}
+        self.secuencia = 0
+        self._cargado = False
+        self._sincronizado = 0.0
+
+    @property
+    def cargado(self) -> bool:
+        return self._cargado
+
+    def _agregar(self, proyecto_id: int, empleado_id: int):
+        self.proyectos_de.setdefault(empleado_id, set()).add(proyecto_id)
+        self.empleados_de.setdefault(proyecto_id, set()).add(empleado_id)
+
+    def _quitar(self, proyecto_id: int, empleado_id: int):
+        for adyacencia, nodo, vecino in ((self.proyectos_de, empleado_id, proyecto_id),
+                                         (self.empleados_de, proyecto_id, empleado_id)):
+            vecinos = adyacencia.get(nodo)
+            if vecinos is not None:
+                vecinos.discard(vecino)
+                if not vecinos:
+                    del adyacencia[nodo]
+
+    def cargar(self, conexion):
+        """
+        Carga el índice completo desde `EmpleadoProyecto`.
+
+        La secuencia del registro de cambios y las asignaciones se leen en la
+        misma transacción, así los cambios posteriores se aplican sobre una
+        foto consistente.
+
+        Args:
+            conexion: Conexión o sesión de base de datos
+        """
+        secuencia = conexion.execute(select(func.coalesce(func.max(Cambio.secuencia), 0))).scalar_one()
+        proyectos_de, empleados_de = {}, {}
+        for empleado_id, proyecto_id in conexion.execute(select(EmpleadoProyecto.empleado_id,
+                                                                EmpleadoProyecto.proyecto_id)):
+            proyectos_de.setdefault(empleado_id, set()).add(proyecto_id)
+            empleados_de.setdefault(proyecto_id, set()).add(empleado_id)
+        with self._lock:
+            self.proyectos_de, self.empleados_de = proyectos_de, empleados_de
+            self.secuencia = secuencia
+            self._cargado = True
+            self._sincronizado = time.monotonic()
+
+    def sincronizar(self, conexion):
+        """
+        Aplica los cambios de asignaciones registrados después de la última sincronización.
+
+        Carga el índice completo si todavía no se cargó o si pasó más de la
+        mitad de `CAMBIOS_RETENCION_HORAS` desde la última sincronización (los
+        cambios intermedios podrían haberse eliminado del registro).
+
+        Args:
+            conexion: Conexión o sesión de base de datos
+        """
+        retencion = settings.cambios_retencion_horas * 3600
+        if not self._cargado or (retencion and time.monotonic() - self._sincronizado > retencion / 2):
+            self.cargar(conexion)
+            return
+        cambios = conexion.execute(
+            select(Cambio.secuencia, Cambio.entidad, Cambio.entidad_id, Cambio.empleado_id, Cambio.operacion)
+            .where(Cambio.secuencia > self.secuencia).order_by(Cambio.secuencia)
+        ).all()
+        # Otro hilo pudo aplicar parte de estos cambios mientras se leían: se
+        # saltan los ya aplicados, así el índice solo avanza en orden de secuencia
+        with self._lock:
+            for secuencia, entidad, proyecto_id, empleado_id, operacion in cambios:
+                if secuencia <= self.secuencia:
+                    continue
+                if entidad == "asignacion" and operacion == "asignado":
+                    self._agregar(proyecto_id, empleado_id)
+                elif entidad == "asignacion" and operacion == "desasignado":
+                    self._quitar(proyecto_id, empleado_id)
+                self.secuencia = secuencia
+            self._sincronizado = time.monotonic()
+
+    def colaboradores(self, empleado_id: int, profundidad: int = 1) -> list[tuple[int, int, int]]:
+        """
+        Empleados que comparten (o, con profundidad 2, cuyos colaboradores comparten) proyectos con uno dado.
+
+        Returns:
+            list[tuple[int, int, int]]: (empleado_id, distancia, en_comun)
+        """
+        with self._lock:
+            return _cercanos(empleado_id, self.proyectos_de, self.empleados_de, profundidad)
+
+    def relacionados(self, proyecto_id: int, profundidad: int = 1) -> list[tuple[int, int, int]]:
+        """
+        Proyectos que comparten (o, con profundidad 2, cuyos relacionados comparten) integrantes con uno dado.
+
+        Returns:
+            list[tuple[int, int, int]]: (proyecto_id, distancia, en_comun)
+        """
+        with self._lock:
+            return _cercanos(proyecto_id, self.empleados_de, self.proyectos_de, profundidad)
+
+
+# Índice compartido por los endpoints del proceso
+indice_asignaciones = IndiceAsignaciones()
+
+
+def con_datos(session, entidad, modelo, vecinos: list[tuple[int, int, int]]) -> list[dict]:
+    """
+    Completa los vecinos del índice con sus datos, en una sola consulta `IN`.
+
+    Args:
+        session: Sesión de base de datos
+        entidad: Empleado o Proyecto
+        modelo: Esquema de respuesta (p. ej. Colaborador)
+        vecinos: (id, distancia, en_comun) en el orden de la respuesta
+
+    Returns:
+        list[dict]: Datos de cada vecino con `distancia` y `en_comun`, en el mismo orden
+    """
+    if not vecinos:
+        return []
+    filas = session.exec(select(*columnas(entidad, modelo)).where(entidad.id.in_([vecino[0] for vecino in vecinos])))
+    datos = {fila.id: fila._asdict() for fila in filas}
+    return [{**datos[nodo], "distancia": distancia, "en_comun": en_comun}
+            for nodo, distancia, en_comun in vecinos if nodo in datos]
+
+
+def colaboradores_sql(conexion, empleado_id: int) -> dict[int, int]:
+    """
+    Colaboradores de distancia 1 calculados con un self-join de EmpleadoProyecto.
+
+    Returns:
+        dict[int, int]: Empleado -> proyectos en común
+    """
+    otro = aliased(EmpleadoProyecto)
+    return dict(conexion.execute(
+        select(otro.empleado_id, func.count())
+        .select_from(EmpleadoProyecto)
+        .join(otro, otro.proyecto_id == EmpleadoProyecto.proyecto_id)
+        .where(EmpleadoProyecto.empleado_id == empleado_id, otro.empleado_id != empleado_id)
+        .group_by(otro.empleado_id)
+    ).all())
+
+
+def relacionados_sql(conexion, proyecto_id: int) -> dict[int, int]:
+    """
+    Proyectos relacionados de distancia 1 calculados con un self-join de EmpleadoProyecto.
+
+    Returns:
+        dict[int, int]: Proyecto -> integrantes en común
+    """
+    otro = aliased(EmpleadoProyecto)
+    return dict(conexion.execute(
+        select(otro.proyecto_id, func.count())
+        .select_from(EmpleadoProyecto)
+        .join(otro, otro.empleado_id == EmpleadoProyecto.empleado_id)
+        .where(EmpleadoProyecto.proyecto_id == proyecto_id, otro.proyecto_id != proyecto_id)
+        .group_by(otro.proyecto_id)
+    ).all())
+
+
+def verificar(conexion, indice: IndiceAsignaciones, muestra: int | None = None,
+              semilla: int = 0) -> list[str]:
+    """
+    Compara los vecinos de distancia 1 del índice con los calculados en SQL.
+
+    Args:
+        conexion: Conexión o sesión de base de datos
+        indice: Índice cargado
+        muestra: Si se indica, verifica solo esa cantidad de empleados y de proyectos al azar
+        semilla: Semilla para elegir la muestra
+
+    Returns:
+        list[str]: Descripción de cada diferencia encontrada (vacía si coinciden)
+    """
+    diferencias = []
+    azar = random.Random(semilla)
+    lados = (
+        ("Empleado", EmpleadoProyecto.empleado_id, indice.colaboradores, colaboradores_sql),
+        ("Proyecto", EmpleadoProyecto.proyecto_id, indice.relacionados, relacionados_sql),
+    )
+    for nombre, columna, desde_indice, desde_sql in lados:
+        nodos = conexion.execute(select(columna).distinct().order_by(columna)).scalars().all()
+        if muestra is not None and muestra < len(nodos):
+            nodos = azar.sample(nodos, muestra)
+        for nodo in nodos:
+            esperado = desde_sql(conexion, nodo)
+            obtenido = {vecino: comun for vecino, _, comun in desde_indice(nodo, 1)}
+            if obtenido != esperado:
+                faltan = sorted(set(esperado) - set(obtenido))
+                sobran = sorted(set(obtenido) - set(esperado))
+                diferencias.append(f"{nombre} {nodo}: faltan {faltan}, sobran {sobran}, "
+                                   f"{len(set(esperado) & set(obtenido))} en común")
+    return diferencias
+
+
+def main():
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Verificar el índice del grafo de asignaciones contra SQL")
+    parser.add_argument("--muestra", type=int, help="Verificar solo N empleados y N proyectos al azar")
+    args = parser.parse_args()
+    indice_verificado = IndiceAsignaciones()
+    with engine.connect() as conexion:
+        inicio = time.perf_counter()
+        indice_verificado.cargar(conexion)
+        print(f"Índice cargado en {(time.perf_counter() - inicio) * 1000:.1f} ms: "
+              f"{len(indice_verificado.proyectos_de)} empleados, {len(indice_verificado.empleados_de)} proyectos")
+        diferencias = verificar(conexion, indice_verificado, args.muestra)
+    for diferencia in diferencias:
+        print(diferencia)
+    print(f"{len(diferencias)} diferencia(s) encontrada(s)")
+    sys.exit(1 if diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+Importación de archivos CSV en streaming: empleados, proyectos y asignaciones.
+
+El archivo se lee fila a fila y se procesa en lotes de `TAMANO_LOTE_IMPORTACION`
+filas. Cada lote se valida con los mismos esquemas que los endpoints
+individuales (`EmpleadoCreate`, `ProyectoCreate`, con sus validadores de
+patrones), se verifica contra la base de datos con una consulta `IN` por
+regla y se inserta con sentencias multi-fila en su propia transacción (ver
+`app.carga_masiva`). Solo hay en memoria un lote a la vez, sin importar el
+tamaño del archivo.
+
+Las filas rechazadas no detienen la importación: se informan como eventos de
+error con su número de línea, junto con eventos de progreso después de cada
+lote (filas procesadas, creadas, con errores y filas por segundo).
+
+Columnas (la primera fila es el encabezado; las columnas extra se ignoran):
+- empleados: nombre, especialidad, salario, estado y, opcional, proyectos
+  (nombres de proyectos existentes separados por ";", a los que se asigna)
+- proyectos: nombre, descripcion, presupuesto, estado, gerente_id
+- asignaciones: empleado_id, proyecto_id
+
+Uso:
+    python -m app.importacion empleados empleados.csv --errores rechazados.csv
+"""
+
+import argparse
+import codecs
+import csv
+import sys
+import time
+from contextlib import nullcontext
+from itertools import chain, islice
+
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from starlette.concurrency import iterate_in_threadpool
+
+from app.cache import invalidar, claves_por_asignaciones, claves_por_proyectos
+from app.cambios import registrar, registrar_asignaciones
+from app.carga_masiva import validar_items, verificar_gerentes, insertar_en_lote, ids_existentes
+from app.database import engine, _limitador_sesiones
+from app.etag import incrementar_versiones
+from app.exportacion import MEDIA_TYPE_NDJSON
+from app.models import (Empleado, EmpleadoCreate, EmpleadoProyecto, ErrorItemBulk, Estado, FilaAsignacion, Proyecto,
+                        ProyectoCreate, ResumenProyecto)
+from app.resumenes import ajustar_equipo, ajustar_estado
+from app.serializacion import a_json
+
+TAMANO_LOTE_IMPORTACION = 1000
+
+# Tipo de importación -> columnas obligatorias del encabezado
+COLUMNAS = {
+    "empleados": ("nombre", "especialidad", "salario", "estado"),
+    "proyectos": ("nombre", "descripcion", "presupuesto", "estado", "gerente_id"),
+    "asignaciones": ("empleado_id", "proyecto_id"),
+}
+
+
+def _asignar(session, equipos: dict[int, list[int]]):
+    """Inserta asignaciones (proyecto -> empleados) y actualiza resúmenes, versiones y registro de cambios."""
+    if not equipos:
+        return
+    session.execute(insert(EmpleadoProyecto), [{"empleado_id": empleado_id, "proyecto_id": proyecto_id}
+                                               for proyecto_id, empleado_ids in equipos.items()
+                                               for empleado_id in empleado_ids])
+    for proyecto_id, empleado_ids in equipos.items():
+        ajustar_equipo(session, proyecto_id, empleado_ids)
+        registrar_asignaciones(session, "asignado", proyecto_id, empleado_ids)
+    incrementar_versiones(session, Proyecto, equipos)
+    incrementar_versiones(session, Empleado, (empleado_id for empleado_ids in equipos.values() for empleado_id in empleado_ids))
+
+
+def _importar_empleados(session, items: list[dict]):
+    proyectos_por_item = [list(dict.fromkeys(nombre.strip() for nombre in (item.get("proyectos") or "").split(";")
+                                             if nombre.strip()))
+                          for item in items]
+    validos, errores = validar_items(items, EmpleadoCreate)
+    nombres = {nombre for indice, _ in validos for nombre in proyectos_por_item[indice]}
+    proyecto_ids = dict(session.exec(select(Proyecto.nombre, Proyecto.id).where(Proyecto.nombre.in_(nombres))).all()) if nombres else {}
+    aceptados = []
+    for indice, item in validos:
+        faltantes = [nombre for nombre in proyectos_por_item[indice] if nombre not in proyecto_ids]
+        if faltantes:
+            errores.append(ErrorItemBulk(indice=indice, codigo=404, detalle=f"Proyectos no encontrados: {', '.join(faltantes)}"))
+        else:
+            aceptados.append((indice, item))
+    ids = insertar_en_lote(session, Empleado, [item.model_dump() for _, item in aceptados])
+    registrar(session, "empleado", "creado", ids)
+    equipos = {}
+    for (indice, _), empleado_id in zip(aceptados, ids):
+        for nombre in proyectos_por_item[indice]:
+            equipos.setdefault(proyecto_ids[nombre], []).append(empleado_id)
+    _asignar(session, equipos)
+    return len(ids), errores, set(), equipos
+
+
+def _importar_proyectos(session, items: list[dict]):
+    validos, errores = validar_items(items, ProyectoCreate)
+    validos = verificar_gerentes(session, validos, errores)
+    nombres = {item.nombre for _, item in validos}
+    existentes = set(session.exec(select(Proyecto.nombre).where(Proyecto.nombre.in_(nombres))).all()) if nombres else set()
+    nuevos, vistos, cambios_estado = [], set(), {estado: [0, 0.0] for estado in Estado}
+    for indice, item in validos:
+        if item.nombre in existentes:
+            errores.append(ErrorItemBulk(indice=indice, codigo=409, detalle=f"Ya existe un proyecto con el nombre '{item.nombre}'"))
+        elif item.nombre in vistos:
+            errores.append(ErrorItemBulk(indice=indice, codigo=409, detalle=f"El nombre '{item.nombre}' está repetido en el lote"))
+        else:
+            vistos.add(item.nombre)
+            nuevos.append((indice, item))
+            cambios_estado[item.estado][0] += 1
+            cambios_estado[item.estado][1] += item.presupuesto
+    claves = claves_por_proyectos(session, [], gerente_ids={item.gerente_id for _, item in nuevos})
+    ids = insertar_en_lote(session, Proyecto, [item.model_dump() for _, item in nuevos])
+    if ids:
+        session.execute(insert(ResumenProyecto), [{"proyecto_id": proyecto_id} for proyecto_id in ids])
+    registrar(session, "proyecto", "creado", ids)
+    for estado, (cantidad, presupuesto) in cambios_estado.items():
+        ajustar_estado(session, estado, cantidad, presupuesto)
+    return len(ids), errores, claves, {}
+
+
+def _importar_asignaciones(session, items: list[dict]):
+    validos, errores = validar_items(items, FilaAsignacion)
+    empleados = ids_existentes(session, Empleado.id, (item.empleado_id for _, item in validos))
+    proyectos = ids_existentes(session, Proyecto.id, (item.proyecto_id for _, item in validos))
+    pares = {(item.empleado_id, item.proyecto_id) for _, item in validos
+             if item.empleado_id in empleados and item.proyecto_id in proyectos}
+    ya_asignadas = set(session.exec(select(EmpleadoProyecto.empleado_id, EmpleadoProyecto.proyecto_id).where(
+        tuple_(EmpleadoProyecto.empleado_id, EmpleadoProyecto.proyecto_id).in_(pares))).all()) if pares else set()
+    equipos, vistas = {}, set()
+    for indice, item in validos:
+        par = (item.empleado_id, item.proyecto_id)
+        if item.empleado_id not in empleados:
+            errores.append(ErrorItemBulk(indice=indice, codigo=404, detalle=f"Empleado con id {item.empleado_id} no encontrado"))
+        elif item.proyecto_id not in proyectos:
+            errores.append(ErrorItemBulk(indice=indice, codigo=404, detalle=f"Proyecto con id {item.proyecto_id} no encontrado"))
+        elif par in ya_asignadas or par in vistas:
+            errores.append(ErrorItemBulk(indice=indice, codigo=409,
+                                         detalle=f"El empleado {item.empleado_id} ya está asignado al proyecto {item.proyecto_id}"))
+        else:
+            vistas.add(par)
+            equipos.setdefault(item.proyecto_id, []).append(item.empleado_id)
+    _asignar(session, equipos)
+    return len(vistas), errores, set(), equipos
+
+
+# Tipo -> función que procesa un lote sin confirmar y devuelve
+# (creados, errores por posición en el lote, claves de caché afectadas, asignaciones por proyecto)
+IMPORTADORES = {
+    "empleados": _importar_empleados,
+    "proyectos": _importar_proyectos,
+    "asignaciones": _importar_asignaciones,
+}
+
+
+def leer_csv(lineas, tipo: str):
+    """
+    Lee el encabezado de un CSV y devuelve sus filas de forma perezosa.
+
+    Args:
+        lineas: Iterable de líneas de texto (p. ej. un archivo abierto con newline="")
+        tipo: "empleados", "proyectos" o "asignaciones"
+
+    Returns:
+        Iterator[tuple[int, dict]]: (línea donde empieza, valores por columna) de cada fila
+
+    Raises:
+        HTTPException 400: Si el archivo está vacío, el encabezado no se puede leer o le faltan columnas
+
+    Note:
+        Si una fila no se puede leer (p. ej. un valor más largo que
+        `csv.field_size_limit()` o un byte NUL), se entrega como último elemento
+        `(línea, csv.Error)` y la lectura termina: el resto del archivo ya no se
+        puede separar en filas de forma confiable.
+    """
+    lector = csv.reader(lineas)
+    try:
+        encabezado = next(lector, None)
+    except csv.Error as error:
+        raise HTTPException(status_code=400, detail=f"No se pudo leer el encabezado: {error}")
+    if not encabezado:
+        raise HTTPException(status_code=400, detail="El archivo CSV está vacío")
+    faltantes = [columna for columna in COLUMNAS[tipo] if columna not in encabezado]
+    if faltantes:
+        raise HTTPException(status_code=400, detail=f"Faltan columnas en el encabezado: {', '.join(faltantes)}. "
+                                                    f"Se requieren: {', '.join(COLUMNAS[tipo])}")
+    return _filas(lector, encabezado)
+
+
+def _filas(lector, encabezado: list[str]):
+    # `line_num` es la línea donde termina el último registro leído; un valor
+    # entre comillas puede ocupar varias líneas, así que el número de cada fila
+    # se toma antes de leerla. Las líneas vacías se saltan, como en DictReader.
+    inicio = lector.line_num + 1
+    while True:
+        try:
+            valores = next(lector)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield inicio, error
+            return
+        if valores:
+            yield inicio, dict(zip(encabezado, valores))
+        inicio = lector.line_num + 1
+
+
+def _importar_lote(session, importar_lote, items: list[dict]):
+    """
+    Importa y confirma un lote; ante un choque con una escritura concurrente, reintenta.
+
+    El primer reintento repite el lote completo: sus verificaciones ya ven la
+    escritura concurrente y rechazan solo las filas afectadas. Si vuelve a
+    chocar, el lote se importa fila por fila y solo las filas que chocan se
+    informan con código 409.
+    """
+    for _ in range(2):
+        try:
+            resultado = importar_lote(session, items)
+            session.commit()
+            return resultado
+        except IntegrityError:
+            session.rollback()
+    creadas, errores, claves, equipos = 0, [], set(), {}
+    for indice, item in enumerate(items):
+        try:
+            creadas_fila, errores_fila, claves_fila, equipos_fila = importar_lote(session, [item])
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            errores.append(ErrorItemBulk(indice=indice, codigo=409,
+                                         detalle="Conflicto con una escritura concurrente; reintente la fila"))
+            continue
+        creadas += creadas_fila
+        errores += [ErrorItemBulk(indice=indice, codigo=error.codigo, detalle=error.detalle) for error in errores_fila]
+        claves |= claves_fila
+        for proyecto_id, empleado_ids in equipos_fila.items():
+            equipos.setdefault(proyecto_id, []).extend(empleado_ids)
+    return creadas, errores, claves, equipos
+
+
+def importar(session, tipo: str, filas, tamano_lote: int = TAMANO_LOTE_IMPORTACION):
+    """
+    Importa filas en lotes, cada uno en su propia transacción.
+
+    Después de confirmar cada lote invalida las claves de caché afectadas (el
+    índice de asignaciones de `app.grafo` se pone al día desde el registro de
+    cambios). Si un lote choca con
+    una escritura concurrente (p. ej. otro proceso creó un proyecto con el
+    mismo nombre), se revierte y se reintenta (ver `_importar_lote`).
+
+    Una fila que no se puede leer como CSV se informa con código 400 y termina
+    la importación; las filas anteriores se importan igual y siempre se envía
+    el evento de fin.
+
+    Args:
+        session: Sesión de base de datos
+        tipo: "empleados", "proyectos" o "asignaciones"
+        filas: (número de línea, valores) de cada fila (ver `leer_csv`)
+        tamano_lote: Filas por transacción
+
+    Yields:
+        dict: Eventos `{"evento": "error", "linea", "codigo", "detalle"}` por cada
+        fila rechazada, `{"evento": "progreso", ...}` después de cada lote y
+        `{"evento": "fin", ...}` al terminar, con `procesadas`, `creadas`,
+        `errores`, `segundos` y `filas_s`
+    """
+    importar_lote = IMPORTADORES[tipo]
+    progreso = {"procesadas": 0, "creadas": 0, "errores": 0}
+    inicio = time.perf_counter()
+    filas = iter(filas)
+    while lote := list(islice(filas, tamano_lote)):
+        # Una fila ilegible solo puede ser la última (ver `leer_csv`)
+        ilegible = isinstance(lote[-1][1], csv.Error)
+        items = [fila for _, fila in (lote[:-1] if ilegible else lote)]
+        creadas, errores, claves, equipos = _importar_lote(session, importar_lote, items) if items else (0, [], set(), {})
+        if ilegible:
+            errores.append(ErrorItemBulk(indice=len(items), codigo=400,
+                                         detalle=f"Fila ilegible ({lote[-1][1]}); se detiene la importación"))
+        invalidar(claves)
+        for proyecto_id, empleado_ids in equipos.items():
+            invalidar(claves_por_asignaciones(proyecto_id, empleado_ids))
+        for error in sorted(errores, key=lambda error: error.indice):
+            yield {"evento": "error", "linea": lote[error.indice][0], "codigo": error.codigo, "detalle": error.detalle}
+        progreso["procesadas"] += len(lote)
+        progreso["creadas"] += creadas
+        progreso["errores"] += len(errores)
+        yield {"evento": "progreso", **progreso, **_velocidad(progreso, inicio)}
+    yield {"evento": "fin", **progreso, **_velocidad(progreso, inicio)}
+
+
+def _velocidad(progreso: dict, inicio: float) -> dict:
+    segundos = time.perf_counter() - inicio
+    return {"segundos": round(segundos, 3), "filas_s": round(progreso["procesadas"] / segundos, 1) if segundos else 0.0}
+
+
+def _limite_linea(columnas: int) -> int:
+    """Máximo de caracteres de una línea: cada columna con el valor más largo que admite `csv`."""
+    return csv.field_size_limit() * max(columnas, 1)
+
+
+def _lineas(bloques, decodificador, pendiente: str = "", limite: int | None = None):
+    """
+    Decodifica bloques de bytes y los entrega como líneas (con su "\\n").
+
+    Raises:
+        csv.Error: Si se acumulan más de `limite` caracteres sin un salto de
+                   línea, en lugar de guardar en memoria el resto del cuerpo
+    """
+    for bloque in bloques:
+        pendiente += decodificador.decode(bloque)
+        *lineas, pendiente = pendiente.split("\n")
+        for linea in lineas:
+            yield linea + "\n"
+        if limite is not None and len(pendiente) > limite:
+            raise csv.Error(f"línea de más de {limite} caracteres")
+    pendiente += decodificador.decode(b"", final=True)
+    if pendiente:
+        yield pendiente
+
+
+def _bloques_restantes(bloques):
+    # Se ejecuta en el threadpool mientras se envía la respuesta: cada bloque
+    # del cuerpo se pide al event loop, de a uno, a medida que hacen falta filas.
+    while True:
+        try:
+            yield anyio.from_thread.run(bloques.__anext__)
+        except StopAsyncIteration:
+            return
+
+
+class _RespuestaImportacion(StreamingResponse):
+    """
+    StreamingResponse que no escucha la desconexión del cliente en paralelo.
+
+    Con servidores ASGI anteriores a la especificación 2.4, StreamingResponse
+    lee `receive` mientras envía la respuesta para detectar la desconexión, y
+    consumiría los mensajes del cuerpo que la importación todavía está
+    leyendo. Aquí la desconexión se detecta al leer el cuerpo (ClientDisconnect)
+    o al enviar la respuesta.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def _generar_eventos(tipo: str, filas, tamano_lote: int):
+    """
+    Importa las filas y escribe cada evento como una línea JSON.
+
+    La sesión ocupa un lugar del límite de sesiones de escritura durante toda la
+    importación, como las de `get_session`; la importación corre en el threadpool.
+    """
+    async with _limitador_sesiones:
+        with Session(engine) as session:
+            async for evento in iterate_in_threadpool(importar(session, tipo, filas, tamano_lote)):
+                yield a_json(evento) + b"\n"
+
+
+async def respuesta_importacion(request: Request, tipo: str, tamano_lote: int = TAMANO_LOTE_IMPORTACION) -> StreamingResponse:
+    """
+    Importa el CSV del cuerpo de la petición y responde con sus eventos en NDJSON, a medida que avanza.
+
+    El encabezado se lee y valida antes de responder, de modo que un archivo
+    con columnas faltantes recibe un 400. El resto del cuerpo se lee en
+    streaming mientras se importa: ni el archivo ni el reporte de errores se
+    guardan completos en memoria.
+
+    Args:
+        request: Petición con el CSV como cuerpo (UTF-8)
+        tipo: "empleados", "proyectos" o "asignaciones"
+        tamano_lote: Filas por transacción
+
+    Returns:
+        StreamingResponse: Eventos de error, progreso y fin (ver `importar`)
+
+    Raises:
+        HTTPException 400: Si el archivo está vacío, la primera línea supera
+                           `csv.field_size_limit()` caracteres o al encabezado le faltan columnas
+    """
+    request.state.escritura = True
+    bloques = request.stream()
+    # Los bytes inválidos se reemplazan y la fila se rechaza al validarla
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pendiente = ""
+    async for bloque in bloques:
+        pendiente += decodificador.decode(bloque)
+        if "\n" in pendiente:
+            break
+        if len(pendiente) > csv.field_size_limit():
+            raise HTTPException(status_code=400, detail="La primera línea del archivo no es un encabezado CSV: "
+                                                        f"supera los {csv.field_size_limit()} caracteres")
+    encabezado, _, resto = pendiente.partition("\n")
+    # Ninguna línea puede superar el largo máximo de sus columnas, así el
+    # cuerpo se lee por partes aunque no tenga saltos de línea
+    limite = _limite_linea(encabezado.count(",") + 1)
+    filas = leer_csv(chain([encabezado + "\n"], _lineas(_bloques_restantes(bloques), decodificador, resto, limite)), tipo)
+    return _RespuestaImportacion(_generar_eventos(tipo, filas, tamano_lote), media_type=MEDIA_TYPE_NDJSON)
+
+
+def _texto_progreso(evento: dict) -> str:
+    return (f"{evento['procesadas']} filas procesadas: {evento['creadas']} creadas, {evento['errores']} con errores "
+            f"({evento['filas_s']:.0f} filas/s, {evento['segundos']:.1f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar empleados, proyectos o asignaciones desde un archivo CSV")
+    parser.add_argument("tipo", choices=list(COLUMNAS), help="Qué contiene el archivo")
+    parser.add_argument("archivo", help="Archivo CSV (UTF-8) con encabezado")
+    parser.add_argument("--errores", help="Archivo CSV para el reporte de filas rechazadas (por defecto, la salida estándar)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE_IMPORTACION, help="Filas por transacción")
+    args = parser.parse_args()
+    salida = open(args.errores, "w", newline="", encoding="utf-8") if args.errores else nullcontext(sys.stdout)
+    with open(args.archivo, newline="", encoding="utf-8-sig") as entrada, salida as reporte, Session(engine) as session:
+        try:
+            filas = leer_csv(entrada, args.tipo)
+        except HTTPException as error:
+            print(error.detail, file=sys.stderr)
+            sys.exit(2)
+        escritor_reporte = csv.writer(reporte)
+        escritor_reporte.writerow(["linea", "codigo", "detalle"])
+        ultimo_aviso = time.monotonic()
+        for evento in importar(session, args.tipo, filas, args.lote):
+            if evento["evento"] == "error":
+                escritor_reporte.writerow([evento["linea"], evento["codigo"], evento["detalle"]])
+            elif evento["evento"] == "fin" or time.monotonic() - ultimo_aviso >= 1:
+                print(_texto_progreso(evento), file=sys.stderr)
+                ultimo_aviso = time.monotonic()
+    sys.exit(1 if evento["errores"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
-from fastapi import FastAPI
-from app.database import create_tables
-from app.routes import empleado, proyecto
+from fastapi import FastAPI, Response
+from app.config import settings
+from app.arranque import lifespan
+from app.routes import cambios, consulta, empleado, proyecto
+from app.cache import obtener_backend
+from app.metricas import MiddlewareMetricas, metricas, MEDIA_TYPE_PROMETHEUS
+from app.database import MiddlewareLeerEscrituras
+from app.escritor import escritor
 
 app = FastAPI(
     title="Sistema de Gestión de Proyectos",
-    description="API REST para gestión de proyectos y empleados con FastAPI y SQLModel")
+    description="API REST para gestión de proyectos y empleados con FastAPI y SQLModel",
+    lifespan=lifespan)
 
-create_tables()
+if settings.leer_escrituras_segundos > 0:
+    app.add_middleware(MiddlewareLeerEscrituras)
+if settings.metricas_habilitadas:
+    app.add_middleware(MiddlewareMetricas)
 
 app.include_router(empleado.router)
 app.include_router(proyecto.router)
+app.include_router(cambios.router)
+app.include_router(consulta.router)
 
 
 @app.get("/", tags=["Root"])
@@ -27,3 +38,31 @@ async def root():
         "docs": "/docs",
         "redoc": "/redoc",
     }
+
+
+@app.get("/cache/estadisticas", tags=["Root"])
+async def estadisticas_cache():
+    """
+    Estadísticas de la caché de respuestas de los endpoints de detalle.
+
+    Returns:
+        dict: Entradas, aciertos, fallos, tasa de aciertos e invalidaciones
+    """
+    return obtener_backend().estadisticas()
+
+
+@app.get("/metrics", tags=["Root"], response_class=Response,
+         responses={200: {"content": {"text/plain": {}}}})
+async def exportar_metricas():
+    """
+    Métricas por ruta en formato de texto de Prometheus.
+
+    Incluye, por método y plantilla de ruta: peticiones por código de estado e
+    histogramas de latencia, tiempo en la base de datos, sentencias SQL por
+    petición y tamaño de la respuesta. Con el escritor agrupado activo, también
+    la profundidad de su cola y el tamaño y la duración de sus lotes.
+
+    Returns:
+        Response: Métricas en formato text/plain (versión 0.0.4)
+    """
+    return Response(content=metricas.exportar() + escritor.exportar(), media_type=MEDIA_TYPE_PROMETHEUS)
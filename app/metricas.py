@@ -0,0 +1,315 @@
+"""
+Métricas por ruta: latencia, sentencias SQL, tiempo en la base de datos y tamaño de respuesta.
+
+Dos piezas trabajan juntas:
+
+- `MiddlewareMetricas` (middleware ASGI de la aplicación) crea un
+  `RegistroPeticion` por petición y lo deja en una variable de contexto; al
+  enviarse el último fragmento del cuerpo registra la petición bajo la
+  plantilla de la ruta (p. ej. `/proyecto/{proyecto_id}`, no el id concreto).
+- `instrumentar_engine` registra hooks `before/after_cursor_execute` en el
+  motor, que suman cada sentencia y su duración al registro de la petición en
+  curso. La variable de contexto se copia a los hilos donde FastAPI ejecuta
+  los endpoints síncronos y los generadores de streaming, así que las
+  consultas se atribuyen a la petición correcta.
+
+Comparar la latencia total con el tiempo en la base de datos indica si el
+tiempo se va en SQL o en Python (validación, serialización); una cantidad de
+sentencias que crece con el tamaño de la respuesta delata cargas perezosas
+de relaciones (N+1).
+
+Las métricas se exponen en formato de texto de Prometheus en `GET /metrics`.
+Con `METRICAS_LENTO_MS` > 0, las peticiones más lentas que ese umbral se
+registran en el logger `app.metricas` junto con las sentencias SQL que emitieron.
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger("app.metricas")
+
+MEDIA_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites superiores de los buckets de cada histograma
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SENTENCIAS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Sentencias guardadas por petición para el log de peticiones lentas
+MAX_SENTENCIAS_LOG = 50
+MAX_LARGO_SENTENCIA = 500
+
+# Ruta de las peticiones que no coinciden con ningún endpoint de la API
+SIN_RUTA = "sin_ruta"
+
+
+class RegistroPeticion:
+    """
+    Contadores de una petición en curso.
+
+    Attributes:
+        sentencias: Cantidad de sentencias SQL ejecutadas
+        tiempo_db: Segundos acumulados ejecutando sentencias
+        detalle: (sentencia, segundos) de las primeras sentencias, si se guarda para el log
+    """
+
+    __slots__ = ("sentencias", "tiempo_db", "detalle")
+
+    def __init__(self, guardar_detalle: bool):
+        self.sentencias = 0
+        self.tiempo_db = 0.0
+        self.detalle = [] if guardar_detalle else None
+
+    def agregar_sentencia(self, sentencia: str, duracion: float):
+        self.sentencias += 1
+        self.tiempo_db += duracion
+        if self.detalle is not None and len(self.detalle) < MAX_SENTENCIAS_LOG:
+            self.detalle.append((sentencia[:MAX_LARGO_SENTENCIA], duracion))
+
+
+_registro_actual: ContextVar[RegistroPeticion | None] = ContextVar("registro_peticion", default=None)
+
+
+class Histograma:
+    """Histograma acumulado de Prometheus (buckets, suma y cantidad)."""
+
+    __slots__ = ("limites", "cuentas", "suma", "cantidad")
+
+    def __init__(self, limites: tuple):
+        self.limites = limites
+        self.cuentas = [0] * len(limites)
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor: float):
+        for indice, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.cuentas[indice] += 1
+                break
+        self.suma += valor
+        self.cantidad += 1
+
+    def lineas(self, nombre: str, etiquetas: str) -> list[str]:
+        lineas = []
+        acumulado = 0
+        for limite, cuenta in zip(self.limites, self.cuentas):
+            acumulado += cuenta
+            lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+        lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {self.cantidad}')
+        lineas.append(f"{nombre}_sum{{{etiquetas}}} {round(self.suma, 6)}")
+        lineas.append(f"{nombre}_count{{{etiquetas}}} {self.cantidad}")
+        return lineas
+
+
+class MetricasRuta:
+    """Métricas acumuladas de una ruta (método + plantilla)."""
+
+    __slots__ = ("respuestas", "latencia", "tiempo_db", "sentencias", "tamano")
+
+    def __init__(self):
+        self.respuestas: dict[int, int] = {}
+        self.latencia = Histograma(BUCKETS_LATENCIA)
+        self.tiempo_db = Histograma(BUCKETS_LATENCIA)
+        self.sentencias = Histograma(BUCKETS_SENTENCIAS)
+        self.tamano = Histograma(BUCKETS_BYTES)
+
+
+# (nombre, ayuda, atributo de MetricasRuta)
+_HISTOGRAMAS = (
+    ("http_request_duration_seconds", "Latencia de las peticiones por ruta", "latencia"),
+    ("db_duration_seconds", "Tiempo en la base de datos por petición", "tiempo_db"),
+    ("db_statements_per_request", "Sentencias SQL por petición", "sentencias"),
+    ("http_response_size_bytes", "Tamaño del cuerpo de la respuesta", "tamano"),
+)
+
+
+class Metricas:
+    """
+    Registro de métricas de todas las rutas, seguro para uso desde varios hilos.
+    """
+
+    def __init__(self):
+        self._rutas: dict[tuple[str, str], MetricasRuta] = {}
+        self._lock = threading.Lock()
+        self._inicio_arranque: float | None = None
+        self.duracion_arranque: float | None = None
+        self.primera_respuesta: float | None = None
+
+    def marcar_arranque(self, inicio: float, duracion: float):
+        """
+        Registra cuándo empezó el arranque y cuánto tardó (ver `app.arranque`).
+
+        Args:
+            inicio: `time.perf_counter()` al comenzar el arranque
+            duracion: Segundos hasta que la aplicación quedó lista
+        """
+        with self._lock:
+            self._inicio_arranque = inicio
+            self.duracion_arranque = duracion
+            self.primera_respuesta = None
+
+    def registrar(self, metodo: str, ruta: str, estado: int, latencia: float, registro: RegistroPeticion, tamano: int):
+        """
+        Registra una petición terminada.
+
+        Args:
+            metodo: Método HTTP
+            ruta: Plantilla de la ruta (o SIN_RUTA)
+            estado: Código de estado de la respuesta
+            latencia: Segundos desde que llegó la petición hasta el último byte de la respuesta
+            registro: Sentencias y tiempo en la base de datos de la petición
+            tamano: Bytes del cuerpo de la respuesta
+        """
+        with self._lock:
+            metricas = self._rutas.get((metodo, ruta))
+            if metricas is None:
+                metricas = self._rutas[(metodo, ruta)] = MetricasRuta()
+            metricas.respuestas[estado] = metricas.respuestas.get(estado, 0) + 1
+            metricas.latencia.observar(latencia)
+            metricas.tiempo_db.observar(registro.tiempo_db)
+            metricas.sentencias.observar(registro.sentencias)
+            metricas.tamano.observar(tamano)
+            primera = self.primera_respuesta is None and self._inicio_arranque is not None
+            if primera:
+                self.primera_respuesta = time.perf_counter() - self._inicio_arranque
+        if primera:
+            logger.info("Primera respuesta (%s %s) a los %.1f ms del inicio del arranque",
+                        metodo, ruta, self.primera_respuesta * 1000)
+
+    def exportar(self) -> str:
+        """
+        Devuelve las métricas en formato de texto de Prometheus.
+
+        Returns:
+            str: Una familia de métricas por bloque, con sus líneas HELP y TYPE
+        """
+        with self._lock:
+            rutas = sorted(self._rutas.items())
+            lineas = [
+                "# HELP http_requests_total Peticiones por ruta y código de estado",
+                "# TYPE http_requests_total counter",
+            ]
+            for (metodo, ruta), metricas in rutas:
+                for estado, cantidad in sorted(metricas.respuestas.items()):
+                    lineas.append(f'http_requests_total{{method="{metodo}",route="{ruta}",status="{estado}"}} {cantidad}')
+            for nombre, ayuda, atributo in _HISTOGRAMAS:
+                lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} histogram"]
+                for (metodo, ruta), metricas in rutas:
+                    lineas += getattr(metricas, atributo).lineas(nombre, f'method="{metodo}",route="{ruta}"')
+            if self.duracion_arranque is not None:
+                lineas += ["# HELP app_startup_seconds Duración del arranque (verificación del esquema y calentamiento)",
+                           "# TYPE app_startup_seconds gauge",
+                           f"app_startup_seconds {round(self.duracion_arranque, 6)}"]
+            if self.primera_respuesta is not None:
+                lineas += ["# HELP app_time_to_first_response_seconds Desde el inicio del arranque hasta la primera respuesta",
+                           "# TYPE app_time_to_first_response_seconds gauge",
+                           f"app_time_to_first_response_seconds {round(self.primera_respuesta, 6)}"]
+        return "\n".join(lineas) + "\n"
+
+    def reiniciar(self):
+        """Descarta las métricas acumuladas por ruta."""
+        with self._lock:
+            self._rutas.clear()
+
+
+metricas = Metricas()
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_sentencias", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["inicio_sentencias"].pop()
+    registro = _registro_actual.get()
+    if registro is not None:
+        registro.agregar_sentencia(statement, time.perf_counter() - inicio)
+
+
+def _error_al_ejecutar(contexto_error):
+    if contexto_error.connection is not None and contexto_error.connection.info.get("inicio_sentencias"):
+        contexto_error.connection.info["inicio_sentencias"].pop()
+
+
+def instrumentar_engine(engine):
+    """
+    Registra los hooks que atribuyen cada sentencia SQL a la petición en curso.
+
+    Las sentencias ejecutadas fuera de una petición (migraciones, scripts) no se cuentan.
+
+    Args:
+        engine: Motor de SQLAlchemy
+    """
+    event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+    event.listen(engine, "handle_error", _error_al_ejecutar)
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mide cada petición HTTP y la registra en `metricas`.
+
+    Se implementa como middleware ASGI puro (no `BaseHTTPMiddleware`) para
+    medir hasta el último fragmento de las respuestas en streaming y para que
+    la variable de contexto llegue a los endpoints sin copias intermedias.
+    """
+
+    def __init__(self, app, umbral_lento_ms: int = settings.metricas_lento_ms):
+        self.app = app
+        self.umbral_lento = umbral_lento_ms / 1000 if umbral_lento_ms > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        registro = RegistroPeticion(guardar_detalle=self.umbral_lento is not None)
+        token = _registro_actual.set(registro)
+        inicio = time.perf_counter()
+        estado = 500
+        tamano = 0
+        registrado = False
+
+        def terminar():
+            nonlocal registrado
+            if registrado:
+                return
+            registrado = True
+            latencia = time.perf_counter() - inicio
+            ruta = scope.get("route")
+            plantilla = ruta.path if ruta is not None else SIN_RUTA
+            metricas.registrar(scope["method"], plantilla, estado, latencia, registro, tamano)
+            if self.umbral_lento is not None and latencia >= self.umbral_lento:
+                _log_peticion_lenta(scope, plantilla, estado, latencia, registro)
+
+        async def enviar(mensaje):
+            nonlocal estado, tamano
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            elif mensaje["type"] == "http.response.body":
+                tamano += len(mensaje.get("body", b""))
+                if not mensaje.get("more_body", False):
+                    terminar()
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # Respuestas interrumpidas (excepción o cliente desconectado)
+            terminar()
+            _registro_actual.reset(token)
+
+
+def _log_peticion_lenta(scope, plantilla: str, estado: int, latencia: float, registro: RegistroPeticion):
+    ruta = scope["path"] + (f"?{scope['query_string'].decode('latin-1')}" if scope.get("query_string") else "")
+    lineas = [f"Petición lenta: {scope['method']} {ruta} ({plantilla}) -> {estado} en {latencia * 1000:.1f} ms, "
+              f"{registro.sentencias} sentencia(s) SQL en {registro.tiempo_db * 1000:.1f} ms"]
+    lineas += [f"  [{duracion * 1000:.2f} ms] {sentencia}" for sentencia, duracion in registro.detalle]
+    if registro.sentencias > len(registro.detalle):
+        lineas.append(f"  ... {registro.sentencias - len(registro.detalle)} sentencia(s) más")
+    logger.warning("\n".join(lineas))
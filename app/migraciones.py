@@ -0,0 +1,235 @@
+"""
+Migraciones del esquema de la base de datos.
+
+Cada migración tiene un número de versión y se aplica una sola vez; la
+versión actual se guarda en la tabla `version_esquema`. Así una base de
+datos existente (p. ej. un `Proyectos.db` creado antes de agregar índices)
+se lleva al esquema actual sin perder datos.
+
+Uso:
+    python -m app.migraciones              # aplica las migraciones pendientes
+    python -m app.migraciones --verificar  # solo informa la versión actual
+"""
+
+import argparse
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, exists, func, insert, inspect, select, text
+from sqlalchemy.schema import CreateTable
+from sqlmodel import SQLModel
+
+from app import models  # registra las tablas en SQLModel.metadata
+from app.busqueda import crear_indices as crear_indices_busqueda
+from app.resumenes import reconstruir as reconstruir_resumenes
+
+_metadata_version = MetaData()
+
+version_esquema = Table(
+    "version_esquema",
+    _metadata_version,
+    Column("version", Integer, primary_key=True),
+    Column("descripcion", String, nullable=False),
+)
+
+
+def _crear_tablas(conexion):
+    """Crea las tablas que no existan."""
+    SQLModel.metadata.create_all(conexion)
+
+
+def _crear_indices(conexion):
+    """
+    Crea los índices definidos en los modelos sobre tablas ya existentes.
+
+    Antes de crear el índice único de `proyecto.nombre` verifica que no haya
+    nombres duplicados, que harían fallar la creación del índice.
+    """
+    duplicados = conexion.execute(
+        text("SELECT nombre FROM proyecto GROUP BY nombre HAVING COUNT(*) > 1")
+    ).scalars().all()
+    if duplicados:
+        raise RuntimeError(
+            "No se puede crear el índice único de proyecto.nombre; nombres duplicados: "
+            + "; ".join(duplicados)
+        )
+    for tabla in SQLModel.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(conexion, checkfirst=True)
+
+
+def _agregar_columnas_version(conexion):
+    """
+    Agrega la columna `version` a empleado y proyecto en bases de datos existentes.
+
+    En una base de datos nueva la columna ya la crea la migración 1.
+    """
+    inspector = inspect(conexion)
+    for tabla in ("empleado", "proyecto"):
+        columnas = {columna["name"] for columna in inspector.get_columns(tabla)}
+        if "version" not in columnas:
+            conexion.execute(text(f"ALTER TABLE {tabla} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+
+def _crear_resumenes(conexion):
+    """Crea las tablas de resúmenes agregados y las llena desde las tablas base."""
+    SQLModel.metadata.create_all(conexion, tables=[models.ResumenProyecto.__table__, models.ResumenEstado.__table__])
+    reconstruir_resumenes(conexion)
+
+
+def _reconstruir_tabla(conexion, tabla: Table):
+    """
+    Reconstruye una tabla con la definición actual del modelo, conservando sus filas.
+
+    SQLite no permite modificar las claves foráneas de una tabla existente: se
+    crea la tabla nueva con otro nombre, se copian las filas, se elimina la
+    anterior, se renombra la nueva y se recrean sus índices. Solo se copian las
+    filas cuyas claves foráneas apuntan a filas existentes; las huérfanas (que
+    SQLite admitía sin `foreign_keys=ON`) violarían las restricciones.
+    """
+    metadata = MetaData()
+    for otra in SQLModel.metadata.sorted_tables:
+        if otra is not tabla:
+            otra.to_metadata(metadata)
+    nueva = tabla.to_metadata(metadata, name=f"{tabla.name}_nueva")
+    conexion.execute(CreateTable(nueva))
+    conexion.execute(insert(nueva).from_select(
+        [columna.name for columna in tabla.columns],
+        select(*tabla.columns).where(*(exists().where(fk.column == fk.parent) for fk in tabla.foreign_keys)),
+    ))
+    tabla.drop(conexion)
+    conexion.execute(text(f"ALTER TABLE {nueva.name} RENAME TO {tabla.name}"))
+    for indice in tabla.indexes:
+        indice.create(conexion)
+
+
+def _agregar_cascadas(conexion):
+    """
+    Agrega `ON DELETE CASCADE` a las claves foráneas de las asignaciones y los resúmenes de equipo.
+
+    Solo reconstruye las tablas creadas con una versión anterior; en una base de
+    datos nueva la migración 1 ya las crea con las cascadas.
+    """
+    inspector = inspect(conexion)
+    for tabla in (models.EmpleadoProyecto.__table__, models.ResumenProyecto.__table__):
+        claves = inspector.get_foreign_keys(tabla.name)
+        if any((clave.get("options") or {}).get("ondelete", "").upper() != "CASCADE" for clave in claves):
+            _reconstruir_tabla(conexion, tabla)
+
+
+def _crear_registro_cambios(conexion):
+    """Crea la tabla del registro de cambios (outbox)."""
+    SQLModel.metadata.create_all(conexion, tables=[models.Cambio.__table__])
+
+
+# (versión, descripción, función que aplica la migración)
+MIGRACIONES = [
+    (1, "Esquema inicial", _crear_tablas),
+    (2, "Índices de filtros y nombre único de proyecto", _crear_indices),
+    (3, "Columna version en empleado y proyecto", _agregar_columnas_version),
+    (4, "Resúmenes de equipo por proyecto y de presupuesto por estado", _crear_resumenes),
+    (5, "Índices de búsqueda de texto completo (FTS5)", crear_indices_busqueda),
+    (6, "ON DELETE CASCADE en asignaciones y resúmenes de equipo", _agregar_cascadas),
+    (7, "Registro de cambios (outbox)", _crear_registro_cambios),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+
+def version_actual(conexion) -> int:
+    """
+    Devuelve la versión del esquema aplicada en la base de datos (0 si ninguna).
+
+    Args:
+        conexion: Conexión de SQLAlchemy
+    """
+    version_esquema.create(conexion, checkfirst=True)
+    return conexion.execute(select(func.coalesce(func.max(version_esquema.c.version), 0))).scalar_one()
+
+
+def version_aplicada(conexion) -> int:
+    """
+    Devuelve la versión del esquema aplicada sin modificar la base de datos.
+
+    A diferencia de `version_actual`, no crea la tabla `version_esquema` si
+    falta (devuelve 0), por lo que sirve para una verificación de solo lectura.
+
+    Args:
+        conexion: Conexión de SQLAlchemy
+    """
+    if not inspect(conexion).has_table(version_esquema.name):
+        return 0
+    return conexion.execute(select(func.coalesce(func.max(version_esquema.c.version), 0))).scalar_one()
+
+
+def verificar_esquema(engine, auto_migrar: bool = False) -> int:
+    """
+    Verifica que la base de datos tenga el esquema que espera la aplicación.
+
+    Es una sola consulta cuando el esquema está al día. Si faltan migraciones,
+    las aplica (con `auto_migrar`) o falla indicando cómo aplicarlas.
+
+    Args:
+        engine: Motor de base de datos
+        auto_migrar: Aplicar las migraciones pendientes en lugar de fallar
+
+    Returns:
+        int: Versión del esquema de la base de datos
+
+    Raises:
+        RuntimeError: Si el esquema está desactualizado y `auto_migrar` es False
+    """
+    with engine.connect() as conexion:
+        actual = version_aplicada(conexion)
+    if actual >= VERSION_ESQUEMA:
+        return actual
+    if not auto_migrar:
+        raise RuntimeError(
+            f"El esquema de la base de datos está en la versión {actual} y la aplicación requiere la "
+            f"{VERSION_ESQUEMA}. Ejecute `python -m app.migraciones` o inicie con DB_AUTO_MIGRAR=true."
+        )
+    migrar(engine)
+    return VERSION_ESQUEMA
+
+
+def migrar(engine) -> list[int]:
+    """
+    Aplica en orden las migraciones pendientes, cada una en su transacción.
+
+    Args:
+        engine: Motor de base de datos
+
+    Returns:
+        list[int]: Versiones aplicadas (vacía si el esquema ya estaba al día)
+    """
+    aplicadas = []
+    with engine.begin() as conexion:
+        actual = version_actual(conexion)
+    for version, descripcion, aplicar in MIGRACIONES:
+        if version <= actual:
+            continue
+        with engine.begin() as conexion:
+            aplicar(conexion)
+            conexion.execute(version_esquema.insert().values(version=version, descripcion=descripcion))
+        aplicadas.append(version)
+    return aplicadas
+
+
+def main():
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Migraciones del esquema de la base de datos")
+    parser.add_argument("--verificar", action="store_true", help="Solo mostrar la versión actual")
+    args = parser.parse_args()
+    if args.verificar:
+        with engine.begin() as conexion:
+            actual = version_actual(conexion)
+        print(f"Versión del esquema: {actual} (última: {VERSION_ESQUEMA})")
+        return
+    aplicadas = migrar(engine)
+    if aplicadas:
+        print(f"Migraciones aplicadas: {', '.join(map(str, aplicadas))}")
+    else:
+        print(f"El esquema ya está al día (versión {VERSION_ESQUEMA})")
+
+
+if __name__ == "__main__":
+    main()
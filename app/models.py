@@ -1,10 +1,34 @@
 from sqlmodel import SQLModel, Relationship, Field
+from sqlalchemy import Index, text
+from datetime import datetime
 from enum import Enum
-from typing import List
+from typing import Any, Dict, List
 from pydantic import field_validator
 import re
 
 
+# Patrones de validación, compilados una sola vez y compartidos por todos los esquemas
+PATRON_SOLO_LETRAS = re.compile(r"^[a-zA-ZñÑáéíóúÁÉÍÓÚ\s]+$")
+PATRON_DESCRIPCION = re.compile(r"^[a-zA-Z0-9ñÑáéíóúÁÉÍÓÚ\s.,:;()¡!¿?]+$")
+
+
+def validar_patron(valor: str | None, patron: re.Pattern, mensaje: str) -> str | None:
+    """
+    Valida un texto contra un patrón precompilado (None se acepta sin validar).
+
+    Args:
+        valor: Texto a validar
+        patron: Patrón compilado (p. ej. PATRON_SOLO_LETRAS)
+        mensaje: Mensaje de error, al que se agrega el valor recibido
+
+    Raises:
+        ValueError: Si el texto no cumple el patrón
+    """
+    if valor is not None and not patron.match(valor):
+        raise ValueError(f"{mensaje} Valor recibido: '{valor}'")
+    return valor
+
+
 class Estado(str, Enum):
     """
     Enumeración para los estados posibles de empleados y proyectos.
@@ -21,12 +45,68 @@ class EmpleadoProyecto(SQLModel, table=True):
     """
     Tabla intermedia para la relación Many-to-Many entre Empleado y Proyecto.
 
+    Ambas claves foráneas tienen `ON DELETE CASCADE`: al eliminar un empleado o
+    un proyecto, la base de datos elimina sus asignaciones en la misma sentencia.
+
     Attributes:
         empleado_id: ID del empleado (FK y PK)
-        proyecto_id: ID del proyecto (FK y PK)
+        proyecto_id: ID del proyecto (FK y PK, indexado para buscar el equipo de un proyecto)
     """
-    empleado_id: int = Field(foreign_key="empleado.id", primary_key=True)
-    proyecto_id: int = Field(foreign_key="proyecto.id", primary_key=True)
+    empleado_id: int = Field(foreign_key="empleado.id", primary_key=True, ondelete="CASCADE")
+    proyecto_id: int = Field(foreign_key="proyecto.id", primary_key=True, index=True, ondelete="CASCADE")
+
+
+class ResumenProyecto(SQLModel, table=True):
+    """
+    Resumen del equipo de cada proyecto, mantenido por los endpoints de escritura.
+
+    Attributes:
+        proyecto_id: ID del proyecto (FK con ON DELETE CASCADE y PK)
+        num_empleados: Cantidad de empleados asignados
+        total_salarios: Suma de los salarios de los empleados asignados
+    """
+    proyecto_id: int = Field(foreign_key="proyecto.id", primary_key=True, ondelete="CASCADE")
+    num_empleados: int = Field(default=0, sa_column_kwargs={"server_default": text("0")})
+    total_salarios: float = Field(default=0, sa_column_kwargs={"server_default": text("0")})
+
+
+class ResumenEstado(SQLModel, table=True):
+    """
+    Cantidad de proyectos y presupuesto total por estado, mantenido por los endpoints de escritura.
+
+    Attributes:
+        estado: Estado de los proyectos (PK)
+        num_proyectos: Cantidad de proyectos con ese estado
+        total_presupuesto: Suma de los presupuestos de esos proyectos
+    """
+    estado: Estado = Field(primary_key=True)
+    num_proyectos: int = Field(default=0)
+    total_presupuesto: float = Field(default=0)
+
+
+class Cambio(SQLModel, table=True):
+    """
+    Registro de cambios (outbox), llenado por los endpoints de escritura en la misma transacción.
+
+    `secuencia` usa AUTOINCREMENT: nunca se reutiliza, aunque la retención
+    elimine las filas más recientes, por lo que sirve como cursor monótono.
+
+    Attributes:
+        secuencia: Número de secuencia creciente
+        entidad: "empleado", "proyecto" o "asignacion"
+        entidad_id: ID del empleado o del proyecto (en una asignación, el proyecto)
+        empleado_id: En una asignación, el empleado; None en los demás casos
+        operacion: "creado", "actualizado", "eliminado", "asignado" o "desasignado"
+        fecha: Momento del cambio (UTC)
+    """
+    __table_args__ = (Index("ix_cambio_entidad", "entidad", "entidad_id"), {"sqlite_autoincrement": True})
+
+    secuencia: int | None = Field(default=None, primary_key=True)
+    entidad: str
+    entidad_id: int
+    empleado_id: int | None = None
+    operacion: str
+    fecha: datetime = Field(index=True)
 
 
 class EmpleadoBase(SQLModel):
@@ -35,14 +115,14 @@ class EmpleadoBase(SQLModel):
 
     Attributes:
         nombre: Nombre del empleado (3-50 caracteres)
-        especialidad: Especialidad o área del empleado (3-50 caracteres)
+        especialidad: Especialidad o área del empleado (3-50 caracteres, indexada)
         salario: Salario del empleado (debe ser positivo, redondeado a 2 decimales)
-        estado: Estado del empleado (Activo o Inactivo)
+        estado: Estado del empleado (Activo o Inactivo, indexado)
     """
     nombre: str = Field(min_length=3, max_length=50)
-    especialidad: str = Field(min_length=3, max_length=50)
+    especialidad: str = Field(min_length=3, max_length=50, index=True)
     salario: float = Field(gt=0)
-    estado: Estado
+    estado: Estado = Field(index=True)
 
     @field_validator('salario')
     @classmethod
@@ -53,10 +133,7 @@ class EmpleadoBase(SQLModel):
     @field_validator('nombre', 'especialidad')
     @classmethod
     def validar_solo_letras(cls, v: str) -> str:
-        patron = r"^[a-zA-ZñÑáéíóúÁÉÍÓÚ\s]+$"
-        if not re.match(patron, v):
-            raise ValueError(f"El campo debe contener solo letras y espacios. Valor recibido: '{v}'")
-        return v
+        return validar_patron(v, PATRON_SOLO_LETRAS, "El campo debe contener solo letras y espacios.")
 
 
 class Empleado(EmpleadoBase, SQLModel, table=True):
@@ -69,11 +146,14 @@ class Empleado(EmpleadoBase, SQLModel, table=True):
 
     Attributes:
         id: Identificador único del empleado
+        version: Versión de la fila; se incrementa con cada modificación o asignación
         proyectos: Lista de proyectos donde está asignado como miembro
         proyectos_gerente: Lista de proyectos donde es gerente
     """
     id: int | None = Field(default=None, primary_key=True)
-    proyectos: List["Proyecto"] = Relationship(back_populates="empleados", link_model=EmpleadoProyecto)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": text("1")})
+    proyectos: List["Proyecto"] = Relationship(back_populates="empleados", link_model=EmpleadoProyecto,
+                                               sa_relationship_kwargs={"passive_deletes": True})
     proyectos_gerente: List["Proyecto"] = Relationship(back_populates="gerente")
 
 
@@ -107,13 +187,7 @@ class EmpleadoUpdate(SQLModel):
     @classmethod
     def validar_solo_letras_opcional(cls, v: str | None) -> str | None:
         """Valida que el campo solo contenga letras y espacios, si se proporciona."""
-        if v is None:
-            return None
-
-        patron = r"^[a-zA-ZñÑáéíóúÁÉÍÓÚ\s]+$"
-        if not re.match(patron, v):
-            raise ValueError(f"El campo debe contener solo letras y espacios. Valor recibido: '{v}'")
-        return v
+        return validar_patron(v, PATRON_SOLO_LETRAS, "El campo debe contener solo letras y espacios.")
 
 
 class EmpleadoConProyectos(EmpleadoBase):
@@ -164,17 +238,22 @@ class ProyectoResumen(SQLModel):
     estado: Estado
 
 
+# EmpleadoConProyectos se declara antes que ProyectoResumen; se resuelve aquí la
+# referencia para que su anotación quede disponible al recorrer sus campos.
+EmpleadoConProyectos.model_rebuild()
+
+
 class ProyectoBase(SQLModel):
     """
     Modelo base de Proyecto con validaciones.
 
     Attributes:
-        nombre: Nombre del proyecto (3-50 caracteres, debe ser único)
+        nombre: Nombre del proyecto (3-50 caracteres, único por índice en la base de datos)
         descripcion: Descripción del proyecto (10-100 caracteres)
         presupuesto: Presupuesto del proyecto (debe ser positivo, redondeado a 2 decimales)
         estado: Estado del proyecto (Activo o Inactivo)
     """
-    nombre: str = Field(min_length=3, max_length=50)
+    nombre: str = Field(min_length=3, max_length=50, index=True, unique=True)
     descripcion: str = Field(min_length=10, max_length=100)
     presupuesto: float = Field(gt=0)
     estado: Estado
@@ -188,10 +267,7 @@ class ProyectoBase(SQLModel):
     @field_validator('nombre', 'descripcion')
     @classmethod
     def validar_solo_letras(cls, v: str) -> str:
-        patron = r"^[a-zA-ZñÑáéíóúÁÉÍÓÚ\s]+$"
-        if not re.match(patron, v):
-            raise ValueError(f"El campo debe contener solo letras y espacios. Valor recibido: '{v}'")
-        return v
+        return validar_patron(v, PATRON_SOLO_LETRAS, "El campo debe contener solo letras y espacios.")
 
 class Proyecto(ProyectoBase, SQLModel, table=True):
     """
@@ -201,16 +277,29 @@ class Proyecto(ProyectoBase, SQLModel, table=True):
     - Many-to-One con Empleado (gerente)
     - Many-to-Many con Empleado (miembros del equipo)
 
+    Índices:
+    - Único sobre nombre
+    - Compuesto (estado, presupuesto) para los filtros del listado
+    - gerente_id, para buscar los proyectos de un gerente
+
     Attributes:
         id: Identificador único del proyecto
-        gerente_id: ID del empleado gerente (FK)
+        version: Versión de la fila; se incrementa con cada modificación o asignación
+        gerente_id: ID del empleado gerente (FK; la base de datos impide eliminar a un gerente)
         gerente: Empleado que es gerente del proyecto
         empleados: Lista de empleados asignados al proyecto
+        resumen: Tamaño del equipo y suma de salarios (se elimina junto con el proyecto)
     """
+    __table_args__ = (Index("ix_proyecto_estado_presupuesto", "estado", "presupuesto"),)
+
     id: int | None = Field(default=None, primary_key=True)
-    gerente_id: int = Field(foreign_key="empleado.id")
+    version: int = Field(default=1, sa_column_kwargs={"server_default": text("1")})
+    gerente_id: int = Field(foreign_key="empleado.id", index=True)
     gerente: Empleado = Relationship(back_populates="proyectos_gerente")
-    empleados: List[Empleado] = Relationship(back_populates="proyectos", link_model=EmpleadoProyecto)
+    empleados: List[Empleado] = Relationship(back_populates="proyectos", link_model=EmpleadoProyecto,
+                                             sa_relationship_kwargs={"passive_deletes": True})
+    resumen: ResumenProyecto | None = Relationship(sa_relationship_kwargs={"uselist": False, "cascade": "all, delete-orphan",
+                                                                           "passive_deletes": True})
 
 
 class ProyectoCreate(ProyectoBase):
@@ -245,23 +334,13 @@ class ProyectoUpdate(SQLModel):
     @classmethod
     def validar_nombre_proyecto_opcional(cls, v: str | None) -> str | None:
         """Valida que el nombre del proyecto solo contenga letras y espacios, si se proporciona."""
-        if v is None:
-            return None
-        patron_nombre = r"^[a-zA-ZñÑáéíóúÁÉÍÓÚ\s]+$"
-        if not re.match(patron_nombre, v):
-            raise ValueError(f"El nombre debe contener solo letras y espacios. Valor recibido: '{v}'")
-        return v
+        return validar_patron(v, PATRON_SOLO_LETRAS, "El nombre debe contener solo letras y espacios.")
 
     @field_validator('descripcion')
     @classmethod
     def validar_descripcion_proyecto_opcional(cls, v: str | None) -> str | None:
         """Valida la descripción (permite letras, números, espacios y puntuación básica), si se proporciona."""
-        if v is None:
-            return None
-        patron_desc = r"^[a-zA-Z0-9ñÑáéíóúÁÉÍÓÚ\s.,:;()¡!¿?]+$"
-        if not re.match(patron_desc, v):
-            raise ValueError(f"La descripción contiene caracteres no permitidos. Valor recibido: '{v}'")
-        return v
+        return validar_patron(v, PATRON_DESCRIPCION, "La descripción contiene caracteres no permitidos.")
 
 
 class ProyectoConRelaciones(ProyectoBase):
@@ -287,4 +366,369 @@ class AsignarEmpleado(SQLModel):
     Attributes:
         empleado_id: ID del empleado a asignar
     """
-    empleado_id: int
\ No newline at end of file
+    empleado_id: int
+
+
+class AsignarEmpleados(SQLModel):
+    """
+    Esquema para asignar o desasignar varios empleados de un proyecto a la vez.
+
+    Attributes:
+        empleado_ids: IDs de los empleados (entre 1 y 1000)
+    """
+    empleado_ids: List[int] = Field(min_length=1, max_length=1000)
+
+
+class FilaAsignacion(SQLModel):
+    """
+    Fila de un archivo CSV de asignaciones (ver `app.importacion`).
+
+    Attributes:
+        empleado_id: ID del empleado a asignar
+        proyecto_id: ID del proyecto
+    """
+    empleado_id: int
+    proyecto_id: int
+
+
+class EliminarIds(SQLModel):
+    """
+    Esquema para eliminar varios empleados o proyectos a la vez.
+
+    Attributes:
+        ids: IDs a eliminar (entre 1 y 5000)
+    """
+    ids: List[int] = Field(min_length=1, max_length=5000)
+
+
+# Máximo de ids por consulta de GET/POST /empleado/multiple y /proyecto/multiple
+MAXIMO_IDS_CONSULTA = 500
+
+
+class ConsultarIds(SQLModel):
+    """
+    Esquema para obtener varios empleados o proyectos a la vez.
+
+    Attributes:
+        ids: IDs a obtener (entre 1 y MAXIMO_IDS_CONSULTA)
+    """
+    ids: List[int] = Field(min_length=1, max_length=MAXIMO_IDS_CONSULTA)
+
+
+class PaginaCambios(SQLModel):
+    """
+    Lote de cambios del registro de cambios.
+
+    Attributes:
+        items: Cambios ordenados por secuencia
+        ultima_secuencia: Secuencia del último cambio del lote (o el `since` recibido
+                          si no hubo cambios); es el `since` de la siguiente consulta
+    """
+    items: List[Cambio]
+    ultima_secuencia: int
+
+
+class Colaborador(EmpleadoResumen):
+    """
+    Empleado alcanzable desde otro a través de proyectos compartidos.
+
+    Attributes:
+        distancia: 1 si comparte un proyecto con el empleado consultado; 2 si
+                   comparte un proyecto con uno de sus colaboradores directos
+        en_comun: Con distancia 1, proyectos en común; con distancia 2,
+                  colaboradores directos a través de los que se llega
+    """
+    distancia: int
+    en_comun: int
+
+
+class ColaboradoresEmpleado(SQLModel):
+    """
+    Colaboradores de un empleado.
+
+    Attributes:
+        empleado_id: ID del empleado consultado
+        profundidad: Distancia máxima incluida (1 o 2)
+        total: Cantidad total de colaboradores hasta esa distancia
+        items: Colaboradores por distancia, luego más en común primero (hasta `limit`)
+    """
+    empleado_id: int
+    profundidad: int
+    total: int
+    items: List[Colaborador]
+
+
+class ProyectoRelacionado(ProyectoResumen):
+    """
+    Proyecto alcanzable desde otro a través de integrantes compartidos.
+
+    Attributes:
+        distancia: 1 si comparte un integrante con el proyecto consultado; 2 si
+                   comparte un integrante con uno de sus relacionados directos
+        en_comun: Con distancia 1, integrantes en común; con distancia 2,
+                  proyectos relacionados directos a través de los que se llega
+    """
+    distancia: int
+    en_comun: int
+
+
+class RelacionadosProyecto(SQLModel):
+    """
+    Proyectos relacionados con un proyecto.
+
+    Attributes:
+        proyecto_id: ID del proyecto consultado
+        profundidad: Distancia máxima incluida (1 o 2)
+        total: Cantidad total de proyectos relacionados hasta esa distancia
+        items: Proyectos por distancia, luego más en común primero (hasta `limit`)
+    """
+    proyecto_id: int
+    profundidad: int
+    total: int
+    items: List[ProyectoRelacionado]
+
+
+class EmpleadosPorId(SQLModel):
+    """
+    Resultado de obtener varios empleados por id.
+
+    Attributes:
+        items: Empleados encontrados con sus proyectos, por id (en el orden pedido)
+        faltantes: IDs pedidos que no existen
+    """
+    items: Dict[int, EmpleadoConProyectos]
+    faltantes: List[int] = []
+
+
+class ProyectosPorId(SQLModel):
+    """
+    Resultado de obtener varios proyectos por id.
+
+    Attributes:
+        items: Proyectos encontrados con su gerente y empleados, por id (en el orden pedido)
+        faltantes: IDs pedidos que no existen
+    """
+    items: Dict[int, ProyectoConRelaciones]
+    faltantes: List[int] = []
+
+
+class SeleccionEmpleado(SQLModel):
+    """
+    Qué devolver de cada empleado en una consulta compuesta.
+
+    Las relaciones que no se indican no se consultan ni se incluyen.
+
+    Attributes:
+        campos: Campos del empleado a incluir (por defecto, todos)
+        proyectos: Proyectos donde está asignado, con su propia selección
+        proyectos_gerente: Proyectos donde es gerente, con su propia selección
+    """
+    campos: List[str] = []
+    proyectos: "SeleccionProyecto | None" = None
+    proyectos_gerente: "SeleccionProyecto | None" = None
+
+
+class SeleccionProyecto(SQLModel):
+    """
+    Qué devolver de cada proyecto en una consulta compuesta.
+
+    Attributes:
+        campos: Campos del proyecto a incluir (por defecto, todos)
+        gerente: Gerente del proyecto, con su propia selección
+        empleados: Empleados asignados, con su propia selección
+    """
+    campos: List[str] = []
+    gerente: SeleccionEmpleado | None = None
+    empleados: SeleccionEmpleado | None = None
+
+
+SeleccionEmpleado.model_rebuild()
+
+
+class ConsultaEmpleados(SeleccionEmpleado):
+    """
+    Raíz de una consulta compuesta: empleados por id y qué devolver de cada uno.
+
+    Attributes:
+        ids: IDs de los empleados (entre 1 y MAXIMO_IDS_CONSULTA)
+    """
+    ids: List[int] = Field(min_length=1, max_length=MAXIMO_IDS_CONSULTA)
+
+
+class ConsultaProyectos(SeleccionProyecto):
+    """
+    Raíz de una consulta compuesta: proyectos por id y qué devolver de cada uno.
+
+    Attributes:
+        ids: IDs de los proyectos (entre 1 y MAXIMO_IDS_CONSULTA)
+    """
+    ids: List[int] = Field(min_length=1, max_length=MAXIMO_IDS_CONSULTA)
+
+
+class ConsultaCompuesta(SQLModel):
+    """
+    Consulta compuesta: una o dos raíces, cada una con su selección anidada.
+
+    Attributes:
+        proyectos: Proyectos a obtener y qué incluir de cada uno
+        empleados: Empleados a obtener y qué incluir de cada uno
+    """
+    proyectos: ConsultaProyectos | None = None
+    empleados: ConsultaEmpleados | None = None
+
+
+class ResultadoConsulta(SQLModel):
+    """
+    Resultado de una consulta compuesta.
+
+    Attributes:
+        proyectos: Proyectos encontrados, en el orden pedido, con lo seleccionado
+        empleados: Empleados encontrados, en el orden pedido, con lo seleccionado
+        faltantes: IDs raíz que no existen, por tipo ("proyectos", "empleados")
+    """
+    proyectos: List[Dict[str, Any]] = []
+    empleados: List[Dict[str, Any]] = []
+    faltantes: Dict[str, List[int]] = {}
+
+
+class PaginaEmpleados(SQLModel):
+    """
+    Página de resultados del listado de empleados.
+
+    Attributes:
+        items: Empleados de la página, ordenados por id
+        next_cursor: Cursor para pedir la siguiente página (None si es la última)
+    """
+    items: List[Empleado]
+    next_cursor: str | None = None
+
+
+class PaginaProyectos(SQLModel):
+    """
+    Página de resultados del listado de proyectos.
+
+    Attributes:
+        items: Proyectos de la página, ordenados por id
+        next_cursor: Cursor para pedir la siguiente página (None si es la última)
+    """
+    items: List[Proyecto]
+    next_cursor: str | None = None
+
+
+class ErrorItemBulk(SQLModel):
+    """
+    Error de un elemento en una operación masiva.
+
+    Attributes:
+        indice: Posición del elemento en la lista recibida
+        codigo: Código HTTP equivalente al error (400, 404 o 409)
+        detalle: Descripción del error
+    """
+    indice: int
+    codigo: int
+    detalle: str
+
+
+class ResultadoItemBulk(SQLModel):
+    """
+    Resultado de un elemento procesado correctamente en una operación masiva.
+
+    Attributes:
+        indice: Posición del elemento en la lista recibida
+        id: ID del registro creado o actualizado
+        operacion: "creado" o "actualizado"
+    """
+    indice: int
+    id: int
+    operacion: str
+
+
+class ResultadoBulk(SQLModel):
+    """
+    Respuesta de una operación masiva (creación o upsert).
+
+    Attributes:
+        creados: Cantidad de registros creados
+        actualizados: Cantidad de registros actualizados (solo con upsert)
+        resultados: Resultado de cada elemento procesado
+        errores: Errores de los elementos rechazados
+    """
+    creados: int = 0
+    actualizados: int = 0
+    resultados: List[ResultadoItemBulk] = []
+    errores: List[ErrorItemBulk] = []
+
+
+class ResultadoEliminacion(SQLModel):
+    """
+    Respuesta de una eliminación masiva.
+
+    Attributes:
+        eliminados: Cantidad de registros eliminados
+        ids: IDs eliminados
+        errores: IDs no eliminados, por posición en la lista recibida (404 si no
+                 existe, 400 si una regla de negocio lo impide)
+    """
+    eliminados: int = 0
+    ids: List[int] = []
+    errores: List[ErrorItemBulk] = []
+
+
+class CostosProyecto(SQLModel):
+    """
+    Tamaño del equipo y costo en salarios de un proyecto.
+
+    Attributes:
+        proyecto_id: ID del proyecto
+        nombre: Nombre del proyecto
+        presupuesto: Presupuesto del proyecto
+        num_empleados: Cantidad de empleados asignados
+        total_salarios: Suma de los salarios de los empleados asignados
+        presupuesto_disponible: Presupuesto menos la suma de salarios
+    """
+    proyecto_id: int
+    nombre: str
+    presupuesto: float
+    num_empleados: int
+    total_salarios: float
+    presupuesto_disponible: float
+
+
+class PaginaCostos(SQLModel):
+    """
+    Página de costos de proyectos.
+
+    Attributes:
+        items: Costos de los proyectos de la página, ordenados por id
+        next_cursor: Cursor para pedir la siguiente página (None si es la última)
+    """
+    items: List[CostosProyecto]
+    next_cursor: str | None = None
+
+
+class EstadisticasEstado(SQLModel):
+    """
+    Totales de los proyectos con un estado.
+
+    Attributes:
+        estado: Estado de los proyectos
+        num_proyectos: Cantidad de proyectos
+        total_presupuesto: Suma de los presupuestos
+    """
+    estado: Estado
+    num_proyectos: int
+    total_presupuesto: float
+
+
+class EstadisticasProyectos(SQLModel):
+    """
+    Totales de proyectos por estado y generales.
+
+    Attributes:
+        por_estado: Totales por estado
+        num_proyectos: Cantidad total de proyectos
+        total_presupuesto: Suma de todos los presupuestos
+    """
+    por_estado: List[EstadisticasEstado]
+    num_proyectos: int
+    total_presupuesto: float
@@ -0,0 +1,123 @@
+"""
+Utilidades de paginación por cursor (keyset).
+
+Los listados se ordenan por `id` y cada página continúa con
+`WHERE id > :ultimo_id`, de modo que el costo de una página no depende
+de cuántas filas haya antes que ella (a diferencia de OFFSET).
+"""
+
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+
+def _codificar(datos: dict) -> str:
+    contenido = json.dumps(datos, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(contenido).decode().rstrip("=")
+
+
+def _decodificar(cursor: str) -> dict:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(datos, dict) or not isinstance(datos.get("id"), int):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return datos
+
+
+def codificar_cursor(ultimo_id: int) -> str:
+    """
+    Codifica el último id de una página como un cursor opaco.
+
+    Args:
+        ultimo_id: ID del último elemento devuelto
+
+    Returns:
+        str: Cursor en base64 url-safe
+    """
+    return _codificar({"id": ultimo_id})
+
+
+def decodificar_cursor(cursor: str) -> int:
+    """
+    Decodifica un cursor generado por `codificar_cursor`.
+
+    Args:
+        cursor: Cursor opaco recibido del cliente
+
+    Returns:
+        int: Último id de la página anterior
+
+    Raises:
+        HTTPException 400: Si el cursor no es válido
+    """
+    return _decodificar(cursor)["id"]
+
+
+def codificar_cursor_rango(rango: float, ultimo_id: int) -> str:
+    """
+    Codifica un cursor para resultados ordenados por (rango, id), p. ej. por relevancia.
+
+    Args:
+        rango: Valor de orden del último elemento devuelto
+        ultimo_id: ID del último elemento devuelto
+
+    Returns:
+        str: Cursor en base64 url-safe
+    """
+    return _codificar({"r": rango, "id": ultimo_id})
+
+
+def decodificar_cursor_rango(cursor: str) -> tuple[float, int]:
+    """
+    Decodifica un cursor generado por `codificar_cursor_rango`.
+
+    Args:
+        cursor: Cursor opaco recibido del cliente
+
+    Returns:
+        tuple[float, int]: Rango e id del último elemento de la página anterior
+
+    Raises:
+        HTTPException 400: Si el cursor no es válido
+    """
+    datos = _decodificar(cursor)
+    rango = datos.get("r")
+    if isinstance(rango, bool) or not isinstance(rango, (int, float)):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return float(rango), datos["id"]
+
+
+def paginar(session, query, columna_id, cursor: str | None, limite: int):
+    """
+    Ejecuta una consulta paginada por cursor.
+
+    Se pide una fila extra para saber si existe una página siguiente
+    sin necesidad de un COUNT.
+
+    Args:
+        session: Sesión de base de datos
+        query: Consulta `select` con los filtros ya aplicados
+        columna_id: Columna por la que se ordena y pagina
+        cursor: Cursor de la página anterior (o None para la primera)
+        limite: Cantidad máxima de elementos por página
+
+    Returns:
+        tuple: (elementos de la página, cursor de la siguiente página o None)
+    """
+    if cursor:
+        query = query.where(columna_id > decodificar_cursor(cursor))
+    query = query.order_by(columna_id).limit(limite + 1)
+    filas = session.exec(query).all()
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(filas[-1].id)
+    return filas, siguiente
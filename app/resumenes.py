@@ -0,0 +1,284 @@
+"""
+Resúmenes agregados mantenidos de forma incremental.
+
+- `ResumenProyecto`: tamaño del equipo y suma de salarios de cada proyecto.
+- `ResumenEstado`: cantidad de proyectos y presupuesto total por estado.
+
+Los endpoints de escritura los actualizan en la misma transacción que el
+cambio que los afecta, con sentencias `UPDATE ... SET x = x + delta`, de modo
+que leer un resumen cuesta O(1) en lugar de recorrer el equipo o la tabla de
+proyectos. `reconstruir` y `verificar` los recalculan desde las tablas base
+para reparar o detectar desvíos.
+
+Uso:
+    python -m app.resumenes              # reconstruye los resúmenes
+    python -m app.resumenes --verificar  # solo informa las diferencias
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app.models import Empleado, EmpleadoProyecto, Estado, Proyecto, ResumenEstado, ResumenProyecto
+
+# Diferencia tolerada al comparar sumas de valores decimales
+TOLERANCIA = 0.005
+
+
+def _sin_sincronizar(sentencia):
+    # Los resúmenes no se cargan como objetos en la sesión: no hace falta
+    # sincronizar el estado de la sesión después de cada UPDATE.
+    return sentencia.execution_options(synchronize_session=False)
+
+
+def ajustar_equipo(session, proyecto_id: int, empleado_ids, signo: int = 1):
+    """
+    Suma (signo=1) o resta (signo=-1) empleados al resumen de un proyecto.
+
+    Debe llamarse en la misma transacción que inserta o elimina las asignaciones.
+
+    Args:
+        session: Sesión de base de datos
+        proyecto_id: ID del proyecto
+        empleado_ids: IDs de los empleados asignados o desasignados
+        signo: 1 al asignar, -1 al desasignar
+    """
+    empleado_ids = set(empleado_ids)
+    if not empleado_ids:
+        return
+    cantidad, salarios = session.execute(
+        select(func.count(Empleado.id), func.coalesce(func.sum(Empleado.salario), 0.0))
+        .where(Empleado.id.in_(empleado_ids))
+    ).one()
+    session.execute(_sin_sincronizar(
+        update(ResumenProyecto)
+        .where(ResumenProyecto.proyecto_id == proyecto_id)
+        .values(num_empleados=ResumenProyecto.num_empleados + signo * cantidad,
+                total_salarios=ResumenProyecto.total_salarios + signo * salarios)
+    ))
+
+
+def ajustar_salario(session, empleado_id: int, diferencia: float):
+    """
+    Propaga un cambio de salario a los resúmenes de los proyectos donde participa el empleado.
+
+    Args:
+        session: Sesión de base de datos
+        empleado_id: ID del empleado
+        diferencia: Salario nuevo menos salario anterior
+    """
+    if not diferencia:
+        return
+    proyectos = select(EmpleadoProyecto.proyecto_id).where(EmpleadoProyecto.empleado_id == empleado_id)
+    session.execute(_sin_sincronizar(
+        update(ResumenProyecto)
+        .where(ResumenProyecto.proyecto_id.in_(proyectos))
+        .values(total_salarios=ResumenProyecto.total_salarios + diferencia)
+    ))
+
+
+def quitar_de_equipos(session, empleado_ids):
+    """
+    Descuenta empleados de todos los proyectos donde participan.
+
+    Se llama antes de eliminar los empleados, mientras sus asignaciones
+    existen. Una sola sentencia `UPDATE ... FROM` resta, en cada proyecto
+    afectado, la cantidad y la suma de salarios de los empleados eliminados.
+
+    Args:
+        session: Sesión de base de datos
+        empleado_ids: IDs de los empleados que se van a eliminar
+    """
+    empleado_ids = set(empleado_ids)
+    if not empleado_ids:
+        return
+    salientes = (
+        select(EmpleadoProyecto.proyecto_id,
+               func.count(Empleado.id).label("cantidad"),
+               func.coalesce(func.sum(Empleado.salario), 0.0).label("salarios"))
+        .join(Empleado, Empleado.id == EmpleadoProyecto.empleado_id)
+        .where(EmpleadoProyecto.empleado_id.in_(empleado_ids))
+        .group_by(EmpleadoProyecto.proyecto_id)
+        .subquery()
+    )
+    session.execute(_sin_sincronizar(
+        update(ResumenProyecto)
+        .where(ResumenProyecto.proyecto_id == salientes.c.proyecto_id)
+        .values(num_empleados=ResumenProyecto.num_empleados - salientes.c.cantidad,
+                total_salarios=ResumenProyecto.total_salarios - salientes.c.salarios)
+    ))
+
+
+def ajustar_estado(session, estado: Estado, proyectos: int, presupuesto: float):
+    """
+    Suma proyectos y presupuesto (o los resta, con valores negativos) al resumen de un estado.
+
+    Args:
+        session: Sesión de base de datos
+        estado: Estado afectado
+        proyectos: Diferencia en la cantidad de proyectos
+        presupuesto: Diferencia en el presupuesto total
+    """
+    if not proyectos and not presupuesto:
+        return
+    session.execute(_sin_sincronizar(
+        update(ResumenEstado)
+        .where(ResumenEstado.estado == estado)
+        .values(num_proyectos=ResumenEstado.num_proyectos + proyectos,
+                total_presupuesto=ResumenEstado.total_presupuesto + presupuesto)
+    ))
+
+
+def cambiar_proyecto_de_estado(session, estado_anterior: Estado, presupuesto_anterior: float,
+                               estado_nuevo: Estado, presupuesto_nuevo: float):
+    """
+    Actualiza los resúmenes por estado cuando cambian el estado o el presupuesto de un proyecto.
+
+    Args:
+        session: Sesión de base de datos
+        estado_anterior: Estado antes del cambio
+        presupuesto_anterior: Presupuesto antes del cambio
+        estado_nuevo: Estado después del cambio
+        presupuesto_nuevo: Presupuesto después del cambio
+    """
+    if estado_anterior == estado_nuevo:
+        ajustar_estado(session, estado_nuevo, 0, presupuesto_nuevo - presupuesto_anterior)
+    else:
+        ajustar_estado(session, estado_anterior, -1, -presupuesto_anterior)
+        ajustar_estado(session, estado_nuevo, 1, presupuesto_nuevo)
+
+
+def quitar_proyectos(session, proyecto_ids):
+    """
+    Descuenta proyectos de los resúmenes por estado.
+
+    Se llama antes de eliminar los proyectos; una sola sentencia `UPDATE ... FROM`
+    resta la cantidad y el presupuesto de los proyectos agrupados por estado.
+    Los resúmenes de equipo (`ResumenProyecto`) los elimina la base de datos en
+    cascada junto con cada proyecto.
+
+    Args:
+        session: Sesión de base de datos
+        proyecto_ids: IDs de los proyectos que se van a eliminar
+    """
+    proyecto_ids = set(proyecto_ids)
+    if not proyecto_ids:
+        return
+    salientes = (
+        select(Proyecto.estado,
+               func.count(Proyecto.id).label("cantidad"),
+               func.coalesce(func.sum(Proyecto.presupuesto), 0.0).label("presupuesto"))
+        .where(Proyecto.id.in_(proyecto_ids))
+        .group_by(Proyecto.estado)
+        .subquery()
+    )
+    session.execute(_sin_sincronizar(
+        update(ResumenEstado)
+        .where(ResumenEstado.estado == salientes.c.estado)
+        .values(num_proyectos=ResumenEstado.num_proyectos - salientes.c.cantidad,
+                total_presupuesto=ResumenEstado.total_presupuesto - salientes.c.presupuesto)
+    ))
+
+
+def _equipos_calculados():
+    """SELECT (proyecto_id, num_empleados, total_salarios) calculado desde las tablas base."""
+    return (
+        select(Proyecto.id,
+               func.count(Empleado.id),
+               func.coalesce(func.sum(Empleado.salario), 0.0))
+        .select_from(Proyecto)
+        .outerjoin(EmpleadoProyecto, EmpleadoProyecto.proyecto_id == Proyecto.id)
+        .outerjoin(Empleado, Empleado.id == EmpleadoProyecto.empleado_id)
+        .group_by(Proyecto.id)
+    )
+
+
+def _estados_calculados(conexion) -> dict:
+    """Cantidad de proyectos y presupuesto total por estado, calculados desde la tabla proyecto."""
+    filas = conexion.execute(
+        select(Proyecto.estado, func.count(Proyecto.id), func.coalesce(func.sum(Proyecto.presupuesto), 0.0))
+        .group_by(Proyecto.estado)
+    ).all()
+    totales = {estado: (0, 0.0) for estado in Estado}
+    totales.update({Estado(estado): (cantidad, presupuesto) for estado, cantidad, presupuesto in filas})
+    return totales
+
+
+def reconstruir(conexion):
+    """
+    Recalcula todos los resúmenes desde las tablas base.
+
+    Args:
+        conexion: Conexión o sesión de base de datos (dentro de una transacción)
+    """
+    conexion.execute(delete(ResumenProyecto))
+    conexion.execute(insert(ResumenProyecto).from_select(
+        ["proyecto_id", "num_empleados", "total_salarios"], _equipos_calculados()))
+    conexion.execute(delete(ResumenEstado))
+    conexion.execute(insert(ResumenEstado), [
+        {"estado": estado, "num_proyectos": cantidad, "total_presupuesto": presupuesto}
+        for estado, (cantidad, presupuesto) in _estados_calculados(conexion).items()
+    ])
+
+
+def verificar(conexion) -> list[str]:
+    """
+    Compara los resúmenes guardados con los calculados desde las tablas base.
+
+    Args:
+        conexion: Conexión o sesión de base de datos
+
+    Returns:
+        list[str]: Descripción de cada diferencia encontrada (vacía si no hay desvíos)
+    """
+    diferencias = []
+    guardados = {
+        proyecto_id: (cantidad, salarios)
+        for proyecto_id, cantidad, salarios in conexion.execute(
+            select(ResumenProyecto.proyecto_id, ResumenProyecto.num_empleados, ResumenProyecto.total_salarios))
+    }
+    for proyecto_id, cantidad, salarios in conexion.execute(_equipos_calculados()):
+        guardado = guardados.pop(proyecto_id, None)
+        if guardado is None:
+            diferencias.append(f"Proyecto {proyecto_id}: sin resumen")
+        elif guardado[0] != cantidad or abs(guardado[1] - salarios) > TOLERANCIA:
+            diferencias.append(f"Proyecto {proyecto_id}: guardado {guardado[0]} empleados / {guardado[1]:.2f} "
+                               f"en salarios, calculado {cantidad} / {salarios:.2f}")
+    for proyecto_id in guardados:
+        diferencias.append(f"Proyecto {proyecto_id}: resumen de un proyecto inexistente")
+
+    guardados = {
+        Estado(estado): (cantidad, presupuesto)
+        for estado, cantidad, presupuesto in conexion.execute(
+            select(ResumenEstado.estado, ResumenEstado.num_proyectos, ResumenEstado.total_presupuesto))
+    }
+    for estado, (cantidad, presupuesto) in _estados_calculados(conexion).items():
+        guardado = guardados.get(estado)
+        if guardado is None:
+            diferencias.append(f"Estado {estado.value}: sin resumen")
+        elif guardado[0] != cantidad or abs(guardado[1] - presupuesto) > TOLERANCIA:
+            diferencias.append(f"Estado {estado.value}: guardado {guardado[0]} proyectos / {guardado[1]:.2f} "
+                               f"de presupuesto, calculado {cantidad} / {presupuesto:.2f}")
+    return diferencias
+
+
+def main():
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Reconstruir o verificar los resúmenes agregados")
+    parser.add_argument("--verificar", action="store_true", help="Solo informar las diferencias, sin corregirlas")
+    args = parser.parse_args()
+    with engine.begin() as conexion:
+        diferencias = verificar(conexion)
+        for diferencia in diferencias:
+            print(diferencia)
+        if args.verificar:
+            print(f"{len(diferencias)} diferencia(s) encontrada(s)")
+            sys.exit(1 if diferencias else 0)
+        reconstruir(conexion)
+    print(f"Resúmenes reconstruidos ({len(diferencias)} diferencia(s) corregida(s))")
+
+
+if __name__ == "__main__":
+    main()
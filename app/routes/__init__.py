@@ -2,6 +2,6 @@
 Routers de la aplicación
 """
 
-from app.routes import empleado, proyecto
+from app.routes import cambios, consulta, empleado, proyecto
 
-__all__ = ["empleado", "proyecto"]
+__all__ = ["cambios", "consulta", "empleado", "proyecto"]
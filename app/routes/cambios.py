@@ -0,0 +1,118 @@
+import time
+
+import anyio
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app.cambios import leer_cambios
+from app.config import settings
+from app.database import engine_lectura, sesion_lectura
+from app.models import PaginaCambios
+from app.paginacion import LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+from app.serializacion import a_json, respuesta_json
+
+router = APIRouter(tags=["Cambios"], prefix="/cambios")
+
+MEDIA_TYPE_SSE = "text/event-stream"
+# Cambios leídos por consulta mientras el stream se pone al día
+LOTE_SSE = 500
+# Un comentario SSE cada tantos segundos sin cambios mantiene viva la conexión
+LATIDO_SEGUNDOS = 15
+
+
+def _evento(cambio: dict) -> bytes:
+    """Codifica un cambio como evento SSE, con la secuencia como id del evento."""
+    return b"id: %d\nevent: cambio\ndata: %s\n\n" % (cambio["secuencia"], a_json(cambio))
+
+
+def _leer(desde: int, limite: int) -> list[dict]:
+    # Cada consulta del stream usa una sesión corta: la conexión vuelve al pool
+    # mientras el stream espera cambios nuevos.
+    with Session(engine_lectura) as session:
+        return leer_cambios(session, desde, limite)
+
+
+async def _stream_cambios(desde: int):
+    """
+    Envía los cambios posteriores a `desde` y luego, indefinidamente, los nuevos.
+
+    Mientras queden cambios pendientes los envía en lotes de LOTE_SSE; al
+    alcanzar el final consulta cada `CAMBIOS_SONDEO_MS`. Termina cuando el
+    cliente se desconecta.
+    """
+    yield b"retry: 3000\n\n"
+    ultimo_envio = time.monotonic()
+    while True:
+        cambios = await anyio.to_thread.run_sync(_leer, desde, LOTE_SSE)
+        if cambios:
+            yield b"".join(_evento(cambio) for cambio in cambios)
+            desde = cambios[-1]["secuencia"]
+            ultimo_envio = time.monotonic()
+            if len(cambios) == LOTE_SSE:
+                continue
+        elif time.monotonic() - ultimo_envio >= LATIDO_SEGUNDOS:
+            yield b": latido\n\n"
+            ultimo_envio = time.monotonic()
+        await anyio.sleep(settings.cambios_sondeo_ms / 1000)
+
+
+def _es_stream(request: Request) -> bool:
+    return MEDIA_TYPE_SSE in request.headers.get("accept", "")
+
+
+async def _sesion_lote(request: Request):
+    """
+    Sesión de lectura solo para el lote JSON.
+
+    El stream SSE no recibe sesión: una dependencia con `yield` termina recién
+    cuando termina la respuesta, y un stream abierto retendría un lugar del
+    límite de sesiones de lectura hasta que el cliente se desconecta. El stream
+    abre sus propias sesiones cortas (ver `_leer`).
+    """
+    if _es_stream(request):
+        yield None
+        return
+    async with sesion_lectura(request) as session:
+        yield session
+
+
+@router.get("", response_model=PaginaCambios,
+            responses={200: {"content": {MEDIA_TYPE_SSE: {}}}})
+def listar_cambios(
+    request: Request,
+    since: int = Query(default=0, ge=0, description="Última secuencia ya procesada"),
+    limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+    session: Session | None = Depends(_sesion_lote),
+):
+    """
+    Devuelve los cambios posteriores a una secuencia del registro de cambios.
+
+    Con `Accept: text/event-stream` responde con Server-Sent Events: primero
+    todos los cambios pendientes y luego, sin cerrar la conexión, cada cambio
+    nuevo (evento `cambio`, con la secuencia como `id`). Al reconectarse, el
+    encabezado `Last-Event-ID` reemplaza a `since`.
+
+    Sin ese encabezado devuelve un lote JSON de hasta `limit` cambios; su
+    `ultima_secuencia` es el `since` de la consulta siguiente.
+
+    Args:
+        request: Petición HTTP (para los encabezados Accept y Last-Event-ID)
+        since: Última secuencia ya procesada por el consumidor (0 para empezar desde el principio)
+        limit: Máximo de cambios del lote JSON (1 a 500)
+        session: Sesión de base de datos (None para el stream SSE)
+
+    Returns:
+        PaginaCambios | StreamingResponse: Lote de cambios, o el stream SSE
+
+    Examples:
+        - GET /cambios?since=0 - Los primeros 50 cambios registrados
+        - GET /cambios?since=1520 (Accept: text/event-stream) - Stream desde la secuencia 1521
+    """
+    if _es_stream(request):
+        ultimo_evento = request.headers.get("last-event-id", "")
+        desde = int(ultimo_evento) if ultimo_evento.isdigit() else since
+        return StreamingResponse(_stream_cambios(desde), media_type=MEDIA_TYPE_SSE,
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    cambios = leer_cambios(session, since, limit)
+    return respuesta_json({"items": cambios, "ultima_secuencia": cambios[-1]["secuencia"] if cambios else since})
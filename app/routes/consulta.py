@@ -0,0 +1,40 @@
+from fastapi import APIRouter
+
+from app.cargadores import resolver
+from app.database import ReadSessionDep
+from app.models import ConsultaCompuesta, ResultadoConsulta
+from app.serializacion import respuesta_json
+
+router = APIRouter(tags=["Consulta compuesta"], prefix="/consulta")
+
+
+@router.post("", response_model=ResultadoConsulta)
+def consulta_compuesta(consulta: ConsultaCompuesta, session: ReadSessionDep):
+    """
+    Obtiene proyectos y/o empleados con las relaciones anidadas que se pidan, en una sola petición.
+
+    Cada nodo de la selección indica sus `campos` (vacío = todos) y, opcionalmente,
+    sus relaciones: `gerente` y `empleados` para un proyecto; `proyectos` y
+    `proyectos_gerente` para un empleado. Se resuelve nivel por nivel con una
+    consulta por tipo de entidad y una por relación en cada nivel, sin importar
+    cuántos objetos haya (ver `app.cargadores`). No modifica datos.
+
+    Args:
+        consulta: Raíces (`proyectos` y/o `empleados`, cada una con sus `ids`) y su selección
+        session: Sesión de base de datos
+
+    Returns:
+        ResultadoConsulta: Objetos raíz en el orden pedido con lo seleccionado, y
+        los ids raíz que no existen en `faltantes`
+
+    Raises:
+        HTTPException 400: Si no hay ninguna raíz, algún campo no existe, hay más
+                           de PROFUNDIDAD_MAXIMA (4) niveles anidados o la
+                           respuesta superaría MAXIMO_OBJETOS (20000)
+
+    Examples:
+        - Tablero de un proyecto: su gerente, su equipo y los proyectos de cada integrante
+          {"proyectos": {"ids": [1], "gerente": {"campos": ["id", "nombre"]},
+                         "empleados": {"campos": ["id", "nombre"], "proyectos": {"campos": ["id", "nombre"]}}}}
+    """
+    return respuesta_json(resolver(session, consulta))
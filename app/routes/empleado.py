@@ -1,20 +1,112 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.database import SessionDep
-from app.models import Empleado, EmpleadoCreate, Estado, EmpleadoConProyectos, EmpleadoUpdate
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Body, Request
+from fastapi.responses import StreamingResponse
+from app.database import ReadSessionDep, WriteSessionDep
+from app.models import Empleado, EmpleadoCreate, Estado, EmpleadoConProyectos, EmpleadoUpdate, PaginaEmpleados, ResultadoBulk, ResultadoItemBulk
+from app.models import Proyecto, ProyectoResumen, EmpleadoProyecto, EliminarIds, ResultadoEliminacion, ErrorItemBulk, Colaborador, ColaboradoresEmpleado
+from app.models import ConsultarIds, EmpleadosPorId, MAXIMO_IDS_CONSULTA
+from app.carga_masiva import verificar_tamano, validar_items, insertar_en_lote, ids_existentes
+from app.carga_masiva import MAX_ITEMS_BULK
+from app.importacion import respuesta_importacion, TAMANO_LOTE_IMPORTACION
+from typing import Any, Dict, List
+from app.paginacion import paginar, LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+from app.exportacion import respuesta_ndjson, MEDIA_TYPE_NDJSON
+from app.consultas import obtener_con_relaciones, obtener_varios_con_relaciones, separar_ids
+from app.cache import respuesta_cacheada, invalidar, claves_por_empleados, clave_empleado, clave_proyectos_del_empleado
+from app.resumenes import ajustar_salario, quitar_de_equipos
+from app.etag import etag_empleado, etag_proyectos_del_empleado, etag_de_pagina, etag_coincide, respuesta_no_modificada, incrementar_version, etag_con_campos
+from app.serializacion import a_json, volcar, columnas, respuesta_json, campos_solicitados, columnas_de_campos, proyectar
+from app.busqueda import buscar
+from app.cambios import registrar, registrar_desasignaciones
+from app.grafo import indice_asignaciones, con_datos
+from app.escritor import QueuedWriteSessionDep, escribir
 from sqlmodel import select
+from sqlalchemy import delete, exists
 
 router = APIRouter(tags=["Empleado"], prefix="/empleado")
 
 
+def _filtrar_empleados(query, especialidad: str, estado: Estado | None):
+    """Aplica los filtros de especialidad y estado a una consulta de empleados."""
+    if especialidad:
+        query = query.where(Empleado.especialidad.contains(especialidad))
+    if estado:
+        query = query.where(Empleado.estado == estado)
+    return query
+
+
+def _gerentes(session, empleado_ids) -> set[int]:
+    """
+    Devuelve cuáles de los empleados son gerentes de algún proyecto.
+
+    Usa una subconsulta EXISTS sobre el índice de `proyecto.gerente_id`, que se
+    detiene en el primer proyecto encontrado sin cargar ninguno.
+    """
+    empleado_ids = set(empleado_ids)
+    if not empleado_ids:
+        return set()
+    return set(session.exec(select(Empleado.id).where(
+        Empleado.id.in_(empleado_ids), exists().where(Proyecto.gerente_id == Empleado.id))).all())
+
+
+def _proyectos_gerenciados(session, empleado_ids) -> dict[int, list[str]]:
+    """Nombres de los proyectos que gerencia cada empleado; solo se consulta para armar un error."""
+    nombres = {}
+    for gerente_id, nombre in session.exec(select(Proyecto.gerente_id, Proyecto.nombre)
+                                           .where(Proyecto.gerente_id.in_(set(empleado_ids)))
+                                           .order_by(Proyecto.id)).all():
+        nombres.setdefault(gerente_id, []).append(nombre)
+    return nombres
+
+
+def _mensaje_gerente(nombres: list[str]) -> str:
+    return f"El empleado no se puede eliminar, el empleado es gerente de: {'; '.join(nombres)}"
+
+
+def _eliminar_empleados(session, empleado_ids) -> set[str]:
+    """
+    Elimina empleados con una sola sentencia DELETE, sin cargarlos en la sesión.
+
+    Antes, mientras las asignaciones existen, se calculan las claves de caché
+    afectadas, se descuentan los empleados de los resúmenes de equipo y se
+    registran las desasignaciones en el registro de cambios; las asignaciones
+    las elimina la base de datos en cascada. No verifica la regla de gerentes
+    (ver `_gerentes`).
+
+    Returns:
+        set[str]: Claves de caché a invalidar después de confirmar
+    """
+    claves = claves_por_empleados(session, empleado_ids)
+    quitar_de_equipos(session, empleado_ids)
+    registrar_desasignaciones(session, EmpleadoProyecto.empleado_id.in_(set(empleado_ids)))
+    registrar(session, "empleado", "eliminado", empleado_ids)
+    session.execute(delete(Empleado).where(Empleado.id.in_(set(empleado_ids))))
+    return claves
+
+
+def _crear_empleado(session, new_empleado: EmpleadoCreate):
+    """Inserta un empleado sin confirmar; devuelve la función que, confirmado, devuelve sus datos."""
+    empleado = Empleado.model_validate(new_empleado)
+    session.add(empleado)
+    session.flush()
+    registrar(session, "empleado", "creado", [empleado.id])
+    datos = volcar(empleado, Empleado)
+
+    def despues():
+        return datos
+    return despues
+
+
 @router.post("/", response_model=Empleado, status_code=201)
-async def create_empleado(new_empleado: EmpleadoCreate, session: SessionDep):
+async def create_empleado(new_empleado: EmpleadoCreate, session: QueuedWriteSessionDep):
     """
     Crea un nuevo empleado en el sistema.
 
+    Con `DB_ESCRITOR_AGRUPADO` activo, la inserción se confirma junto con otras
+    escrituras concurrentes en una sola transacción (ver `app.escritor`).
+
     Args:
         new_empleado: Datos del empleado a crear (nombre, especialidad, salario, estado)
-        session: Sesión de base de datos
+        session: Sesión de base de datos (None si las escrituras se agrupan)
 
     Returns:
         Empleado: El empleado creado con su ID asignado
@@ -22,64 +114,308 @@ async def create_empleado(new_empleado: EmpleadoCreate, session: SessionDep):
     Raises:
         HTTPException 400: Si los datos de validación fallan (salario negativo, campos vacíos, etc.)
     """
-    empleado = Empleado.model_validate(new_empleado)
-    session.add(empleado)
+    return respuesta_json(await escribir(session, _crear_empleado, new_empleado), status_code=201)
+
+
+@router.post("/bulk", response_model=ResultadoBulk, status_code=200)
+def create_empleados_bulk(items: List[Dict[str, Any]] = Body(...), session: WriteSessionDep = None):
+    """
+    Crea muchos empleados en una sola petición y una sola transacción.
+
+    Cada elemento se valida como `EmpleadoCreate`; los válidos se insertan con
+    sentencias INSERT multi-fila y los inválidos se reportan por separado, sin
+    impedir la creación de los demás.
+
+    Args:
+        items: Lista de empleados (mismos campos que POST /empleado/), hasta 5000
+        session: Sesión de base de datos
+
+    Returns:
+        ResultadoBulk: IDs creados por posición y errores por posición
+
+    Raises:
+        HTTPException 400: Si la lista está vacía o supera el máximo permitido
+    """
+    verificar_tamano(items)
+    validos, errores = validar_items(items, EmpleadoCreate)
+    ids = insertar_en_lote(session, Empleado, [item.model_dump() for _, item in validos])
+    registrar(session, "empleado", "creado", ids)
     session.commit()
-    session.refresh(empleado)
-    return empleado
+    resultados = [ResultadoItemBulk(indice=indice, id=empleado_id, operacion="creado")
+                  for (indice, _), empleado_id in zip(validos, ids)]
+    return respuesta_json(ResultadoBulk(creados=len(ids), resultados=resultados, errores=errores), ResultadoBulk)
+
+
+@router.post("/import", response_class=StreamingResponse,
+             responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}},
+             openapi_extra={"requestBody": {"required": True, "content": {"text/csv": {"schema": {"type": "string"}}}}})
+async def importar_empleados(request: Request, lote: int = Query(default=TAMANO_LOTE_IMPORTACION, ge=1, le=MAX_ITEMS_BULK)):
+    """
+    Importa empleados desde un CSV enviado como cuerpo (text/csv), en streaming.
+
+    Columnas: nombre, especialidad, salario, estado y, opcional, proyectos
+    (nombres de proyectos existentes separados por ";", a los que se asigna al
+    empleado). Cada fila se valida como `EmpleadoCreate`; las válidas se
+    insertan en lotes de `lote` filas, cada uno en su propia transacción, y las
+    rechazadas se informan sin detener la importación (ver `app.importacion`).
+
+    Args:
+        request: Petición con el archivo CSV (UTF-8, con encabezado) como cuerpo
+        lote: Filas por transacción (hasta 5000)
+
+    Returns:
+        StreamingResponse: Eventos NDJSON a medida que avanza: "error" por cada fila
+        rechazada (línea, código y detalle), "progreso" después de cada lote y "fin"
+
+    Raises:
+        HTTPException 400: Si el archivo está vacío o al encabezado le faltan columnas
+
+    Examples:
+        - curl -X POST --data-binary @empleados.csv -H "Content-Type: text/csv" /empleado/import
+    """
+    return await respuesta_importacion(request, "empleados", lote)
 
 
-@router.get("/", response_model=List[Empleado])
-async def lista_empleados(especialidad: str = Query(default=""), estado : Estado = Query(default=None), session: SessionDep = None):
+@router.post("/eliminar", response_model=ResultadoEliminacion, status_code=200)
+def delete_empleados_bulk(eliminar: EliminarIds, session: WriteSessionDep):
     """
-    Obtiene una lista de empleados con filtros opcionales.
+    Elimina muchos empleados en una sola petición y una sola transacción.
+
+    La existencia y la regla de gerentes se verifican para todo el lote con una
+    consulta `IN` y una `EXISTS`; los empleados permitidos se eliminan con una
+    sola sentencia DELETE (sus asignaciones, en cascada). Los rechazados se
+    reportan por separado, sin impedir la eliminación de los demás.
+
+    Reglas de negocio (por elemento):
+    - El empleado debe existir (404)
+    - No puede ser gerente de ningún proyecto (400)
 
     Args:
-        especialidad: Filtro por especialidad (búsqueda parcial, case-sensitive)
+        eliminar: Objeto con la lista de ids a eliminar (hasta 5000)
+        session: Sesión de base de datos
+
+    Returns:
+        ResultadoEliminacion: IDs eliminados y errores por posición
+    """
+    existentes = ids_existentes(session, Empleado.id, eliminar.ids)
+    gerentes = _gerentes(session, existentes)
+    gerenciados = _proyectos_gerenciados(session, gerentes) if gerentes else {}
+    eliminados, errores, vistos = [], [], set()
+    for indice, empleado_id in enumerate(eliminar.ids):
+        if empleado_id in vistos:
+            continue
+        vistos.add(empleado_id)
+        if empleado_id not in existentes:
+            errores.append(ErrorItemBulk(indice=indice, codigo=404, detalle=f"Empleado con id {empleado_id} no encontrado"))
+        elif empleado_id in gerentes:
+            errores.append(ErrorItemBulk(indice=indice, codigo=400, detalle=_mensaje_gerente(gerenciados[empleado_id])))
+        else:
+            eliminados.append(empleado_id)
+    claves = _eliminar_empleados(session, eliminados) if eliminados else set()
+    session.commit()
+    invalidar(claves)
+    return respuesta_json(ResultadoEliminacion(eliminados=len(eliminados), ids=eliminados, errores=errores),
+                          ResultadoEliminacion)
+
+
+@router.get("/", response_model=PaginaEmpleados)
+def lista_empleados(especialidad: str = Query(default=""), estado : Estado = Query(default=None),
+                          cursor: str | None = Query(default=None),
+                          limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                          fields: str | None = Query(default=None, description="Campos a devolver, separados por comas (p. ej. id,nombre)"),
+                          request: Request = None,
+                          session: ReadSessionDep = None):
+    """
+    Obtiene una lista paginada de empleados con filtros opcionales.
+
+    La paginación es por cursor: los empleados se ordenan por id y cada página
+    continúa a partir del último id de la anterior, por lo que el costo de una
+    página es constante sin importar el tamaño de la tabla.
+
+    La respuesta incluye un ETag calculado con los ids y versiones de la página;
+    con `If-None-Match` igual al ETag se responde 304 sin cuerpo.
+
+    Con `fields` la consulta lee solo esas columnas (y las que necesitan el
+    cursor y el ETag) y cada empleado se devuelve con solo esos campos.
+
+    Args:
+        especialidad: Filtro por especialidad (búsqueda parcial, case-sensitive; para
+                      buscar por palabras con un índice, ver GET /empleado/buscar)
         estado: Filtro por estado (Activo o Inactivo)
+        cursor: Cursor opaco devuelto en `next_cursor` por la página anterior
+        limit: Cantidad máxima de empleados por página (1-500)
+        fields: Campos de cada empleado separados por comas (por defecto, todos)
         session: Sesión de base de datos
 
     Returns:
-        List[Empleado]: Lista de empleados que cumplen con los filtros
+        PaginaEmpleados: Empleados de la página y cursor de la siguiente (o 304 si no cambió)
+
+    Raises:
+        HTTPException 400: Si el cursor no es válido o `fields` tiene campos desconocidos
 
     Examples:
-        - GET /empleado/ - Todos los empleados
+        - GET /empleado/ - Primera página de empleados
         - GET /empleado/?especialidad=Desarrollador - Empleados con "Desarrollador" en especialidad
         - GET /empleado/?estado=Activo - Solo empleados activos
         - GET /empleado/?especialidad=Backend&estado=Activo - Combinación de filtros
+        - GET /empleado/?limit=100&cursor=eyJpZCI6MTAwfQ - Página siguiente
+        - GET /empleado/?fields=id,nombre - Solo id y nombre de cada empleado
     """
-    query = select(Empleado)
-    if especialidad:
-        query = query.where(Empleado.especialidad.contains(especialidad))
-    if estado:
-        query = query.where(Empleado.estado == estado)
-    empleados = session.exec(query).all()
-    return empleados
+    campos = campos_solicitados(fields, Empleado)
+    seleccion = columnas_de_campos(Empleado, campos, "id", "version") if campos else columnas(Empleado)
+    query = _filtrar_empleados(select(*seleccion), especialidad, estado)
+    filas, next_cursor = paginar(session, query, Empleado.id, cursor, limit)
+    etag = etag_con_campos(etag_de_pagina(filas, next_cursor), campos)
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return respuesta_no_modificada(etag)
+    items = proyectar(filas, campos) if campos else [fila._asdict() for fila in filas]
+    return respuesta_json({"items": items, "next_cursor": next_cursor}, headers={"ETag": etag})
+
+
+@router.get("/export", response_class=StreamingResponse,
+            responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}})
+async def exportar_empleados(especialidad: str = Query(default=""), estado: Estado = Query(default=None)):
+    """
+    Exporta todos los empleados en formato NDJSON (una línea JSON por empleado).
+
+    Las filas se leen en lotes con un cursor del servidor y se envían a medida
+    que se leen, por lo que la memoria no crece con el tamaño de la tabla.
+
+    Args:
+        especialidad: Filtro por especialidad (búsqueda parcial, case-sensitive)
+        estado: Filtro por estado (Activo o Inactivo)
+
+    Returns:
+        StreamingResponse: Empleados ordenados por id en formato application/x-ndjson
+
+    Examples:
+        - GET /empleado/export - Todos los empleados
+        - GET /empleado/export?estado=Activo - Solo empleados activos
+    """
+    query = _filtrar_empleados(select(*columnas(Empleado)), especialidad, estado).order_by(Empleado.id)
+    return respuesta_ndjson(query, "empleados.ndjson")
+
+
+def _empleados_por_id(session, ids: list[int]):
+    """Respuesta de /empleado/multiple: empleados encontrados por id (en el orden pedido) y faltantes."""
+    encontrados = obtener_varios_con_relaciones(session, Empleado, ids, EmpleadoConProyectos)
+    unicos = list(dict.fromkeys(ids))
+    items = {str(empleado_id): volcar(encontrados[empleado_id], EmpleadoConProyectos) for empleado_id in unicos if empleado_id in encontrados}
+    return respuesta_json({"items": items, "faltantes": [empleado_id for empleado_id in unicos if empleado_id not in encontrados]})
+
+
+@router.get("/multiple", response_model=EmpleadosPorId)
+def obtener_empleados_multiple(ids: str = Query(description="IDs separados por comas (p. ej. 3,1,7)"),
+                               session: ReadSessionDep = None):
+    """
+    Obtiene varios empleados por id en una sola petición.
+
+    Se resuelven con una consulta `IN` y una carga por lotes de sus proyectos,
+    en lugar de una petición (y una sesión) por empleado. Para listas largas,
+    ver POST /empleado/multiple.
+
+    Args:
+        ids: IDs separados por comas (hasta 500); los repetidos se devuelven una vez
+        session: Sesión de base de datos
+
+    Returns:
+        EmpleadosPorId: Empleados encontrados por id, con la misma forma que GET /empleado/{id},
+        y los ids que no existen en `faltantes`
+
+    Raises:
+        HTTPException 400: Si `ids` no es una lista de enteros o supera el máximo
+
+    Examples:
+        - GET /empleado/multiple?ids=3,1,7
+    """
+    return _empleados_por_id(session, separar_ids(ids, MAXIMO_IDS_CONSULTA))
+
+
+@router.post("/multiple", response_model=EmpleadosPorId)
+def obtener_empleados_multiple_post(consulta: ConsultarIds, session: ReadSessionDep):
+    """
+    Obtiene varios empleados por id, con los ids en el cuerpo (para listas largas).
+
+    Igual que GET /empleado/multiple; no modifica datos.
+
+    Args:
+        consulta: Objeto con la lista de ids (entre 1 y 500)
+        session: Sesión de base de datos
+
+    Returns:
+        EmpleadosPorId: Empleados encontrados por id y los ids que no existen
+    """
+    return _empleados_por_id(session, consulta.ids)
+
+
+@router.get("/buscar", response_model=PaginaEmpleados)
+def buscar_empleados(q: str = Query(min_length=1, max_length=100), estado: Estado = Query(default=None),
+                     cursor: str | None = Query(default=None),
+                     limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                     session: ReadSessionDep = None):
+    """
+    Busca empleados por nombre o especialidad usando el índice de texto completo.
+
+    Cada palabra de `q` se busca como prefijo, sin distinguir mayúsculas ni
+    acentos, y deben aparecer todas. Los resultados se ordenan por relevancia
+    (las coincidencias en el nombre pesan más) y se paginan por cursor.
+
+    Args:
+        q: Texto a buscar (p. ej. "ana desa")
+        estado: Filtro por estado (Activo o Inactivo)
+        cursor: Cursor opaco devuelto en `next_cursor` por la página anterior
+        limit: Cantidad máxima de empleados por página (1-500)
+        session: Sesión de base de datos
+
+    Returns:
+        PaginaEmpleados: Empleados de la página, del más al menos relevante, y cursor de la siguiente
+
+    Raises:
+        HTTPException 400: Si `q` no contiene palabras o el cursor no es válido
+        HTTPException 501: Si la base de datos no es SQLite
+
+    Examples:
+        - GET /empleado/buscar?q=desarrollador - Empleados con "desarrollador" en nombre o especialidad
+        - GET /empleado/buscar?q=jose - Coincide también con "José"
+        - GET /empleado/buscar?q=back&estado=Activo - Prefijo y filtro por estado
+    """
+    filtros = [Empleado.estado == estado] if estado else []
+    filas, next_cursor = buscar(session, Empleado, q, cursor, limit, filtros)
+    return respuesta_json({"items": [volcar(fila, Empleado) for fila in filas], "next_cursor": next_cursor})
 
 
 @router.get("/{empleado_id}", response_model=EmpleadoConProyectos)
-async def obtener_empleado(empleado_id: int, session: SessionDep):
+def obtener_empleado(empleado_id: int, request: Request, session: ReadSessionDep):
     """
     Obtiene un empleado específico por su ID, incluyendo sus proyectos asignados.
 
+    Admite GET condicional: el ETag cambia cuando cambia el empleado, alguno de
+    sus proyectos o sus asignaciones.
+
     Args:
         empleado_id: ID único del empleado
+        request: Petición (para el encabezado If-None-Match)
         session: Sesión de base de datos
 
     Returns:
         EmpleadoConProyectos: Datos del empleado con lista de proyectos en los que participa
+                              (o 304 si el ETag coincide)
 
     Raises:
         HTTPException 404: Si el empleado no existe
     """
-    empleado = session.get(Empleado, empleado_id)
-    if not empleado:
-        raise HTTPException(status_code=404, detail="El empleado no existe")
-    return empleado
+    def construir():
+        empleado = obtener_con_relaciones(session, Empleado, empleado_id, EmpleadoConProyectos)
+        if not empleado:
+            raise HTTPException(status_code=404, detail="El empleado no existe")
+        return a_json(volcar(empleado, EmpleadoConProyectos))
+
+    return respuesta_cacheada(clave_empleado(empleado_id), construir,
+                              lambda: etag_empleado(session, empleado_id), request.headers.get("if-none-match"))
 
 
 @router.put("/{empleado_id}", response_model=Empleado)
-async def update_empleado(empleado_id: int, updated: EmpleadoCreate, session: SessionDep):
+def update_empleado(empleado_id: int, updated: EmpleadoCreate, session: WriteSessionDep):
     """
     Actualiza los datos de un empleado existente.
 
@@ -98,22 +434,58 @@ async def update_empleado(empleado_id: int, updated: EmpleadoCreate, session: Se
     empleado = session.get(Empleado, empleado_id)
     if not empleado:
         raise HTTPException(status_code=404, detail="Empleado no encontrado")
+    ajustar_salario(session, empleado_id, updated.salario - empleado.salario)
     empleado.nombre = updated.nombre
     empleado.especialidad = updated.especialidad
     empleado.salario = updated.salario
     empleado.estado = updated.estado
+    incrementar_version(empleado)
+    claves = claves_por_empleados(session, [empleado_id])
+    registrar(session, "empleado", "actualizado", [empleado_id])
     session.commit()
+    invalidar(claves)
     session.refresh(empleado)
     return empleado
 
 
+def _actualizar_empleado(session, empleado_id: int, updated: EmpleadoUpdate):
+    """Aplica una actualización parcial sin confirmar; devuelve la función que, confirmada, invalida y devuelve los datos."""
+    empleado_db = session.get(Empleado, empleado_id)
+    if not empleado_db:
+        raise HTTPException(status_code=404, detail="Empleado no encontrado")
+    update_data = updated.model_dump(exclude_unset=True)
+
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No se proporcionaron datos para actualizar")
+    if "salario" in update_data:
+        ajustar_salario(session, empleado_id, update_data["salario"] - empleado_db.salario)
+    for key, value in update_data.items():
+        setattr(empleado_db, key, value)
+    incrementar_version(empleado_db)
+    session.add(empleado_db)
+    claves = claves_por_empleados(session, [empleado_id])
+    registrar(session, "empleado", "actualizado", [empleado_id])
+    session.flush()
+    datos = volcar(empleado_db, Empleado)
+
+    def despues():
+        invalidar(claves)
+        return datos
+    return despues
+
+
 @router.patch("/{empleado_id}", response_model=Empleado)
-async def patch_empleado(empleado_id: int, updated: EmpleadoUpdate, session: SessionDep):
+async def patch_empleado(empleado_id: int, updated: EmpleadoUpdate, session: QueuedWriteSessionDep):
     """
+    Actualiza parcialmente un empleado.
+
+    Con `DB_ESCRITOR_AGRUPADO` activo, la actualización se confirma junto con
+    otras escrituras concurrentes en una sola transacción (ver `app.escritor`).
+
     Args:
         empleado_id (int): ID único del empleado a actualizar.
         updated (EmpleadoUpdate): Datos nuevos del empleado (parciales).
-        session (SessionDep): Sesión activa de base de datos.
+        session (QueuedWriteSessionDep): Sesión activa de base de datos (None si las escrituras se agrupan).
 
     Returns:
         Empleado: Instancia del empleado actualizada con los nuevos datos.
@@ -122,29 +494,19 @@ async def patch_empleado(empleado_id: int, updated: EmpleadoUpdate, session: Ses
         HTTPException 404: Si el empleado con el ID especificado no existe.
         HTTPException 400: Si no se proporcionan datos para actualizar.
     """
-
-    empleado_db = session.get(Empleado, empleado_id)
-    if not empleado_db:
-        raise HTTPException(status_code=404, detail="Empleado no encontrado")
-    update_data = updated.model_dump(exclude_unset=True)
-
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No se proporcionaron datos para actualizar")
-    for key, value in update_data.items():
-        setattr(empleado_db, key, value)
-    session.add(empleado_db)
-    session.commit()
-    session.refresh(empleado_db)
-    return empleado_db
+    return respuesta_json(await escribir(session, _actualizar_empleado, empleado_id, updated))
 
 
 @router.delete("/{empleado_id}", status_code=204)
-async def delete_empleado(empleado_id: int, session: SessionDep):
+def delete_empleado(empleado_id: int, session: WriteSessionDep):
     """
     Elimina un empleado del sistema.
 
     Regla de negocio: No se puede eliminar un empleado que es gerente de algún proyecto.
-    Primero se debe reasignar o eliminar los proyectos donde es gerente.
+    Primero se debe reasignar o eliminar los proyectos donde es gerente. La regla
+    se verifica con una consulta EXISTS; los nombres de los proyectos solo se
+    consultan para el mensaje de error. Las asignaciones del empleado las elimina
+    la base de datos en cascada.
 
     Args:
         empleado_id: ID único del empleado a eliminar
@@ -157,20 +519,20 @@ async def delete_empleado(empleado_id: int, session: SessionDep):
         HTTPException 404: Si el empleado no existe
         HTTPException 400: Si el empleado es gerente de algún proyecto
     """
-    empleado = session.get(Empleado, empleado_id)
-    if not empleado:
+    if not session.scalar(select(exists().where(Empleado.id == empleado_id))):
         raise HTTPException(status_code=404, detail="Empleado no encontrado")
-    if empleado.proyectos_gerente:
-        nombres_proyectos = [p.nombre for p in empleado.proyectos_gerente]
-        raise HTTPException(status_code=400,
-                            detail=f"El empleado no se puede eliminar, el empleado es gerente de: {'; '.join(nombres_proyectos)}")
-    session.delete(empleado)
+    if _gerentes(session, [empleado_id]):
+        nombres_proyectos = _proyectos_gerenciados(session, [empleado_id])[empleado_id]
+        raise HTTPException(status_code=400, detail=_mensaje_gerente(nombres_proyectos))
+    claves = _eliminar_empleados(session, [empleado_id])
     session.commit()
+    invalidar(claves)
     return
 
 
 @router.get("/{empleado_id}/proyectos", response_model=dict)
-async def proyectos_del_empleado(empleado_id: int, session: SessionDep):
+def proyectos_del_empleado(empleado_id: int, request: Request, session: ReadSessionDep,
+                           fields: str | None = Query(default=None, description="Campos de cada proyecto, separados por comas (p. ej. id,nombre,presupuesto)")):
     """
     Obtiene todos los proyectos relacionados con un empleado.
 
@@ -178,22 +540,90 @@ async def proyectos_del_empleado(empleado_id: int, session: SessionDep):
     - Proyectos donde está asignado como miembro del equipo
     - Proyectos donde es gerente
 
+    Admite GET condicional con If-None-Match, igual que GET /empleado/{id}.
+
+    Cada proyecto incluye su id y nombre. Con `fields` (campos de
+    ProyectoResumen) se devuelven esos campos en su lugar, consultando solo
+    esas columnas, sin construir los objetos ORM ni pasar por la caché de
+    respuestas.
+
     Args:
         empleado_id: ID único del empleado
+        request: Petición (para el encabezado If-None-Match)
         session: Sesión de base de datos
+        fields: Campos de cada proyecto separados por comas (por defecto, id y nombre)
 
     Returns:
         dict: Diccionario con información del empleado y sus proyectos organizados por rol
+              (o 304 si el ETag coincide)
 
     Raises:
         HTTPException 404: Si el empleado no existe
+        HTTPException 400: Si `fields` tiene campos desconocidos
     """
-    empleado = session.get(Empleado, empleado_id)
-    if not empleado:
-        raise HTTPException(status_code=404, detail="El empleado no existe")
-    proyectos_asignados = [{"id": p.id, "nombre": p.nombre} for p in empleado.proyectos]
-    proyectos_como_gerente = [{"id": p.id, "nombre": p.nombre, "rol": "gerente"} for p in empleado.proyectos_gerente]
-    return {"empleado_id": empleado_id,
-            "nombre": empleado.nombre,
-            "proyectos_asignados": proyectos_asignados,
-            "proyectos_como_gerente": proyectos_como_gerente}
\ No newline at end of file
+    campos = campos_solicitados(fields, Proyecto, ProyectoResumen)
+    if campos:
+        etag = etag_con_campos(etag_proyectos_del_empleado(session, empleado_id), campos)
+        if etag is None:
+            raise HTTPException(status_code=404, detail="El empleado no existe")
+        if etag_coincide(request.headers.get("if-none-match"), etag):
+            return respuesta_no_modificada(etag)
+        seleccion = select(*columnas_de_campos(Proyecto, campos)).order_by(Proyecto.id)
+        asignados = session.exec(seleccion.join(EmpleadoProyecto, EmpleadoProyecto.proyecto_id == Proyecto.id)
+                                 .where(EmpleadoProyecto.empleado_id == empleado_id)).all()
+        gerenciados = session.exec(seleccion.where(Proyecto.gerente_id == empleado_id)).all()
+        respuesta = {"empleado_id": empleado_id,
+                     "nombre": session.scalar(select(Empleado.nombre).where(Empleado.id == empleado_id)),
+                     "proyectos_asignados": proyectar(asignados, campos),
+                     "proyectos_como_gerente": [{**proyecto, "rol": "gerente"} for proyecto in proyectar(gerenciados, campos)]}
+        return respuesta_json(respuesta, headers={"ETag": etag})
+
+    def construir():
+        empleado = obtener_con_relaciones(session, Empleado, empleado_id, relaciones=("proyectos", "proyectos_gerente"))
+        if not empleado:
+            raise HTTPException(status_code=404, detail="El empleado no existe")
+        proyectos_asignados = [{"id": p.id, "nombre": p.nombre} for p in empleado.proyectos]
+        proyectos_como_gerente = [{"id": p.id, "nombre": p.nombre, "rol": "gerente"} for p in empleado.proyectos_gerente]
+        respuesta = {"empleado_id": empleado_id,
+                     "nombre": empleado.nombre,
+                     "proyectos_asignados": proyectos_asignados,
+                     "proyectos_como_gerente": proyectos_como_gerente}
+        return a_json(respuesta)
+
+    return respuesta_cacheada(clave_proyectos_del_empleado(empleado_id), construir,
+                              lambda: etag_proyectos_del_empleado(session, empleado_id), request.headers.get("if-none-match"))
+
+
+@router.get("/{empleado_id}/colaboradores", response_model=ColaboradoresEmpleado)
+def colaboradores_del_empleado(empleado_id: int, profundidad: int = Query(default=1, ge=1, le=2),
+                               limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                               session: ReadSessionDep = None):
+    """
+    Obtiene los empleados que comparten proyectos con un empleado.
+
+    Se responde desde el índice en memoria de asignaciones (`app.grafo`), sin
+    un self-join por petición; solo los datos de los colaboradores devueltos se
+    consultan en la base de datos, con una consulta `IN`.
+
+    Args:
+        empleado_id: ID único del empleado
+        profundidad: 1 para los compañeros de proyecto; 2 agrega los compañeros de ellos
+        limit: Máximo de colaboradores devueltos (1 a 500)
+        session: Sesión de base de datos
+
+    Returns:
+        ColaboradoresEmpleado: Total y colaboradores por distancia, luego más proyectos en común primero
+
+    Raises:
+        HTTPException 404: Si el empleado no existe
+
+    Examples:
+        - GET /empleado/1/colaboradores
+        - GET /empleado/1/colaboradores?profundidad=2&limit=20
+    """
+    if not session.scalar(select(exists().where(Empleado.id == empleado_id))):
+        raise HTTPException(status_code=404, detail="Empleado no encontrado")
+    indice_asignaciones.sincronizar(session)
+    vecinos = indice_asignaciones.colaboradores(empleado_id, profundidad)
+    return respuesta_json({"empleado_id": empleado_id, "profundidad": profundidad, "total": len(vecinos),
+                           "items": con_datos(session, Empleado, Colaborador, vecinos[:limit])})
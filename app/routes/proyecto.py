@@ -1,14 +1,86 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.database import SessionDep
-from app.models import Proyecto, ProyectoCreate, Estado, ProyectoConRelaciones, Empleado, EmpleadoProyecto, AsignarEmpleado, EmpleadoResumen, ProyectoUpdate
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Body, Request
+from fastapi.responses import StreamingResponse
+from app.database import ReadSessionDep, WriteSessionDep
+from app.models import Proyecto, ProyectoCreate, Estado, ProyectoConRelaciones, Empleado, EmpleadoProyecto, AsignarEmpleado, AsignarEmpleados, EmpleadoResumen, ProyectoUpdate, PaginaProyectos, ResultadoBulk, ResultadoItemBulk, ErrorItemBulk
+from app.models import EliminarIds, ResultadoEliminacion, ProyectoRelacionado, RelacionadosProyecto
+from app.models import ConsultarIds, ProyectosPorId, MAXIMO_IDS_CONSULTA
+from app.models import ResumenProyecto, ResumenEstado, CostosProyecto, PaginaCostos, EstadisticasEstado, EstadisticasProyectos
+from app.resumenes import ajustar_equipo, ajustar_estado, cambiar_proyecto_de_estado, quitar_proyectos
+from app.carga_masiva import verificar_tamano, validar_items, verificar_gerentes, insertar_en_lote, actualizar_en_lote, ids_existentes
+from app.carga_masiva import MAX_ITEMS_BULK
+from app.importacion import respuesta_importacion, TAMANO_LOTE_IMPORTACION
+from app.paginacion import paginar, LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+from app.exportacion import respuesta_ndjson, MEDIA_TYPE_NDJSON
+from app.consultas import obtener_con_relaciones, obtener_varios_con_relaciones, separar_ids
+from app.cache import (respuesta_cacheada, invalidar, claves_por_proyectos, claves_por_asignaciones,
+                       clave_proyecto, clave_empleados_del_proyecto, clave_proyectos_del_empleado)
+from app.etag import (etag_proyecto, etag_empleados_del_proyecto, etag_de_pagina, etag_coincide, respuesta_no_modificada,
+                      incrementar_version, incrementar_versiones, etag_con_campos)
+from app.serializacion import a_json, volcar, columnas, respuesta_json, campos_solicitados, columnas_de_campos, proyectar
+from app.busqueda import buscar
+from app.cambios import registrar, registrar_asignaciones, registrar_desasignaciones
+from app.grafo import indice_asignaciones, con_datos
+from app.escritor import QueuedWriteSessionDep, escribir
+from typing import Any, Dict, List
 from sqlmodel import select
+from sqlalchemy import delete, exists, insert
+from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(tags=["Proyecto"], prefix="/proyecto")
 
 
+def _commit_nombre_unico(session, proyecto: Proyecto, operacion: str):
+    """
+    Registra el cambio del proyecto y confirma la transacción, traduciendo una
+    violación del índice único de nombre en un 409.
+
+    La unicidad la garantiza la base de datos (índice único sobre `proyecto.nombre`),
+    así dos peticiones concurrentes con el mismo nombre no pueden crear duplicados.
+    La violación puede surgir al escribir el proyecto (flush) o al confirmar.
+    """
+    nombre = proyecto.nombre
+    try:
+        session.flush()
+        registrar(session, "proyecto", operacion, [proyecto.id])
+        session.commit()
+    except IntegrityError as error:
+        session.rollback()
+        if "nombre" not in str(error.orig):
+            raise
+        raise HTTPException(status_code=409, detail=f"Ya existe un proyecto con el nombre '{nombre}'")
+
+
+def _filtrar_proyectos(query, estado: Estado | None, presupuesto_min: float, presupuesto_max: float):
+    """Aplica los filtros de estado y rango de presupuesto a una consulta de proyectos."""
+    if estado:
+        query = query.where(Proyecto.estado == estado)
+    query = query.where(Proyecto.presupuesto >= presupuesto_min)
+    query = query.where(Proyecto.presupuesto <= presupuesto_max)
+    return query
+
+
+def _eliminar_proyectos(session, proyecto_ids) -> set[str]:
+    """
+    Elimina proyectos con una sola sentencia DELETE, sin cargarlos en la sesión.
+
+    Antes se calculan las claves de caché afectadas (mientras los equipos
+    existen), se descuentan los proyectos de los resúmenes por estado y se
+    registran las desasignaciones en el registro de cambios; las
+    asignaciones y los resúmenes de equipo los elimina la base de datos en cascada.
+
+    Returns:
+        set[str]: Claves de caché a invalidar después de confirmar
+    """
+    claves = claves_por_proyectos(session, proyecto_ids)
+    quitar_proyectos(session, proyecto_ids)
+    registrar_desasignaciones(session, EmpleadoProyecto.proyecto_id.in_(set(proyecto_ids)))
+    registrar(session, "proyecto", "eliminado", proyecto_ids)
+    session.execute(delete(Proyecto).where(Proyecto.id.in_(set(proyecto_ids))))
+    return claves
+
+
 @router.post("/", response_model=Proyecto, status_code=201)
-async def create_proyecto(new_proyecto: ProyectoCreate, session: SessionDep):
+def create_proyecto(new_proyecto: ProyectoCreate, session: WriteSessionDep):
     """
     Crea un nuevo proyecto en el sistema.
 
@@ -31,70 +103,463 @@ async def create_proyecto(new_proyecto: ProyectoCreate, session: SessionDep):
     gerente = session.get(Empleado, new_proyecto.gerente_id)
     if not gerente:
         raise HTTPException(status_code=404, detail="Gerente no encontrado")
-    proyecto_existente = session.exec(select(Proyecto).where(Proyecto.nombre == new_proyecto.nombre)).first()
-    if proyecto_existente:
-        raise HTTPException(status_code=409, detail=f"Ya existe un proyecto con el nombre '{new_proyecto.nombre}'")
+    ajustar_estado(session, new_proyecto.estado, 1, new_proyecto.presupuesto)
     proyecto = Proyecto.model_validate(new_proyecto)
+    proyecto.resumen = ResumenProyecto()
     session.add(proyecto)
-    session.commit()
+    _commit_nombre_unico(session, proyecto, "creado")
+    invalidar({clave_proyectos_del_empleado(new_proyecto.gerente_id)})
     session.refresh(proyecto)
     return proyecto
 
 
-@router.get("/", response_model=List[Proyecto])
-async def lista_proyectos(estado: Estado = Query(default=None), presupuesto_min: float = Query(default=0), presupuesto_max: float = Query(default=float("inf")), session: SessionDep = None):
+@router.post("/bulk", response_model=ResultadoBulk, status_code=200)
+def create_proyectos_bulk(items: List[Dict[str, Any]] = Body(...), upsert: bool = Query(default=False), session: WriteSessionDep = None):
     """
-    Obtiene una lista de proyectos con filtros opcionales.
+    Crea (o actualiza, con upsert) muchos proyectos en una sola petición y transacción.
+
+    Cada elemento se valida como `ProyectoCreate`. Los gerentes y los nombres se
+    verifican con una consulta `IN` para todo el lote, y los proyectos nuevos se
+    insertan con sentencias INSERT multi-fila.
+
+    Reglas de negocio (por elemento):
+    - El gerente debe existir (404)
+    - El nombre no puede repetirse dentro del lote (409)
+    - El nombre no puede existir ya en la base de datos (409), salvo con
+      `upsert=true`: en ese caso se actualiza el proyecto con ese nombre
+
+    Args:
+        items: Lista de proyectos (mismos campos que POST /proyecto/), hasta 5000
+        upsert: Si es true, los nombres existentes se actualizan en lugar de rechazarse
+        session: Sesión de base de datos
+
+    Returns:
+        ResultadoBulk: IDs creados/actualizados por posición y errores por posición
+
+    Raises:
+        HTTPException 400: Si la lista está vacía o supera el máximo permitido
+        HTTPException 409: Si otra petición creó al mismo tiempo un proyecto con alguno de los nombres
+    """
+    verificar_tamano(items)
+    validos, errores = validar_items(items, ProyectoCreate)
+    validos = verificar_gerentes(session, validos, errores)
+
+    unicos, nombres = [], set()
+    for indice, item in validos:
+        if item.nombre in nombres:
+            errores.append(ErrorItemBulk(indice=indice, codigo=409,
+                                         detalle=f"El nombre '{item.nombre}' está repetido en la lista"))
+        else:
+            nombres.add(item.nombre)
+            unicos.append((indice, item))
+
+    existentes = {nombre: (proyecto_id, estado, presupuesto) for nombre, proyecto_id, estado, presupuesto in session.exec(
+        select(Proyecto.nombre, Proyecto.id, Proyecto.estado, Proyecto.presupuesto).where(Proyecto.nombre.in_(nombres))).all()} if nombres else {}
+    nuevos, actualizados, cambios_estado = [], [], {estado: [0, 0.0] for estado in Estado}
+    for indice, item in unicos:
+        if item.nombre not in existentes:
+            nuevos.append((indice, item))
+            cambios_estado[item.estado][0] += 1
+            cambios_estado[item.estado][1] += item.presupuesto
+        elif upsert:
+            proyecto_id, estado_anterior, presupuesto_anterior = existentes[item.nombre]
+            actualizados.append((indice, proyecto_id, item))
+            cambios_estado[estado_anterior][0] -= 1
+            cambios_estado[estado_anterior][1] -= presupuesto_anterior
+            cambios_estado[item.estado][0] += 1
+            cambios_estado[item.estado][1] += item.presupuesto
+        else:
+            errores.append(ErrorItemBulk(indice=indice, codigo=409,
+                                         detalle=f"Ya existe un proyecto con el nombre '{item.nombre}'"))
+
+    claves = claves_por_proyectos(session, [proyecto_id for _, proyecto_id, _ in actualizados],
+                                  gerente_ids=[item.gerente_id for _, item in nuevos] + [item.gerente_id for _, _, item in actualizados])
+    try:
+        ids = insertar_en_lote(session, Proyecto, [item.model_dump() for _, item in nuevos])
+        if ids:
+            session.execute(insert(ResumenProyecto), [{"proyecto_id": proyecto_id} for proyecto_id in ids])
+        actualizar_en_lote(session, Proyecto, [{"id": proyecto_id, **item.model_dump()} for _, proyecto_id, item in actualizados])
+        registrar(session, "proyecto", "creado", ids)
+        registrar(session, "proyecto", "actualizado", [proyecto_id for _, proyecto_id, _ in actualizados])
+        for estado, (cantidad, presupuesto) in cambios_estado.items():
+            ajustar_estado(session, estado, cantidad, presupuesto)
+        session.commit()
+    except IntegrityError as error:
+        session.rollback()
+        if "nombre" not in str(error.orig):
+            raise
+        raise HTTPException(status_code=409, detail="Otra petición creó un proyecto con alguno de los nombres del lote")
+    invalidar(claves)
+
+    resultados = [ResultadoItemBulk(indice=indice, id=proyecto_id, operacion="creado")
+                  for (indice, _), proyecto_id in zip(nuevos, ids)]
+    resultados += [ResultadoItemBulk(indice=indice, id=proyecto_id, operacion="actualizado")
+                   for indice, proyecto_id, _ in actualizados]
+    resultados.sort(key=lambda resultado: resultado.indice)
+    errores.sort(key=lambda error: error.indice)
+    return respuesta_json(ResultadoBulk(creados=len(ids), actualizados=len(actualizados), resultados=resultados, errores=errores),
+                          ResultadoBulk)
+
+
+@router.post("/import", response_class=StreamingResponse,
+             responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}},
+             openapi_extra={"requestBody": {"required": True, "content": {"text/csv": {"schema": {"type": "string"}}}}})
+async def importar_proyectos(request: Request, lote: int = Query(default=TAMANO_LOTE_IMPORTACION, ge=1, le=MAX_ITEMS_BULK)):
+    """
+    Importa proyectos desde un CSV enviado como cuerpo (text/csv), en streaming.
+
+    Columnas: nombre, descripcion, presupuesto, estado, gerente_id. Cada fila
+    se valida como `ProyectoCreate` y con las reglas de POST /proyecto/bulk
+    (gerente existente, nombre único); las válidas se insertan en lotes de
+    `lote` filas, cada uno en su propia transacción (ver `app.importacion`).
+
+    Args:
+        request: Petición con el archivo CSV (UTF-8, con encabezado) como cuerpo
+        lote: Filas por transacción (hasta 5000)
+
+    Returns:
+        StreamingResponse: Eventos NDJSON "error", "progreso" y "fin" (ver POST /empleado/import)
+
+    Raises:
+        HTTPException 400: Si el archivo está vacío o al encabezado le faltan columnas
+    """
+    return await respuesta_importacion(request, "proyectos", lote)
+
+
+@router.post("/asignaciones/import", response_class=StreamingResponse,
+             responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}},
+             openapi_extra={"requestBody": {"required": True, "content": {"text/csv": {"schema": {"type": "string"}}}}})
+async def importar_asignaciones(request: Request, lote: int = Query(default=TAMANO_LOTE_IMPORTACION, ge=1, le=MAX_ITEMS_BULK)):
+    """
+    Importa asignaciones de empleados a proyectos desde un CSV (text/csv), en streaming.
+
+    Columnas: empleado_id, proyecto_id. Se aplican las reglas de
+    POST /proyecto/{id}/asignar (ambos deben existir; 404) y no se repiten
+    asignaciones (409), pero una fila rechazada no impide importar las demás.
+
+    Args:
+        request: Petición con el archivo CSV (UTF-8, con encabezado) como cuerpo
+        lote: Filas por transacción (hasta 5000)
+
+    Returns:
+        StreamingResponse: Eventos NDJSON "error", "progreso" y "fin" (ver POST /empleado/import)
+
+    Raises:
+        HTTPException 400: Si el archivo está vacío o al encabezado le faltan columnas
+    """
+    return await respuesta_importacion(request, "asignaciones", lote)
+
+
+@router.post("/eliminar", response_model=ResultadoEliminacion, status_code=200)
+def delete_proyectos_bulk(eliminar: EliminarIds, session: WriteSessionDep):
+    """
+    Elimina muchos proyectos en una sola petición y una sola transacción.
+
+    La existencia se verifica con una consulta `IN` y los proyectos existentes
+    se eliminan con una sola sentencia DELETE; sus asignaciones y resúmenes de
+    equipo los elimina la base de datos en cascada. Los ids inexistentes se
+    reportan por separado (404), sin impedir la eliminación de los demás.
+
+    Args:
+        eliminar: Objeto con la lista de ids a eliminar (hasta 5000)
+        session: Sesión de base de datos
+
+    Returns:
+        ResultadoEliminacion: IDs eliminados y errores por posición
+    """
+    existentes = ids_existentes(session, Proyecto.id, eliminar.ids)
+    eliminados, errores, vistos = [], [], set()
+    for indice, proyecto_id in enumerate(eliminar.ids):
+        if proyecto_id in vistos:
+            continue
+        vistos.add(proyecto_id)
+        if proyecto_id in existentes:
+            eliminados.append(proyecto_id)
+        else:
+            errores.append(ErrorItemBulk(indice=indice, codigo=404, detalle=f"Proyecto con id {proyecto_id} no encontrado"))
+    claves = _eliminar_proyectos(session, eliminados) if eliminados else set()
+    session.commit()
+    invalidar(claves)
+    return respuesta_json(ResultadoEliminacion(eliminados=len(eliminados), ids=eliminados, errores=errores),
+                          ResultadoEliminacion)
+
+
+@router.get("/", response_model=PaginaProyectos)
+def lista_proyectos(estado: Estado = Query(default=None), presupuesto_min: float = Query(default=0), presupuesto_max: float = Query(default=float("inf")),
+                          cursor: str | None = Query(default=None),
+                          limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                          fields: str | None = Query(default=None, description="Campos a devolver, separados por comas (p. ej. id,nombre)"),
+                          request: Request = None,
+                          session: ReadSessionDep = None):
+    """
+    Obtiene una lista paginada de proyectos con filtros opcionales.
+
+    La paginación es por cursor: los proyectos se ordenan por id y cada página
+    continúa a partir del último id de la anterior (sin OFFSET). La respuesta
+    incluye un ETag; con `If-None-Match` igual al ETag se responde 304.
+
+    Con `fields` la consulta lee solo esas columnas (y las que necesitan el
+    cursor y el ETag): `fields=id,nombre` no lee la descripción.
 
     Args:
         estado: Filtro por estado (Activo o Inactivo)
         presupuesto_min: Presupuesto mínimo (inclusive)
         presupuesto_max: Presupuesto máximo (inclusive)
+        cursor: Cursor opaco devuelto en `next_cursor` por la página anterior
+        limit: Cantidad máxima de proyectos por página (1-500)
+        fields: Campos de cada proyecto separados por comas (por defecto, todos)
         session: Sesión de base de datos
 
     Returns:
-        List[Proyecto]: Lista de proyectos que cumplen con los filtros
+        PaginaProyectos: Proyectos de la página y cursor de la siguiente (o 304 si no cambió)
+
+    Raises:
+        HTTPException 400: Si el cursor no es válido o `fields` tiene campos desconocidos
 
     Examples:
-        - GET /proyecto/ - Todos los proyectos
+        - GET /proyecto/ - Primera página de proyectos
         - GET /proyecto/?estado=Activo - Solo proyectos activos
         - GET /proyecto/?presupuesto_min=10000 - Proyectos con presupuesto >= 10000
         - GET /proyecto/?presupuesto_min=10000&presupuesto_max=50000 - Rango de presupuesto
         - GET /proyecto/?estado=Activo&presupuesto_min=20000 - Combinación de filtros
+        - GET /proyecto/?limit=100&cursor=eyJpZCI6MTAwfQ - Página siguiente
+        - GET /proyecto/?fields=id,nombre - Solo id y nombre de cada proyecto
     """
-    query = select(Proyecto)
-    if estado:
-        query = query.where(Proyecto.estado == estado)
-    query = query.where(Proyecto.presupuesto >= presupuesto_min)
-    query = query.where(Proyecto.presupuesto <= presupuesto_max)
-    proyectos = session.exec(query).all()
-    return proyectos
+    campos = campos_solicitados(fields, Proyecto)
+    seleccion = columnas_de_campos(Proyecto, campos, "id", "version") if campos else columnas(Proyecto)
+    query = _filtrar_proyectos(select(*seleccion), estado, presupuesto_min, presupuesto_max)
+    filas, next_cursor = paginar(session, query, Proyecto.id, cursor, limit)
+    etag = etag_con_campos(etag_de_pagina(filas, next_cursor), campos)
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return respuesta_no_modificada(etag)
+    items = proyectar(filas, campos) if campos else [fila._asdict() for fila in filas]
+    return respuesta_json({"items": items, "next_cursor": next_cursor}, headers={"ETag": etag})
+
+
+@router.get("/export", response_class=StreamingResponse,
+            responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}})
+async def exportar_proyectos(estado: Estado = Query(default=None), presupuesto_min: float = Query(default=0), presupuesto_max: float = Query(default=float("inf"))):
+    """
+    Exporta todos los proyectos en formato NDJSON (una línea JSON por proyecto).
+
+    Las filas se leen en lotes con un cursor del servidor y se envían a medida
+    que se leen, por lo que la memoria no crece con el tamaño de la tabla.
+
+    Args:
+        estado: Filtro por estado (Activo o Inactivo)
+        presupuesto_min: Presupuesto mínimo (inclusive)
+        presupuesto_max: Presupuesto máximo (inclusive)
+
+    Returns:
+        StreamingResponse: Proyectos ordenados por id en formato application/x-ndjson
+
+    Examples:
+        - GET /proyecto/export - Todos los proyectos
+        - GET /proyecto/export?estado=Activo&presupuesto_min=10000 - Con filtros
+    """
+    query = _filtrar_proyectos(select(*columnas(Proyecto)), estado, presupuesto_min, presupuesto_max).order_by(Proyecto.id)
+    return respuesta_ndjson(query, "proyectos.ndjson")
+
+
+def _proyectos_por_id(session, ids: list[int]):
+    """Respuesta de /proyecto/multiple: proyectos encontrados por id (en el orden pedido) y faltantes."""
+    encontrados = obtener_varios_con_relaciones(session, Proyecto, ids, ProyectoConRelaciones)
+    unicos = list(dict.fromkeys(ids))
+    items = {str(proyecto_id): volcar(encontrados[proyecto_id], ProyectoConRelaciones) for proyecto_id in unicos if proyecto_id in encontrados}
+    return respuesta_json({"items": items, "faltantes": [proyecto_id for proyecto_id in unicos if proyecto_id not in encontrados]})
+
+
+@router.get("/multiple", response_model=ProyectosPorId)
+def obtener_proyectos_multiple(ids: str = Query(description="IDs separados por comas (p. ej. 3,1,7)"),
+                               session: ReadSessionDep = None):
+    """
+    Obtiene varios proyectos por id en una sola petición.
+
+    Se resuelven con una consulta `IN` y una carga por lotes de gerentes y equipos,
+    en lugar de una petición (y una sesión) por proyecto. Para listas largas,
+    ver POST /proyecto/multiple.
+
+    Args:
+        ids: IDs separados por comas (hasta 500); los repetidos se devuelven una vez
+        session: Sesión de base de datos
+
+    Returns:
+        ProyectosPorId: Proyectos encontrados por id, con la misma forma que GET /proyecto/{id},
+        y los ids que no existen en `faltantes`
+
+    Raises:
+        HTTPException 400: Si `ids` no es una lista de enteros o supera el máximo
+
+    Examples:
+        - GET /proyecto/multiple?ids=3,1,7
+    """
+    return _proyectos_por_id(session, separar_ids(ids, MAXIMO_IDS_CONSULTA))
+
+
+@router.post("/multiple", response_model=ProyectosPorId)
+def obtener_proyectos_multiple_post(consulta: ConsultarIds, session: ReadSessionDep):
+    """
+    Obtiene varios proyectos por id, con los ids en el cuerpo (para listas largas).
+
+    Igual que GET /proyecto/multiple; no modifica datos.
+
+    Args:
+        consulta: Objeto con la lista de ids (entre 1 y 500)
+        session: Sesión de base de datos
+
+    Returns:
+        ProyectosPorId: Proyectos encontrados por id y los ids que no existen
+    """
+    return _proyectos_por_id(session, consulta.ids)
+
+
+@router.get("/buscar", response_model=PaginaProyectos)
+def buscar_proyectos(q: str = Query(min_length=1, max_length=100), estado: Estado = Query(default=None),
+                     cursor: str | None = Query(default=None),
+                     limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                     session: ReadSessionDep = None):
+    """
+    Busca proyectos por nombre o descripción usando el índice de texto completo.
+
+    Cada palabra de `q` se busca como prefijo, sin distinguir mayúsculas ni
+    acentos, y deben aparecer todas. Los resultados se ordenan por relevancia
+    (las coincidencias en el nombre pesan más) y se paginan por cursor.
+
+    Args:
+        q: Texto a buscar (p. ej. "migracion datos")
+        estado: Filtro por estado (Activo o Inactivo)
+        cursor: Cursor opaco devuelto en `next_cursor` por la página anterior
+        limit: Cantidad máxima de proyectos por página (1-500)
+        session: Sesión de base de datos
+
+    Returns:
+        PaginaProyectos: Proyectos de la página, del más al menos relevante, y cursor de la siguiente
+
+    Raises:
+        HTTPException 400: Si `q` no contiene palabras o el cursor no es válido
+        HTTPException 501: Si la base de datos no es SQLite
+
+    Examples:
+        - GET /proyecto/buscar?q=sistema - Proyectos con "sistema" en nombre o descripción
+        - GET /proyecto/buscar?q=gestion invent - Coincide con "Gestión de Inventario"
+        - GET /proyecto/buscar?q=portal&estado=Activo - Con filtro por estado
+    """
+    filtros = [Proyecto.estado == estado] if estado else []
+    filas, next_cursor = buscar(session, Proyecto, q, cursor, limit, filtros)
+    return respuesta_json({"items": [volcar(fila, Proyecto) for fila in filas], "next_cursor": next_cursor})
+
+
+def _costos(proyecto_id: int, nombre: str, presupuesto: float, num_empleados: int, total_salarios: float) -> CostosProyecto:
+    total_salarios = round(total_salarios, 2)
+    return CostosProyecto(proyecto_id=proyecto_id, nombre=nombre, presupuesto=presupuesto, num_empleados=num_empleados,
+                          total_salarios=total_salarios, presupuesto_disponible=round(presupuesto - total_salarios, 2))
+
+
+def _consulta_costos():
+    """SELECT de los datos de costos de proyectos, unido a su resumen de equipo."""
+    return (select(Proyecto.id, Proyecto.nombre, Proyecto.presupuesto, ResumenProyecto.num_empleados, ResumenProyecto.total_salarios)
+            .join(ResumenProyecto, ResumenProyecto.proyecto_id == Proyecto.id))
+
+
+@router.get("/stats", response_model=EstadisticasProyectos)
+def estadisticas_proyectos(session: ReadSessionDep):
+    """
+    Obtiene la cantidad de proyectos y el presupuesto total, por estado y en general.
+
+    Los totales se leen de la tabla de resúmenes, que los endpoints de escritura
+    mantienen al día, por lo que el costo no depende de la cantidad de proyectos.
+
+    Args:
+        session: Sesión de base de datos
+
+    Returns:
+        EstadisticasProyectos: Totales por estado y generales
+    """
+    por_estado = [EstadisticasEstado(estado=resumen.estado, num_proyectos=resumen.num_proyectos,
+                                     total_presupuesto=round(resumen.total_presupuesto, 2))
+                  for resumen in session.exec(select(ResumenEstado).order_by(ResumenEstado.estado)).all()]
+    return EstadisticasProyectos(por_estado=por_estado,
+                                 num_proyectos=sum(estado.num_proyectos for estado in por_estado),
+                                 total_presupuesto=round(sum(estado.total_presupuesto for estado in por_estado), 2))
+
+
+@router.get("/costos", response_model=PaginaCostos)
+def costos_proyectos(cursor: str | None = Query(default=None),
+                     limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                     session: ReadSessionDep = None):
+    """
+    Obtiene el tamaño del equipo y la suma de salarios de todos los proyectos, paginado por cursor.
+
+    Args:
+        cursor: Cursor opaco devuelto en `next_cursor` por la página anterior
+        limit: Cantidad máxima de proyectos por página (1-500)
+        session: Sesión de base de datos
+
+    Returns:
+        PaginaCostos: Costos de los proyectos de la página y cursor de la siguiente
+
+    Raises:
+        HTTPException 400: Si el cursor no es válido
+    """
+    filas, next_cursor = paginar(session, _consulta_costos(), Proyecto.id, cursor, limit)
+    return PaginaCostos(items=[_costos(*fila) for fila in filas], next_cursor=next_cursor)
+
+
+@router.get("/{proyecto_id}/costos", response_model=CostosProyecto)
+def costos_proyecto(proyecto_id: int, session: ReadSessionDep):
+    """
+    Obtiene el tamaño del equipo y la suma de salarios de un proyecto.
+
+    Se lee del resumen del proyecto (una fila), sin recorrer el equipo.
+
+    Args:
+        proyecto_id: ID del proyecto
+        session: Sesión de base de datos
+
+    Returns:
+        CostosProyecto: Cantidad de empleados, suma de salarios y presupuesto disponible
+
+    Raises:
+        HTTPException 404: Si el proyecto no existe
+    """
+    fila = session.exec(_consulta_costos().where(Proyecto.id == proyecto_id)).first()
+    if not fila:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    return _costos(*fila)
 
 
 @router.get("/{proyecto_id}", response_model=ProyectoConRelaciones)
-async def obtener_proyecto(proyecto_id: int, session: SessionDep):
+def obtener_proyecto(proyecto_id: int, request: Request, session: ReadSessionDep):
     """
     Obtiene un proyecto específico por su ID, incluyendo gerente y empleados asignados.
 
+    Admite GET condicional: el ETag cambia cuando cambia el proyecto, su gerente,
+    alguno de sus empleados o las asignaciones.
+
     Args:
         proyecto_id: ID único del proyecto
+        request: Petición (para el encabezado If-None-Match)
         session: Sesión de base de datos
 
     Returns:
         ProyectoConRelaciones: Datos completos del proyecto con información del gerente
-                               y lista de empleados asignados
+                               y lista de empleados asignados (o 304 si el ETag coincide)
 
     Raises:
         HTTPException 404: Si el proyecto no existe
     """
-    proyecto = session.get(Proyecto, proyecto_id)
-    if not proyecto:
-        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-    return proyecto
+    def construir():
+        proyecto = obtener_con_relaciones(session, Proyecto, proyecto_id, ProyectoConRelaciones)
+        if not proyecto:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+        return a_json(volcar(proyecto, ProyectoConRelaciones))
+
+    return respuesta_cacheada(clave_proyecto(proyecto_id), construir,
+                              lambda: etag_proyecto(session, proyecto_id), request.headers.get("if-none-match"))
 
 
 @router.put("/{proyecto_id}", response_model=Proyecto)
-async def update_proyecto(proyecto_id: int, updated: ProyectoCreate, session: SessionDep):
+def update_proyecto(proyecto_id: int, updated: ProyectoCreate, session: WriteSessionDep):
     """
     Actualiza los datos de un proyecto existente.
 
@@ -121,27 +586,27 @@ async def update_proyecto(proyecto_id: int, updated: ProyectoCreate, session: Se
     gerente = session.get(Empleado, updated.gerente_id)
     if not gerente:
         raise HTTPException(status_code=404, detail="Gerente no encontrado")
-    if proyecto.nombre != updated.nombre:
-        proyecto_existente = session.exec(select(Proyecto).where(Proyecto.nombre == updated.nombre)).first()
-        if proyecto_existente:
-            raise HTTPException(status_code=409, detail=f"Ya existe un proyecto con el nombre '{updated.nombre}'")
+    claves = claves_por_proyectos(session, [proyecto_id], gerente_ids=[updated.gerente_id])
+    cambiar_proyecto_de_estado(session, proyecto.estado, proyecto.presupuesto, updated.estado, updated.presupuesto)
     proyecto.nombre = updated.nombre
     proyecto.descripcion = updated.descripcion
     proyecto.presupuesto = updated.presupuesto
     proyecto.estado = updated.estado
     proyecto.gerente_id = updated.gerente_id
-    session.commit()
+    incrementar_version(proyecto)
+    _commit_nombre_unico(session, proyecto, "actualizado")
+    invalidar(claves)
     session.refresh(proyecto)
     return proyecto
 
 
 @router.patch("/{proyecto_id}", response_model=Proyecto)
-async def patch_proyecto(proyecto_id: int, updated: ProyectoUpdate, session: SessionDep):
+def patch_proyecto(proyecto_id: int, updated: ProyectoUpdate, session: WriteSessionDep):
     """
         Args:
             proyecto_id (int): ID único del proyecto a actualizar.
             updated (ProyectoUpdate): Datos nuevos del proyecto (parciales).
-            session (SessionDep): Sesión activa de base de datos.
+            session (WriteSessionDep): Sesión activa de base de datos.
 
         Returns:
             Proyecto: Instancia del proyecto actualizada con los nuevos datos.
@@ -163,28 +628,28 @@ async def patch_proyecto(proyecto_id: int, updated: ProyectoUpdate, session: Ses
         gerente = session.get(Empleado, nuevo_gerente_id)
         if not gerente:
             raise HTTPException(status_code=404, detail=f"Gerente con id {nuevo_gerente_id} no encontrado")
-    if "nombre" in update_data:
-        nuevo_nombre = update_data["nombre"]
-        if proyecto_db.nombre != nuevo_nombre:
-            proyecto_existente = session.exec(select(Proyecto).where(Proyecto.nombre == nuevo_nombre)).first()
-            if proyecto_existente:
-                raise HTTPException(status_code=409, detail=f"Ya existe un proyecto con el nombre '{nuevo_nombre}'")
+    claves = claves_por_proyectos(session, [proyecto_id], gerente_ids=[update_data.get("gerente_id", proyecto_db.gerente_id)])
+    cambiar_proyecto_de_estado(session, proyecto_db.estado, proyecto_db.presupuesto,
+                               update_data.get("estado", proyecto_db.estado), update_data.get("presupuesto", proyecto_db.presupuesto))
     for key, value in update_data.items():
         setattr(proyecto_db, key, value)
+    incrementar_version(proyecto_db)
     session.add(proyecto_db)
-    session.commit()
+    _commit_nombre_unico(session, proyecto_db, "actualizado")
+    invalidar(claves)
     session.refresh(proyecto_db)
 
     return proyecto_db
 
 
 @router.delete("/{proyecto_id}", status_code=204)
-async def delete_proyecto(proyecto_id: int, session: SessionDep):
+def delete_proyecto(proyecto_id: int, session: WriteSessionDep):
     """
     Elimina un proyecto del sistema.
 
     Nota: La eliminación también removerá automáticamente todas las asignaciones
-    de empleados a este proyecto (cascada en tabla intermedia).
+    de empleados a este proyecto y su resumen de equipo (ON DELETE CASCADE en la
+    base de datos), sin cargar el equipo en la sesión.
 
     Args:
         proyecto_id: ID único del proyecto a eliminar
@@ -196,19 +661,48 @@ async def delete_proyecto(proyecto_id: int, session: SessionDep):
     Raises:
         HTTPException 404: Si el proyecto no existe
     """
-    proyecto = session.get(Proyecto, proyecto_id)
-    if not proyecto:
+    if not session.scalar(select(exists().where(Proyecto.id == proyecto_id))):
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-    session.delete(proyecto)
+    claves = _eliminar_proyectos(session, [proyecto_id])
     session.commit()
+    invalidar(claves)
     return
 
 
+def _asignar_empleado(session, proyecto_id: int, asignacion: AsignarEmpleado):
+    """Inserta una asignación sin confirmar; devuelve la función que, confirmada, invalida y devuelve el proyecto."""
+    proyecto = session.get(Proyecto, proyecto_id)
+    if not proyecto:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    empleado = session.get(Empleado, asignacion.empleado_id)
+    if not empleado:
+        raise HTTPException(status_code=404, detail="Empleado no encontrado")
+    asignacion_existente = session.exec(select(EmpleadoProyecto).where(EmpleadoProyecto.empleado_id == asignacion.empleado_id, EmpleadoProyecto.proyecto_id == proyecto_id)).first()
+    if asignacion_existente:
+        raise HTTPException(status_code=409, detail= f"El empleado '{empleado.nombre}' ya esta asignado al proyecto '{proyecto.nombre}'")
+    nueva_asignacion = EmpleadoProyecto(empleado_id = asignacion.empleado_id, proyecto_id = proyecto_id)
+    session.add(nueva_asignacion)
+    ajustar_equipo(session, proyecto_id, [asignacion.empleado_id])
+    incrementar_version(proyecto)
+    incrementar_version(empleado)
+    registrar_asignaciones(session, "asignado", proyecto_id, [asignacion.empleado_id])
+    session.flush()
+    datos = volcar(obtener_con_relaciones(session, Proyecto, proyecto_id, ProyectoConRelaciones), ProyectoConRelaciones)
+
+    def despues():
+        invalidar(claves_por_asignaciones(proyecto_id, [asignacion.empleado_id]))
+        return datos
+    return despues
+
+
 @router.post("/{proyecto_id}/asignar", response_model=ProyectoConRelaciones, status_code=200)
-async def asignar_empleado(proyecto_id: int, asignacion: AsignarEmpleado, session: SessionDep):
+async def asignar_empleado(proyecto_id: int, asignacion: AsignarEmpleado, session: QueuedWriteSessionDep):
     """
     Asigna un empleado a un proyecto.
 
+    Con `DB_ESCRITOR_AGRUPADO` activo, la asignación se confirma junto con
+    otras escrituras concurrentes en una sola transacción (ver `app.escritor`).
+
     Reglas de negocio:
     - El proyecto y el empleado deben existir
     - No se puede asignar el mismo empleado dos veces al mismo proyecto
@@ -216,7 +710,7 @@ async def asignar_empleado(proyecto_id: int, asignacion: AsignarEmpleado, sessio
     Args:
         proyecto_id: ID del proyecto
         asignacion: Objeto con el empleado_id a asignar
-        session: Sesión de base de datos
+        session: Sesión de base de datos (None si las escrituras se agrupan)
 
     Returns:
         ProyectoConRelaciones: El proyecto actualizado con la lista completa de empleados
@@ -225,24 +719,96 @@ async def asignar_empleado(proyecto_id: int, asignacion: AsignarEmpleado, sessio
         HTTPException 404: Si el proyecto o el empleado no existen
         HTTPException 409: Si el empleado ya está asignado al proyecto
     """
+    return respuesta_json(await escribir(session, _asignar_empleado, proyecto_id, asignacion))
+
+
+@router.post("/{proyecto_id}/asignar/batch", response_model=ProyectoConRelaciones, status_code=200)
+def asignar_empleados_batch(proyecto_id: int, asignacion: AsignarEmpleados, session: WriteSessionDep):
+    """
+    Asigna varios empleados a un proyecto en una sola operación.
+
+    La existencia de los empleados y las asignaciones previas se verifican con
+    una consulta `IN` cada una, y las nuevas asignaciones se insertan en una
+    sola sentencia. La operación es todo o nada.
+
+    Reglas de negocio:
+    - El proyecto y todos los empleados deben existir
+    - Ninguno de los empleados puede estar ya asignado al proyecto
+
+    Args:
+        proyecto_id: ID del proyecto
+        asignacion: Objeto con la lista de empleado_ids a asignar
+        session: Sesión de base de datos
+
+    Returns:
+        ProyectoConRelaciones: El proyecto con el equipo resultante
+
+    Raises:
+        HTTPException 404: Si el proyecto o alguno de los empleados no existen
+        HTTPException 409: Si alguno de los empleados ya está asignado al proyecto
+    """
     proyecto = session.get(Proyecto, proyecto_id)
     if not proyecto:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-    empleado = session.get(Empleado, asignacion.empleado_id)
-    if not empleado:
-        raise HTTPException(status_code=404, detail="Empleado no encontrado")
-    asignacion_existente = session.exec(select(EmpleadoProyecto).where(EmpleadoProyecto.empleado_id == asignacion.empleado_id, EmpleadoProyecto.proyecto_id == proyecto_id)).first()
-    if asignacion_existente:
-        raise HTTPException(status_code=409, detail= f"El empleado '{empleado.nombre}' ya esta asignado al proyecto '{proyecto.nombre}'")
-    nueva_asignacion = EmpleadoProyecto(empleado_id = asignacion.empleado_id, proyecto_id = proyecto_id)
-    session.add(nueva_asignacion)
+    empleado_ids = sorted(set(asignacion.empleado_ids))
+    faltantes = set(empleado_ids) - ids_existentes(session, Empleado.id, empleado_ids)
+    if faltantes:
+        raise HTTPException(status_code=404, detail=f"Empleados no encontrados: {sorted(faltantes)}")
+    ya_asignados = session.exec(select(EmpleadoProyecto.empleado_id).where(
+        EmpleadoProyecto.proyecto_id == proyecto_id, EmpleadoProyecto.empleado_id.in_(empleado_ids))).all()
+    if ya_asignados:
+        raise HTTPException(status_code=409, detail=f"Empleados ya asignados al proyecto: {sorted(ya_asignados)}")
+    session.execute(insert(EmpleadoProyecto), [{"empleado_id": empleado_id, "proyecto_id": proyecto_id} for empleado_id in empleado_ids])
+    ajustar_equipo(session, proyecto_id, empleado_ids)
+    incrementar_version(proyecto)
+    incrementar_versiones(session, Empleado, empleado_ids)
+    registrar_asignaciones(session, "asignado", proyecto_id, empleado_ids)
     session.commit()
-    session.refresh(proyecto)
-    return proyecto
+    invalidar(claves_por_asignaciones(proyecto_id, empleado_ids))
+    return obtener_con_relaciones(session, Proyecto, proyecto_id, ProyectoConRelaciones)
+
+
+@router.post("/{proyecto_id}/desasignar/batch", response_model=ProyectoConRelaciones, status_code=200)
+def desasignar_empleados_batch(proyecto_id: int, asignacion: AsignarEmpleados, session: WriteSessionDep):
+    """
+    Desasigna varios empleados de un proyecto en una sola operación.
+
+    Verifica las asignaciones con una consulta `IN` y las elimina con una sola
+    sentencia DELETE. La operación es todo o nada.
+
+    Args:
+        proyecto_id: ID del proyecto
+        asignacion: Objeto con la lista de empleado_ids a desasignar
+        session: Sesión de base de datos
+
+    Returns:
+        ProyectoConRelaciones: El proyecto con el equipo resultante
+
+    Raises:
+        HTTPException 404: Si el proyecto no existe o alguno de los empleados no está asignado
+    """
+    proyecto = session.get(Proyecto, proyecto_id)
+    if not proyecto:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    empleado_ids = set(asignacion.empleado_ids)
+    asignados = set(session.exec(select(EmpleadoProyecto.empleado_id).where(
+        EmpleadoProyecto.proyecto_id == proyecto_id, EmpleadoProyecto.empleado_id.in_(empleado_ids))).all())
+    no_asignados = empleado_ids - asignados
+    if no_asignados:
+        raise HTTPException(status_code=404, detail=f"Empleados no asignados a este proyecto: {sorted(no_asignados)}")
+    session.execute(delete(EmpleadoProyecto).where(
+        EmpleadoProyecto.proyecto_id == proyecto_id, EmpleadoProyecto.empleado_id.in_(empleado_ids)))
+    ajustar_equipo(session, proyecto_id, empleado_ids, signo=-1)
+    incrementar_version(proyecto)
+    incrementar_versiones(session, Empleado, empleado_ids)
+    registrar_asignaciones(session, "desasignado", proyecto_id, sorted(empleado_ids))
+    session.commit()
+    invalidar(claves_por_asignaciones(proyecto_id, empleado_ids))
+    return obtener_con_relaciones(session, Proyecto, proyecto_id, ProyectoConRelaciones)
 
 
 @router.delete("/{proyecto_id}/desasignar/{empleado_id}", status_code=204)
-async def desasignar_empleado(proyecto_id: int, empleado_id: int, session: SessionDep):
+def desasignar_empleado(proyecto_id: int, empleado_id: int, session: WriteSessionDep):
     """
     Desasigna un empleado de un proyecto.
 
@@ -267,27 +833,93 @@ async def desasignar_empleado(proyecto_id: int, empleado_id: int, session: Sessi
     if not asignacion:
         raise HTTPException(status_code=404, detail="El empleado no esta asignado a este proyecto")
     session.delete(asignacion)
+    ajustar_equipo(session, proyecto_id, [empleado_id], signo=-1)
+    incrementar_version(proyecto)
+    incrementar_versiones(session, Empleado, [empleado_id])
+    registrar_asignaciones(session, "desasignado", proyecto_id, [empleado_id])
     session.commit()
+    invalidar(claves_por_asignaciones(proyecto_id, [empleado_id]))
     return
 
 
 @router.get("/{proyecto_id}/empleados", response_model= List[EmpleadoResumen])
-async def empleados_del_proyecto(proyecto_id: int, session: SessionDep):
+def empleados_del_proyecto(proyecto_id: int, request: Request, session: ReadSessionDep,
+                           fields: str | None = Query(default=None, description="Campos a devolver, separados por comas (p. ej. id,nombre)")):
     """
     Obtiene la lista de empleados asignados a un proyecto.
 
+    Admite GET condicional con If-None-Match, igual que GET /proyecto/{id}.
+
+    Con `fields` se consultan solo esas columnas con un JOIN sobre
+    EmpleadoProyecto, sin construir los objetos ORM ni pasar por la caché de
+    respuestas; el ETag sigue el de la lista completa, combinado con los campos.
+
     Args:
         proyecto_id: ID del proyecto
+        request: Petición (para el encabezado If-None-Match)
         session: Sesión de base de datos
+        fields: Campos de cada empleado separados por comas (por defecto, todos los de EmpleadoResumen)
 
     Returns:
         List[EmpleadoResumen]: Lista de empleados con información resumida
-                               (id, nombre, especialidad, salario, estado)
+                               (id, nombre, especialidad, salario, estado), o 304 si el ETag coincide
 
     Raises:
         HTTPException 404: Si el proyecto no existe
+        HTTPException 400: Si `fields` tiene campos desconocidos
     """
-    proyecto = session.get(Proyecto, proyecto_id)
-    if not proyecto:
+    campos = campos_solicitados(fields, Empleado, EmpleadoResumen)
+    if campos:
+        etag = etag_con_campos(etag_empleados_del_proyecto(session, proyecto_id), campos)
+        if etag is None:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+        if etag_coincide(request.headers.get("if-none-match"), etag):
+            return respuesta_no_modificada(etag)
+        filas = session.exec(select(*columnas_de_campos(Empleado, campos))
+                             .join(EmpleadoProyecto, EmpleadoProyecto.empleado_id == Empleado.id)
+                             .where(EmpleadoProyecto.proyecto_id == proyecto_id).order_by(Empleado.id)).all()
+        return respuesta_json(proyectar(filas, campos), headers={"ETag": etag})
+
+    def construir():
+        proyecto = obtener_con_relaciones(session, Proyecto, proyecto_id, relaciones=("empleados",))
+        if not proyecto:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+        return a_json([volcar(empleado, EmpleadoResumen) for empleado in proyecto.empleados])
+
+    return respuesta_cacheada(clave_empleados_del_proyecto(proyecto_id), construir,
+                              lambda: etag_empleados_del_proyecto(session, proyecto_id), request.headers.get("if-none-match"))
+
+
+@router.get("/{proyecto_id}/relacionados", response_model=RelacionadosProyecto)
+def proyectos_relacionados(proyecto_id: int, profundidad: int = Query(default=1, ge=1, le=2),
+                           limit: int = Query(default=LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                           session: ReadSessionDep = None):
+    """
+    Obtiene los proyectos que comparten integrantes con un proyecto.
+
+    Se responde desde el índice en memoria de asignaciones (`app.grafo`), sin
+    un self-join por petición; solo los datos de los proyectos devueltos se
+    consultan en la base de datos, con una consulta `IN`.
+
+    Args:
+        proyecto_id: ID del proyecto
+        profundidad: 1 para los proyectos con integrantes en común; 2 agrega los relacionados de ellos
+        limit: Máximo de proyectos devueltos (1 a 500)
+        session: Sesión de base de datos
+
+    Returns:
+        RelacionadosProyecto: Total y proyectos por distancia, luego más integrantes en común primero
+
+    Raises:
+        HTTPException 404: Si el proyecto no existe
+
+    Examples:
+        - GET /proyecto/1/relacionados
+        - GET /proyecto/1/relacionados?profundidad=2&limit=20
+    """
+    if not session.scalar(select(exists().where(Proyecto.id == proyecto_id))):
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-    return proyecto.empleados
\ No newline at end of file
+    indice_asignaciones.sincronizar(session)
+    vecinos = indice_asignaciones.relacionados(proyecto_id, profundidad)
+    return respuesta_json({"proyecto_id": proyecto_id, "profundidad": profundidad, "total": len(vecinos),
+                           "items": con_datos(session, Proyecto, ProyectoRelacionado, vecinos[:limit])})
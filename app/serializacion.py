@@ -0,0 +1,184 @@
+"""
+Serialización rápida de respuestas JSON.
+
+Con `response_model`, FastAPI vuelve a validar lo que devuelve el endpoint
+(ejecutando los validadores de los esquemas), lo convierte a tipos de Python
+compatibles con JSON y recién entonces lo codifica con `json.dumps`. Los
+endpoints de lectura más usados evitan ese camino: arman dicts directamente
+desde las filas u objetos ORM, con los campos del esquema de respuesta y sin
+validar (los datos se validaron al escribirse), y los codifican a bytes con
+un codificador rápido: orjson si está instalado, o el de pydantic-core.
+
+El esquema sigue declarado en `response_model` para la documentación OpenAPI;
+como el endpoint devuelve una `Response`, FastAPI no lo vuelve a procesar.
+
+Los listados admiten `fields=` (campos separados por comas): `campos_solicitados`
+los valida contra el esquema y `columnas_de_campos` arma la proyección, de modo
+que la consulta solo lee esas columnas y cada fila se vuelca con solo esos campos.
+"""
+
+from functools import lru_cache
+from typing import get_origin
+
+from fastapi import HTTPException, Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from app.consultas import modelo_anidado
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def a_json(valor) -> bytes:
+    """
+    Codifica dicts, listas, números, textos y enums a JSON (bytes UTF-8).
+
+    Args:
+        valor: Valor a codificar
+
+    Returns:
+        bytes: JSON compacto
+    """
+    if orjson is not None:
+        return orjson.dumps(valor)
+    return to_json(valor)
+
+
+@lru_cache(maxsize=None)
+def adaptador(tipo) -> TypeAdapter:
+    """
+    Devuelve un TypeAdapter cacheado para un tipo (p. ej. `List[EmpleadoResumen]`).
+
+    Crear un TypeAdapter construye su validador y serializador, lo que es caro
+    para hacerlo en cada petición.
+
+    Args:
+        tipo: Tipo a validar o serializar
+
+    Returns:
+        TypeAdapter: Adaptador reutilizable
+    """
+    return TypeAdapter(tipo)
+
+
+@lru_cache(maxsize=None)
+def _plan_de_volcado(modelo) -> tuple:
+    """Campos del modelo con su submodelo (si es anidado) y si son listas."""
+    plan = []
+    for nombre, campo in modelo.model_fields.items():
+        submodelo = modelo_anidado(campo.annotation)
+        plan.append((nombre, submodelo, get_origin(campo.annotation) is list))
+    return tuple(plan)
+
+
+def volcar(objeto, modelo) -> dict:
+    """
+    Convierte un objeto ORM (o una fila) en un dict con los campos de un esquema, sin validar.
+
+    Los campos anidados (p. ej. `ProyectoConRelaciones.empleados`) se vuelcan
+    recursivamente con su propio esquema. Las relaciones deben estar cargadas
+    de antemano (ver `app.consultas.obtener_con_relaciones`).
+
+    Args:
+        objeto: Objeto con un atributo por cada campo del esquema
+        modelo: Esquema de respuesta (p. ej. EmpleadoConProyectos)
+
+    Returns:
+        dict: Valores listos para `a_json`
+    """
+    resultado = {}
+    for nombre, submodelo, es_lista in _plan_de_volcado(modelo):
+        valor = getattr(objeto, nombre)
+        if submodelo is not None and valor is not None:
+            valor = [volcar(elemento, submodelo) for elemento in valor] if es_lista else volcar(valor, submodelo)
+        resultado[nombre] = valor
+    return resultado
+
+
+def columnas(entidad, modelo=None) -> list:
+    """
+    Columnas de una entidad que corresponden a los campos de un esquema.
+
+    Permite consultar `select(*columnas(Empleado))` y obtener filas livianas en
+    lugar de objetos ORM cuando solo se van a serializar.
+
+    Args:
+        entidad: Modelo de tabla
+        modelo: Esquema de respuesta (por defecto, la propia entidad)
+
+    Returns:
+        list: Atributos de columna, en el orden de los campos del esquema
+    """
+    nombres_columnas = set(entidad.__table__.columns.keys())
+    return [getattr(entidad, nombre) for nombre in (modelo or entidad).model_fields if nombre in nombres_columnas]
+
+
+def campos_solicitados(fields: str | None, entidad, modelo=None, parametro: str = "fields") -> tuple[str, ...] | None:
+    """
+    Valida los campos pedidos (`fields=` o la clave `campos` de `/consulta`) contra los campos de un esquema.
+
+    Args:
+        fields: Campos separados por comas (p. ej. "id,nombre"); vacío o None pide todos
+        entidad: Modelo de tabla de las columnas
+        modelo: Esquema de respuesta (por defecto, la propia entidad)
+        parametro: Nombre del parámetro o clave de la petición, para el mensaje de error
+
+    Returns:
+        tuple[str, ...] | None: Campos pedidos, sin repetir y en el orden del
+        esquema; None si no se pidió una proyección
+
+    Raises:
+        HTTPException 400: Si algún campo no existe en el esquema
+    """
+    pedidos = {campo.strip() for campo in (fields or "").split(",") if campo.strip()}
+    if not pedidos:
+        return None
+    disponibles = [columna.key for columna in columnas(entidad, modelo)]
+    desconocidos = sorted(pedidos.difference(disponibles))
+    if desconocidos:
+        raise HTTPException(status_code=400,
+                            detail=f"Campos desconocidos en {parametro}: {', '.join(desconocidos)}. "
+                                   f"Disponibles: {', '.join(disponibles)}")
+    return tuple(campo for campo in disponibles if campo in pedidos)
+
+
+def columnas_de_campos(entidad, campos: tuple[str, ...], *obligatorias: str) -> list:
+    """
+    Columnas de los campos pedidos, más las que la consulta necesita aunque no se devuelvan.
+
+    Args:
+        entidad: Modelo de tabla
+        campos: Campos pedidos (ver `campos_solicitados`)
+        obligatorias: Columnas necesarias para paginar o calcular el ETag (p. ej. "id", "version")
+
+    Returns:
+        list: Atributos de columna, sin repetir
+    """
+    nombres = dict.fromkeys((*campos, *obligatorias))
+    return [getattr(entidad, nombre) for nombre in nombres]
+
+
+def proyectar(filas, campos: tuple[str, ...]) -> list[dict]:
+    """Vuelca filas de una consulta por columnas con solo los campos pedidos."""
+    return [{campo: fila._mapping[campo] for campo in campos} for fila in filas]
+
+
+def respuesta_json(valor, tipo=None, status_code: int = 200, headers: dict | None = None) -> Response:
+    """
+    Construye una respuesta JSON sin pasar por la validación de `response_model`.
+
+    Args:
+        valor: dict/lista (se codifica con `a_json`) u objeto Pydantic
+        tipo: Si se indica, se serializa con el TypeAdapter cacheado de ese tipo
+              (para valores que son modelos Pydantic, p. ej. ResultadoBulk)
+        status_code: Código HTTP
+        headers: Encabezados adicionales
+
+    Returns:
+        Response: Respuesta application/json
+    """
+    contenido = adaptador(tipo).dump_json(valor) if tipo is not None else a_json(valor)
+    return Response(content=contenido, status_code=status_code, media_type="application/json", headers=headers)
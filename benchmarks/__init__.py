@@ -0,0 +1,5 @@
+"""
+Benchmarks del Sistema de Gestión de Proyectos.
+
+Requieren las dependencias de desarrollo: `pip install -r requirements-dev.txt`
+"""
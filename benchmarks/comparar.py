@@ -0,0 +1,97 @@
+"""
+Compara dos resultados de benchmarks y señala las regresiones.
+
+Recibe dos archivos JSON guardados con `--salida` (ver `benchmarks.resultados`)
+del mismo benchmark, p. ej. antes y después de un cambio. Para cada caso y
+métrica presente en ambos calcula la variación relativa; una latencia (`_ms`)
+que sube o un rendimiento (`_rps`, `ops_s`, `obj_s`) que baja más que el
+umbral es una regresión. Sale con código 1 si hay alguna.
+
+Uso:
+    python -m benchmarks.comparar base.json nuevo.json
+    python -m benchmarks.comparar base.json nuevo.json --umbral 0.2 --metrica p95_ms
+"""
+
+import argparse
+import sys
+
+from benchmarks.resultados import cargar
+
+SUFIJOS_MAYOR_ES_MEJOR = ("_rps", "ops_s", "obj_s")
+SUFIJOS_MENOR_ES_MEJOR = ("_ms",)
+
+
+def _sentido(metrica: str) -> int:
+    """1 si mayor es mejor, -1 si menor es mejor, 0 si la métrica no se compara."""
+    if metrica.endswith(SUFIJOS_MAYOR_ES_MEJOR):
+        return 1
+    if metrica.endswith(SUFIJOS_MENOR_ES_MEJOR):
+        return -1
+    return 0
+
+
+def comparar(base: dict, nuevo: dict, umbral: float, metricas: list[str] | None = None) -> list[dict]:
+    """
+    Compara las métricas de dos documentos de resultados.
+
+    Args:
+        base: Documento de referencia
+        nuevo: Documento a evaluar
+        umbral: Variación relativa tolerada (0.1 = 10 %)
+        metricas: Si se indica, solo se comparan estas métricas
+
+    Returns:
+        list[dict]: Una fila por (caso, métrica) con los valores, la variación y si es regresión
+
+    Raises:
+        ValueError: Si los documentos son de benchmarks distintos
+    """
+    if base.get("benchmark") != nuevo.get("benchmark"):
+        raise ValueError(f"Benchmarks distintos: '{base.get('benchmark')}' y '{nuevo.get('benchmark')}'")
+    filas = []
+    for caso, metricas_base in base["resultados"].items():
+        metricas_nuevo = nuevo["resultados"].get(caso)
+        if metricas_nuevo is None:
+            continue
+        for metrica, valor_base in metricas_base.items():
+            sentido = _sentido(metrica)
+            valor_nuevo = metricas_nuevo.get(metrica)
+            if not sentido or valor_nuevo is None or not valor_base or (metricas and metrica not in metricas):
+                continue
+            variacion = (valor_nuevo - valor_base) / valor_base
+            filas.append({
+                "caso": caso,
+                "metrica": metrica,
+                "base": valor_base,
+                "nuevo": valor_nuevo,
+                "variacion": round(variacion, 4),
+                "regresion": sentido * variacion < -umbral,
+            })
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base", help="Resultados de referencia (JSON)")
+    parser.add_argument("nuevo", help="Resultados a evaluar (JSON)")
+    parser.add_argument("--umbral", type=float, default=0.10, help="Variación relativa tolerada (por defecto 0.10)")
+    parser.add_argument("--metrica", action="append", dest="metricas", help="Comparar solo esta métrica (repetible)")
+    args = parser.parse_args()
+    base, nuevo = cargar(args.base), cargar(args.nuevo)
+    try:
+        filas = comparar(base, nuevo, args.umbral, args.metricas)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(2)
+    print(f"Base: {base.get('commit')} ({base.get('fecha')})  Nuevo: {nuevo.get('commit')} ({nuevo.get('fecha')})")
+    for fila in filas:
+        marca = "REGRESIÓN" if fila["regresion"] else ""
+        print(f"{fila['caso']:<55} {fila['metrica']:<14} {fila['base']:>10} -> {fila['nuevo']:>10} "
+              f"{fila['variacion']:>+8.1%} {marca}")
+    regresiones = [fila for fila in filas if fila["regresion"]]
+    print(f"{len(regresiones)} regresión(es) con umbral {args.umbral:.0%}")
+    sys.exit(1 if regresiones else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark de concurrencia: latencia con muchos clientes en paralelo.
+
+Lanza N clientes concurrentes contra la aplicación en el mismo proceso
+(transporte ASGI de httpx, sin red) y reporta throughput y percentiles de
+latencia. Sirve para comprobar que el acceso a la base de datos no bloquea
+el event loop: si un handler bloquea, todos los demás clientes esperan y la
+p99 crece con el número de clientes.
+
+Con `--escrituras` una fracción de las peticiones son POST /empleado/, para
+medir carga mixta de lectura y escritura.
+
+Uso:
+    python -m benchmarks.concurrencia --clientes 200 --peticiones 20
+    python -m benchmarks.concurrencia --clientes 50 --escrituras 0.2
+    python -m benchmarks.concurrencia --salida carga.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from app.database import engine
+from app.main import app
+from app.migraciones import migrar
+from benchmarks.resultados import documento, guardar, resumen_latencias
+
+RUTAS_POR_DEFECTO = [
+    "/empleado/?limit=50",
+    "/proyecto/?limit=50",
+    "/empleado/1",
+    "/proyecto/1",
+    "/empleado/1/proyectos",
+    "/proyecto/1/empleados",
+]
+
+
+EMPLEADO_DE_PRUEBA = {
+    "nombre": "Empleado de Prueba",
+    "especialidad": "Benchmark",
+    "salario": 1000.0,
+    "estado": "Activo",
+}
+
+
+async def _cliente(http: httpx.AsyncClient, rutas: list[str], peticiones: int, escrituras: float,
+                   azar: random.Random, latencias: list[float], errores: list[int]):
+    for i in range(peticiones):
+        ruta = rutas[i % len(rutas)]
+        inicio = time.perf_counter()
+        if azar.random() < escrituras:
+            respuesta = await http.post("/empleado/", json=EMPLEADO_DE_PRUEBA)
+        else:
+            respuesta = await http.get(ruta)
+        latencias.append(time.perf_counter() - inicio)
+        if respuesta.status_code >= 500:
+            errores.append(respuesta.status_code)
+
+
+async def ejecutar(clientes: int, peticiones: int, rutas: list[str], escrituras: float = 0.0, semilla: int = 0) -> dict:
+    """
+    Ejecuta el benchmark y devuelve las métricas.
+
+    Args:
+        clientes: Número de clientes concurrentes
+        peticiones: Peticiones que hace cada cliente
+        rutas: Rutas GET que cada cliente recorre en orden
+        escrituras: Fracción de peticiones que son escrituras (0 a 1)
+        semilla: Semilla para elegir qué peticiones son escrituras
+
+    Returns:
+        dict: Throughput (peticiones/s) y latencias p50/p95/p99 en milisegundos
+    """
+    latencias: list[float] = []
+    errores: list[int] = []
+    transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    # El transporte ASGI no envía los eventos de lifespan: se ejecuta el arranque explícitamente
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transporte, base_url="http://bench") as http:
+        await http.get("/")
+        inicio = time.perf_counter()
+        await asyncio.gather(*(
+            _cliente(http, rutas, peticiones, escrituras, random.Random(semilla + n), latencias, errores)
+            for n in range(clientes)
+        ))
+        duracion = time.perf_counter() - inicio
+    return {
+        "clientes": clientes,
+        "escrituras": escrituras,
+        "peticiones": len(latencias),
+        "errores": len(errores),
+        "duracion_s": round(duracion, 3),
+        "throughput_rps": round(len(latencias) / duracion, 1),
+        **resumen_latencias(latencias),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--peticiones", type=int, default=20, help="Peticiones por cliente")
+    parser.add_argument("--ruta", action="append", dest="rutas", help="Ruta GET a incluir (repetible)")
+    parser.add_argument("--escrituras", type=float, default=0.0, help="Fracción de peticiones POST /empleado/")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados (ver benchmarks.comparar)")
+    args = parser.parse_args()
+    rutas = args.rutas or RUTAS_POR_DEFECTO
+    migrar(engine)
+    resultado = asyncio.run(ejecutar(args.clientes, args.peticiones, rutas, args.escrituras, args.semilla))
+    print(json.dumps(resultado, indent=2))
+    if args.salida:
+        parametros = {"clientes": args.clientes, "peticiones": args.peticiones, "rutas": rutas,
+                      "escrituras": args.escrituras, "semilla": args.semilla}
+        guardar(args.salida, documento("concurrencia", parametros, {"carga": resultado}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Generador reproducible de datos sintéticos para los benchmarks.
+
+Llena la base de datos configurada (`DATABASE_URL`, por defecto
+`Proyectos.db`) con N empleados, M proyectos y asignaciones en
+`EmpleadoProyecto`. Con la misma semilla y los mismos parámetros genera
+exactamente los mismos datos (y los mismos ids, partiendo de tablas vacías),
+de modo que dos ejecuciones de los benchmarks miden lo mismo.
+
+Los textos cumplen las validaciones de los esquemas (solo letras y espacios),
+así los datos generados se pueden modificar a través de la API. Las filas se
+insertan en lotes con sentencias multi-fila; al terminar se reconstruyen los
+resúmenes agregados (los índices de búsqueda se mantienen con sus triggers).
+
+Uso:
+    python -m benchmarks.datos --empleados 10000 --proyectos 1000 --densidad 0.002
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.datos --limpiar --semilla 7
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from sqlalchemy import delete, func, insert, select
+
+from app.models import Empleado, EmpleadoProyecto, Estado, Proyecto
+from app.resumenes import reconstruir as reconstruir_resumenes
+
+TAMANO_LOTE = 1000
+
+NOMBRES = ["Ana", "Carlos", "Lucía", "Martín", "Sofía", "Diego", "Valentina", "Andrés", "Camila", "José",
+           "María", "Julián", "Paula", "Tomás", "Elena", "Mateo", "Isabel", "Nicolás", "Laura", "Gabriel"]
+APELLIDOS = ["García", "Rodríguez", "Martínez", "López", "González", "Pérez", "Sánchez", "Ramírez", "Torres",
+             "Flores", "Rivera", "Gómez", "Díaz", "Cruz", "Morales", "Ortiz", "Gutiérrez", "Chávez", "Ruiz", "Peña"]
+ESPECIALIDADES = ["Desarrollador Backend", "Desarrolladora Frontend", "Analista de Datos", "Diseñador UX",
+                  "Arquitecto de Software", "Administrador de Sistemas", "Gerente de Proyecto", "Tester QA",
+                  "Ingeniera de Datos", "Especialista en Seguridad"]
+TEMAS = ["Sistema", "Portal", "Plataforma", "Aplicación", "Servicio", "Módulo", "Tablero", "Motor"]
+AREAS = ["Inventario", "Facturación", "Nómina", "Ventas", "Logística", "Clientes", "Reportes", "Compras"]
+DESCRIPCIONES = ["Desarrollo de la nueva versión para la gestión interna",
+                 "Migración de datos desde el sistema anterior",
+                 "Integración con proveedores y servicios externos",
+                 "Mejoras de rendimiento y estabilidad del servicio",
+                 "Rediseño de la interfaz para dispositivos móviles"]
+
+
+def en_letras(numero: int) -> str:
+    """
+    Representa un número natural solo con letras (a, b, ..., z, aa, ab, ...).
+
+    Los nombres de proyecto deben ser únicos y solo pueden contener letras,
+    por lo que el índice del proyecto se codifica así.
+    """
+    letras = ""
+    numero += 1
+    while numero:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(ord("a") + resto) + letras
+    return letras.capitalize()
+
+
+def _empleado(azar: random.Random) -> dict:
+    return {
+        "nombre": f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)}",
+        "especialidad": azar.choice(ESPECIALIDADES),
+        "salario": round(azar.uniform(1000, 9000), 2),
+        "estado": Estado.Activo if azar.random() < 0.9 else Estado.Inactivo,
+    }
+
+
+def _proyecto(azar: random.Random, indice: int, gerente_id: int) -> dict:
+    return {
+        "nombre": f"{azar.choice(TEMAS)} de {azar.choice(AREAS)} {en_letras(indice)}",
+        "descripcion": azar.choice(DESCRIPCIONES),
+        "presupuesto": round(azar.uniform(10000, 500000), 2),
+        "estado": Estado.Activo if azar.random() < 0.8 else Estado.Inactivo,
+        "gerente_id": gerente_id,
+    }
+
+
+def _insertar(conexion, entidad, filas):
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        conexion.execute(insert(entidad), filas[inicio:inicio + TAMANO_LOTE])
+
+
+def generar(engine, empleados: int, proyectos: int, densidad: float, semilla: int = 0,
+            limpiar: bool = False) -> dict:
+    """
+    Genera los datos sintéticos en una sola transacción.
+
+    Args:
+        engine: Motor de base de datos (con el esquema ya migrado)
+        empleados: Cantidad de empleados
+        proyectos: Cantidad de proyectos (requiere al menos un empleado como gerente)
+        densidad: Fracción de pares (empleado, proyecto) asignados, de 0 a 1; el
+                  equipo de cada proyecto varía entre 0.5 y 1.5 veces la media
+        semilla: Semilla del generador pseudoaleatorio
+        limpiar: Si se eliminan antes los datos existentes
+
+    Returns:
+        dict: Cantidades generadas y duración
+
+    Raises:
+        ValueError: Si los parámetros no son válidos o la base de datos ya tiene
+                    datos y no se pidió limpiarla
+    """
+    if empleados < 0 or proyectos < 0 or not 0 <= densidad <= 1:
+        raise ValueError("Las cantidades deben ser positivas y la densidad estar entre 0 y 1")
+    if proyectos and not empleados:
+        raise ValueError("Se necesita al menos un empleado para asignar gerentes")
+    azar = random.Random(semilla)
+    inicio = time.perf_counter()
+    with engine.begin() as conexion:
+        if limpiar:
+            for entidad in (EmpleadoProyecto, Proyecto, Empleado):
+                conexion.execute(delete(entidad))
+        elif conexion.execute(select(func.count()).select_from(Empleado)).scalar_one():
+            raise ValueError("La base de datos ya tiene datos; use --limpiar para reemplazarlos")
+
+        _insertar(conexion, Empleado, [_empleado(azar) for _ in range(empleados)])
+        empleado_ids = conexion.execute(select(Empleado.id).order_by(Empleado.id)).scalars().all()
+
+        _insertar(conexion, Proyecto, [_proyecto(azar, indice, azar.choice(empleado_ids)) for indice in range(proyectos)])
+        proyecto_ids = conexion.execute(select(Proyecto.id).order_by(Proyecto.id)).scalars().all()
+
+        media = densidad * len(empleado_ids)
+        asignaciones = []
+        for proyecto_id in proyecto_ids:
+            tamano = min(len(empleado_ids), round(azar.uniform(0.5, 1.5) * media))
+            asignaciones.extend({"proyecto_id": proyecto_id, "empleado_id": empleado_id}
+                                for empleado_id in azar.sample(empleado_ids, tamano))
+        _insertar(conexion, EmpleadoProyecto, asignaciones)
+        reconstruir_resumenes(conexion)
+    return {
+        "empleados": len(empleado_ids),
+        "proyectos": len(proyecto_ids),
+        "asignaciones": len(asignaciones),
+        "semilla": semilla,
+        "duracion_s": round(time.perf_counter() - inicio, 3),
+    }
+
+
+def main():
+    from app.database import engine
+    from app.migraciones import migrar
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--empleados", type=int, default=10000)
+    parser.add_argument("--proyectos", type=int, default=1000)
+    parser.add_argument("--densidad", type=float, default=0.002,
+                        help="Fracción de pares (empleado, proyecto) asignados (0.002 = 20 por proyecto con 10000 empleados)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--limpiar", action="store_true", help="Eliminar los datos existentes antes de generar")
+    args = parser.parse_args()
+    migrar(engine)
+    try:
+        resultado = generar(engine, args.empleados, args.proyectos, args.densidad, args.semilla, args.limpiar)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
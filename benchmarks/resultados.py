@@ -0,0 +1,92 @@
+"""
+Formato común de los resultados de los benchmarks.
+
+Todos los benchmarks pueden guardar sus resultados como JSON con la misma
+forma, para compararlos entre ejecuciones con `python -m benchmarks.comparar`:
+
+    {
+      "benchmark": "rutas",
+      "fecha": "2025-01-01T12:00:00+00:00",
+      "commit": "abc1234",
+      "python": "3.11.4",
+      "parametros": {...},
+      "resultados": {"GET /empleado/": {"ops_s": 950.2, "p95_ms": 1.8, ...}, ...}
+    }
+
+Las métricas terminadas en `_ms` son latencias (menor es mejor); las
+terminadas en `_rps`, `ops_s` u `obj_s` son de rendimiento (mayor es mejor).
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por el método del rango más cercano."""
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def resumen_latencias(latencias: list[float]) -> dict:
+    """
+    Percentiles y media de una lista de latencias.
+
+    Args:
+        latencias: Duraciones en segundos
+
+    Returns:
+        dict: p50_ms, p95_ms, p99_ms y media_ms
+    """
+    return {
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "media_ms": round(statistics.fmean(latencias) * 1000, 3),
+    }
+
+
+def _commit_actual() -> str | None:
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def documento(benchmark: str, parametros: dict, resultados: dict) -> dict:
+    """
+    Arma el documento de resultados con los metadatos de la ejecución.
+
+    Args:
+        benchmark: Nombre del benchmark (p. ej. "rutas")
+        parametros: Parámetros con los que se ejecutó
+        resultados: Métricas por caso (nombre -> dict de métricas)
+
+    Returns:
+        dict: Documento listo para `guardar`
+    """
+    return {
+        "benchmark": benchmark,
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+
+
+def guardar(ruta: str, contenido: dict):
+    """Escribe un documento de resultados como JSON."""
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(contenido, archivo, indent=2, ensure_ascii=False)
+        archivo.write("\n")
+
+
+def cargar(ruta: str) -> dict:
+    """Lee un documento de resultados guardado con `guardar`."""
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
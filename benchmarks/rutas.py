@@ -0,0 +1,410 @@
+"""
+Micro-benchmarks por ruta de la API, en el mismo proceso (transporte ASGI).
+
+Para cada ruta de `app/routes/empleado.py` y `app/routes/proyecto.py` hay un
+escenario que arma una petición válida sobre los datos existentes y la repite
+de forma secuencial, midiendo solo esa petición. Los escenarios de escritura
+preparan lo que necesitan (p. ej. crear el empleado que luego se elimina) con
+peticiones que no se miden.
+
+Los datos se toman de la base configurada, que conviene llenar antes con
+`python -m benchmarks.datos`. Si una ruta de los routers no tiene escenario
+se informa en `sin_escenario`, para que se agregue al sumarlo.
+
+Uso:
+    python -m benchmarks.rutas --iteraciones 200 --salida rutas.json
+    python -m benchmarks.rutas --ruta /proyecto --sin-cache
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.datos import en_letras
+from benchmarks.resultados import documento, guardar, resumen_latencias
+
+# "MÉTODO /ruta" -> escenario
+ESCENARIOS = {}
+
+
+def escenario(metodo: str, ruta: str):
+    """
+    Registra un escenario para una ruta.
+
+    El escenario es una corrutina `(http, contexto, i)` que hace las
+    peticiones de preparación necesarias y devuelve la petición a medir como
+    (método, url, argumentos de `httpx.AsyncClient.request`).
+    """
+    def registrar(funcion):
+        ESCENARIOS[f"{metodo} {ruta}"] = funcion
+        return funcion
+    return registrar
+
+
+class Contexto:
+    """
+    Datos existentes sobre los que operan los escenarios.
+
+    Attributes:
+        empleados: Hasta 100 empleados (id -> dict con sus campos)
+        proyectos: Hasta 100 proyectos (id -> dict con sus campos)
+        prefijo: Prefijo único de la ejecución para los nombres de proyecto nuevos
+    """
+
+    def __init__(self, empleados: dict, proyectos: dict):
+        self.empleados = empleados
+        self.proyectos = proyectos
+        self.empleado_ids = list(empleados)
+        self.proyecto_ids = list(proyectos)
+        self.prefijo = en_letras(time.time_ns() % 10**12)
+
+    def empleado_id(self, i: int) -> int:
+        return self.empleado_ids[i % len(self.empleado_ids)]
+
+    def proyecto_id(self, i: int) -> int:
+        return self.proyecto_ids[i % len(self.proyecto_ids)]
+
+    def nombre_proyecto(self, i: int) -> str:
+        return f"Bench {self.prefijo} {en_letras(i)}"
+
+
+def _empleado_nuevo() -> dict:
+    return {"nombre": "Empleado de Prueba", "especialidad": "Benchmark", "salario": 1000.0, "estado": "Activo"}
+
+
+def _proyecto_nuevo(contexto: Contexto, nombre: str, i: int) -> dict:
+    return {"nombre": nombre, "descripcion": "Proyecto creado por el benchmark", "presupuesto": 10000.0 + i,
+            "estado": "Activo", "gerente_id": contexto.empleado_id(i)}
+
+
+async def _crear_empleados(http: httpx.AsyncClient, cantidad: int) -> list[int]:
+    respuesta = await http.post("/empleado/bulk", json=[_empleado_nuevo() for _ in range(cantidad)])
+    return [resultado["id"] for resultado in respuesta.json()["resultados"]]
+
+
+# Empleados
+@escenario("POST", "/empleado/")
+async def _(http, contexto, i):
+    return "POST", "/empleado/", {"json": _empleado_nuevo()}
+
+
+@escenario("POST", "/empleado/bulk")
+async def _(http, contexto, i):
+    return "POST", "/empleado/bulk", {"json": [_empleado_nuevo() for _ in range(100)]}
+
+
+@escenario("POST", "/empleado/import")
+async def _(http, contexto, i):
+    filas = "".join(f"Empleado Importado {en_letras(k)},Benchmark,{1000 + k},Activo\n" for k in range(100))
+    return "POST", "/empleado/import", {"content": "nombre,especialidad,salario,estado\n" + filas,
+                                        "headers": {"Content-Type": "text/csv"}}
+
+
+@escenario("POST", "/empleado/eliminar")
+async def _(http, contexto, i):
+    empleado_ids = await _crear_empleados(http, 100)
+    return "POST", "/empleado/eliminar", {"json": {"ids": empleado_ids}}
+
+
+@escenario("GET", "/empleado/")
+async def _(http, contexto, i):
+    return "GET", "/empleado/", {"params": {"limit": 50, "estado": "Activo"}}
+
+
+@escenario("GET", "/empleado/export")
+async def _(http, contexto, i):
+    return "GET", "/empleado/export", {"params": {"estado": "Inactivo"}}
+
+
+@escenario("GET", "/empleado/buscar")
+async def _(http, contexto, i):
+    return "GET", "/empleado/buscar", {"params": {"q": "desa", "limit": 20}}
+
+
+@escenario("GET", "/empleado/multiple")
+async def _(http, contexto, i):
+    ids = ",".join(str(contexto.empleado_id(i + k)) for k in range(20))
+    return "GET", "/empleado/multiple", {"params": {"ids": ids}}
+
+
+@escenario("GET", "/empleado/{empleado_id}")
+async def _(http, contexto, i):
+    return "GET", f"/empleado/{contexto.empleado_id(i)}", {}
+
+
+@escenario("PUT", "/empleado/{empleado_id}")
+async def _(http, contexto, i):
+    empleado_id = contexto.empleado_id(i)
+    cuerpo = dict(contexto.empleados[empleado_id], salario=1000.0 + i)
+    return "PUT", f"/empleado/{empleado_id}", {"json": cuerpo}
+
+
+@escenario("PATCH", "/empleado/{empleado_id}")
+async def _(http, contexto, i):
+    return "PATCH", f"/empleado/{contexto.empleado_id(i)}", {"json": {"salario": 2000.0 + i}}
+
+
+@escenario("DELETE", "/empleado/{empleado_id}")
+async def _(http, contexto, i):
+    empleado_id, = await _crear_empleados(http, 1)
+    return "DELETE", f"/empleado/{empleado_id}", {}
+
+
+@escenario("GET", "/empleado/{empleado_id}/proyectos")
+async def _(http, contexto, i):
+    return "GET", f"/empleado/{contexto.empleado_id(i)}/proyectos", {}
+
+
+@escenario("GET", "/empleado/{empleado_id}/colaboradores")
+async def _(http, contexto, i):
+    return "GET", f"/empleado/{contexto.empleado_id(i)}/colaboradores", {"params": {"profundidad": 1 + i % 2, "limit": 50}}
+
+
+# Proyectos
+@escenario("POST", "/proyecto/")
+async def _(http, contexto, i):
+    return "POST", "/proyecto/", {"json": _proyecto_nuevo(contexto, contexto.nombre_proyecto(i), i)}
+
+
+@escenario("POST", "/proyecto/bulk")
+async def _(http, contexto, i):
+    items = [_proyecto_nuevo(contexto, f"{contexto.nombre_proyecto(i)} Lote {en_letras(n)}", n) for n in range(50)]
+    return "POST", "/proyecto/bulk", {"json": items}
+
+
+@escenario("POST", "/proyecto/eliminar")
+async def _(http, contexto, i):
+    items = [_proyecto_nuevo(contexto, f"{contexto.nombre_proyecto(i)} Borrar Lote {en_letras(n)}", n) for n in range(50)]
+    respuesta = await http.post("/proyecto/bulk", json=items)
+    return "POST", "/proyecto/eliminar", {"json": {"ids": [r["id"] for r in respuesta.json()["resultados"]]}}
+
+
+@escenario("GET", "/proyecto/")
+async def _(http, contexto, i):
+    return "GET", "/proyecto/", {"params": {"limit": 50, "presupuesto_min": 100000}}
+
+
+@escenario("GET", "/proyecto/export")
+async def _(http, contexto, i):
+    return "GET", "/proyecto/export", {"params": {"estado": "Inactivo"}}
+
+
+@escenario("GET", "/proyecto/buscar")
+async def _(http, contexto, i):
+    return "GET", "/proyecto/buscar", {"params": {"q": "sistema inv", "limit": 20}}
+
+
+@escenario("GET", "/proyecto/stats")
+async def _(http, contexto, i):
+    return "GET", "/proyecto/stats", {}
+
+
+@escenario("GET", "/proyecto/costos")
+async def _(http, contexto, i):
+    return "GET", "/proyecto/costos", {"params": {"limit": 50}}
+
+
+@escenario("GET", "/proyecto/{proyecto_id}/costos")
+async def _(http, contexto, i):
+    return "GET", f"/proyecto/{contexto.proyecto_id(i)}/costos", {}
+
+
+@escenario("POST", "/proyecto/multiple")
+async def _(http, contexto, i):
+    return "POST", "/proyecto/multiple", {"json": {"ids": [contexto.proyecto_id(i + k) for k in range(20)]}}
+
+
+@escenario("GET", "/proyecto/{proyecto_id}")
+async def _(http, contexto, i):
+    return "GET", f"/proyecto/{contexto.proyecto_id(i)}", {}
+
+
+@escenario("PUT", "/proyecto/{proyecto_id}")
+async def _(http, contexto, i):
+    proyecto_id = contexto.proyecto_id(i)
+    cuerpo = dict(contexto.proyectos[proyecto_id], presupuesto=50000.0 + i)
+    return "PUT", f"/proyecto/{proyecto_id}", {"json": cuerpo}
+
+
+@escenario("PATCH", "/proyecto/{proyecto_id}")
+async def _(http, contexto, i):
+    return "PATCH", f"/proyecto/{contexto.proyecto_id(i)}", {"json": {"presupuesto": 60000.0 + i}}
+
+
+@escenario("DELETE", "/proyecto/{proyecto_id}")
+async def _(http, contexto, i):
+    respuesta = await http.post("/proyecto/", json=_proyecto_nuevo(contexto, f"{contexto.nombre_proyecto(i)} Borrar", i))
+    return "DELETE", f"/proyecto/{respuesta.json()['id']}", {}
+
+
+@escenario("POST", "/proyecto/{proyecto_id}/asignar")
+async def _(http, contexto, i):
+    empleado_id, = await _crear_empleados(http, 1)
+    return "POST", f"/proyecto/{contexto.proyecto_id(i)}/asignar", {"json": {"empleado_id": empleado_id}}
+
+
+@escenario("POST", "/proyecto/{proyecto_id}/asignar/batch")
+async def _(http, contexto, i):
+    empleado_ids = await _crear_empleados(http, 10)
+    return "POST", f"/proyecto/{contexto.proyecto_id(i)}/asignar/batch", {"json": {"empleado_ids": empleado_ids}}
+
+
+@escenario("POST", "/proyecto/{proyecto_id}/desasignar/batch")
+async def _(http, contexto, i):
+    proyecto_id = contexto.proyecto_id(i)
+    empleado_ids = await _crear_empleados(http, 10)
+    await http.post(f"/proyecto/{proyecto_id}/asignar/batch", json={"empleado_ids": empleado_ids})
+    return "POST", f"/proyecto/{proyecto_id}/desasignar/batch", {"json": {"empleado_ids": empleado_ids}}
+
+
+@escenario("DELETE", "/proyecto/{proyecto_id}/desasignar/{empleado_id}")
+async def _(http, contexto, i):
+    proyecto_id = contexto.proyecto_id(i)
+    empleado_id, = await _crear_empleados(http, 1)
+    await http.post(f"/proyecto/{proyecto_id}/asignar", json={"empleado_id": empleado_id})
+    return "DELETE", f"/proyecto/{proyecto_id}/desasignar/{empleado_id}", {}
+
+
+@escenario("GET", "/proyecto/{proyecto_id}/empleados")
+async def _(http, contexto, i):
+    return "GET", f"/proyecto/{contexto.proyecto_id(i)}/empleados", {}
+
+
+@escenario("GET", "/proyecto/{proyecto_id}/relacionados")
+async def _(http, contexto, i):
+    return "GET", f"/proyecto/{contexto.proyecto_id(i)}/relacionados", {"params": {"profundidad": 1 + i % 2, "limit": 50}}
+
+
+# Registro de cambios (lote JSON; el stream SSE no termina y no se mide aquí)
+@escenario("GET", "/cambios")
+async def _(http, contexto, i):
+    return "GET", "/cambios", {"params": {"since": i, "limit": 100}}
+
+
+@escenario("POST", "/consulta")
+async def _(http, contexto, i):
+    seleccion = {"ids": [contexto.proyecto_id(i + k) for k in range(10)], "gerente": {"campos": ["id", "nombre"]},
+                 "empleados": {"campos": ["id", "nombre"], "proyectos": {"campos": ["id", "nombre"]}}}
+    return "POST", "/consulta", {"json": {"proyectos": seleccion}}
+
+
+def rutas_de_la_api(app) -> list[str]:
+    """Rutas "MÉTODO /ruta" de los routers de empleados, proyectos, cambios y consulta compuesta."""
+    return [f"{metodo} {ruta.path}" for ruta in app.routes
+            if ruta.path.startswith(("/empleado", "/proyecto", "/cambios", "/consulta")) for metodo in sorted(ruta.methods)]
+
+
+def cargar_contexto(engine) -> Contexto:
+    """
+    Lee hasta 100 empleados y 100 proyectos existentes para los escenarios.
+
+    Raises:
+        ValueError: Si la base de datos no tiene empleados o proyectos
+    """
+    from app.models import Empleado, Proyecto
+
+    campos_empleado = (Empleado.id, Empleado.nombre, Empleado.especialidad, Empleado.salario, Empleado.estado)
+    campos_proyecto = (Proyecto.id, Proyecto.nombre, Proyecto.descripcion, Proyecto.presupuesto, Proyecto.estado,
+                       Proyecto.gerente_id)
+    with engine.connect() as conexion:
+        empleados = conexion.execute(select(*campos_empleado).order_by(Empleado.id).limit(100)).all()
+        proyectos = conexion.execute(select(*campos_proyecto).order_by(Proyecto.id).limit(100)).all()
+    if not empleados or not proyectos:
+        raise ValueError("La base de datos no tiene datos; genere datos con `python -m benchmarks.datos`")
+
+    def como_dict(fila) -> dict:
+        datos = fila._asdict()
+        datos.pop("id")
+        return {clave: getattr(valor, "value", valor) for clave, valor in datos.items()}
+
+    return Contexto({fila.id: como_dict(fila) for fila in empleados}, {fila.id: como_dict(fila) for fila in proyectos})
+
+
+async def _medir(http: httpx.AsyncClient, funcion, contexto: Contexto, iteraciones: int, calentamiento: int) -> dict:
+    latencias = []
+    errores = 0
+    for i in range(calentamiento + iteraciones):
+        metodo, url, argumentos = await funcion(http, contexto, i)
+        inicio = time.perf_counter()
+        respuesta = await http.request(metodo, url, **argumentos)
+        duracion = time.perf_counter() - inicio
+        if i < calentamiento:
+            continue
+        latencias.append(duracion)
+        if respuesta.status_code >= 400:
+            errores += 1
+    return {
+        "iteraciones": iteraciones,
+        "errores": errores,
+        "ops_s": round(iteraciones / sum(latencias), 1),
+        **resumen_latencias(latencias),
+    }
+
+
+async def ejecutar(app, engine, iteraciones: int, calentamiento: int = 10, filtro: str | None = None) -> tuple[dict, list[str]]:
+    """
+    Ejecuta los escenarios de todas las rutas (o de las que contienen `filtro`).
+
+    Las rutas de lectura se miden antes que las de escritura, para que las
+    escrituras del benchmark no cambien los datos que leen las primeras.
+
+    Args:
+        app: Aplicación FastAPI
+        engine: Motor de la base de datos que usa la aplicación
+        iteraciones: Peticiones medidas por ruta
+        calentamiento: Peticiones previas no medidas por ruta
+        filtro: Texto que debe contener "MÉTODO /ruta" para incluirla
+
+    Returns:
+        tuple: (métricas por ruta, rutas sin escenario)
+    """
+    contexto = cargar_contexto(engine)
+    rutas = [ruta for ruta in rutas_de_la_api(app) if not filtro or filtro in ruta]
+    sin_escenario = [ruta for ruta in rutas if ruta not in ESCENARIOS]
+    rutas = sorted((ruta for ruta in rutas if ruta in ESCENARIOS), key=lambda ruta: not ruta.startswith("GET "))
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    # El transporte ASGI no envía los eventos de lifespan: se ejecuta el arranque explícitamente
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transporte, base_url="http://bench") as http:
+        for ruta in rutas:
+            resultados[ruta] = await _medir(http, ESCENARIOS[ruta], contexto, iteraciones, calentamiento)
+            print(f"{ruta}: {resultados[ruta]['ops_s']} ops/s, p95 {resultados[ruta]['p95_ms']} ms", file=sys.stderr)
+    return resultados, sin_escenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iteraciones", type=int, default=200, help="Peticiones medidas por ruta")
+    parser.add_argument("--calentamiento", type=int, default=10, help="Peticiones previas no medidas por ruta")
+    parser.add_argument("--ruta", help="Medir solo las rutas que contienen este texto (p. ej. 'GET /proyecto')")
+    parser.add_argument("--sin-cache", action="store_true", help="Deshabilitar la caché de respuestas")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados (ver benchmarks.comparar)")
+    args = parser.parse_args()
+    if args.sin_cache:
+        # La configuración se lee al importar la aplicación
+        os.environ["CACHE_HABILITADO"] = "false"
+    from app.database import engine
+    from app.main import app
+
+    try:
+        resultados, sin_escenario = asyncio.run(
+            ejecutar(app, engine, args.iteraciones, args.calentamiento, args.ruta))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    parametros = {"iteraciones": args.iteraciones, "calentamiento": args.calentamiento, "ruta": args.ruta,
+                  "cache": not args.sin_cache, "sin_escenario": sin_escenario}
+    contenido = documento("rutas", parametros, resultados)
+    print(json.dumps(contenido, indent=2, ensure_ascii=False))
+    if args.salida:
+        guardar(args.salida, contenido)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Micro-benchmark de validación y serialización de los esquemas.
+
+Mide objetos por segundo, sin base de datos ni HTTP, para:
+
+- Validar `EmpleadoBase` y `ProyectoBase` desde dicts (lo que hace cada POST).
+  Se compara con validadores equivalentes que llaman a `re.match` con el
+  patrón como texto, como hacían antes los esquemas.
+- Serializar `ProyectoConRelaciones` desde objetos ORM con su gerente y su
+  equipo cargados. Se compara el camino de `response_model` (validar el
+  objeto, convertirlo a dict JSON y codificarlo con `json.dumps`) con el
+  camino directo de `app.serializacion` (`volcar` + `a_json`).
+
+Uso:
+    python -m benchmarks.serializacion
+    python -m benchmarks.serializacion --objetos 20000 --equipo 25
+    python -m benchmarks.serializacion --salida serializacion.json
+"""
+
+import argparse
+import json
+import re
+import time
+
+from pydantic import field_validator
+from sqlmodel import Field, SQLModel
+
+from app.models import Empleado, EmpleadoBase, Estado, Proyecto, ProyectoBase, ProyectoConRelaciones
+from app.serializacion import a_json, orjson, volcar
+from benchmarks.resultados import documento, guardar
+
+
+class _EmpleadoPatronTexto(SQLModel):
+    """EmpleadoBase con el validador anterior (patrón como texto en cada llamada)."""
+    nombre: str = Field(min_length=3, max_length=50)
+    especialidad: str = Field(min_length=3, max_length=50)
+    salario: float = Field(gt=0)
+    estado: Estado
+
+    @field_validator('salario')
+    @classmethod
+    def redondear_salario(cls, v: float) -> float:
+        return round(v, 2)
+
+    @field_validator('nombre', 'especialidad')
+    @classmethod
+    def validar_solo_letras(cls, v: str) -> str:
+        patron = r"^[a-zA-ZñÑáéíóúÁÉÍÓÚ\s]+$"
+        if not re.match(patron, v):
+            raise ValueError(f"El campo debe contener solo letras y espacios. Valor recibido: '{v}'")
+        return v
+
+
+class _ProyectoPatronTexto(SQLModel):
+    """ProyectoBase con el validador anterior (patrón como texto en cada llamada)."""
+    nombre: str = Field(min_length=3, max_length=50)
+    descripcion: str = Field(min_length=10, max_length=100)
+    presupuesto: float = Field(gt=0)
+    estado: Estado
+
+    @field_validator('presupuesto')
+    @classmethod
+    def redondear_presupuesto(cls, v: float) -> float:
+        return round(v, 2)
+
+    @field_validator('nombre', 'descripcion')
+    @classmethod
+    def validar_solo_letras(cls, v: str) -> str:
+        patron = r"^[a-zA-ZñÑáéíóúÁÉÍÓÚ\s]+$"
+        if not re.match(patron, v):
+            raise ValueError(f"El campo debe contener solo letras y espacios. Valor recibido: '{v}'")
+        return v
+
+
+def _empleado(n: int) -> dict:
+    return {"nombre": "Empleado de Prueba", "especialidad": "Desarrollador Backend",
+            "salario": 1000.0 + n, "estado": "Activo"}
+
+
+def _proyecto(n: int) -> dict:
+    return {"nombre": "Proyecto de Prueba", "descripcion": "Descripcion del proyecto de prueba",
+            "presupuesto": 50000.0 + n, "estado": "Activo"}
+
+
+def _proyecto_con_relaciones(n: int, equipo: int) -> Proyecto:
+    """Proyecto ORM (sin sesión) con gerente y equipo, como lo deja `obtener_con_relaciones`."""
+    gerente = Empleado(id=n, **_empleado(n))
+    empleados = [Empleado(id=n * 1000 + i, **_empleado(i)) for i in range(equipo)]
+    return Proyecto(id=n, gerente_id=n, gerente=gerente, empleados=empleados, **_proyecto(n))
+
+
+def _por_segundo(funcion, objetos: list) -> float:
+    inicio = time.perf_counter()
+    for objeto in objetos:
+        funcion(objeto)
+    return round(len(objetos) / (time.perf_counter() - inicio), 1)
+
+
+def _comparar(antes, ahora, objetos: list) -> dict:
+    antes_ops, ahora_ops = _por_segundo(antes, objetos), _por_segundo(ahora, objetos)
+    return {"antes_obj_s": antes_ops, "ahora_obj_s": ahora_ops, "mejora": round(ahora_ops / antes_ops, 2)}
+
+
+def ejecutar(objetos: int, equipo: int) -> dict:
+    """
+    Ejecuta las mediciones.
+
+    Args:
+        objetos: Cantidad de objetos por medición
+        equipo: Empleados en el equipo de cada ProyectoConRelaciones
+
+    Returns:
+        dict: Objetos por segundo antes/ahora para cada esquema
+    """
+    empleados = [_empleado(n) for n in range(objetos)]
+    proyectos = [_proyecto(n) for n in range(objetos)]
+    # La serialización es más cara por objeto (incluye el equipo); se usan menos
+    proyectos_orm = [_proyecto_con_relaciones(n, equipo) for n in range(max(1, objetos // 10))]
+
+    def response_model(proyecto):
+        return json.dumps(ProyectoConRelaciones.model_validate(proyecto).model_dump(mode="json"),
+                          ensure_ascii=False, separators=(",", ":")).encode()
+
+    def directo(proyecto):
+        return a_json(volcar(proyecto, ProyectoConRelaciones))
+
+    assert json.loads(response_model(proyectos_orm[0])) == json.loads(directo(proyectos_orm[0]))
+    return {
+        "objetos": objetos,
+        "equipo": equipo,
+        "codificador": "orjson" if orjson is not None else "pydantic-core",
+        "EmpleadoBase (validación)": _comparar(_EmpleadoPatronTexto.model_validate, EmpleadoBase.model_validate, empleados),
+        "ProyectoBase (validación)": _comparar(_ProyectoPatronTexto.model_validate, ProyectoBase.model_validate, proyectos),
+        "ProyectoConRelaciones (serialización)": _comparar(response_model, directo, proyectos_orm),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objetos", type=int, default=20000)
+    parser.add_argument("--equipo", type=int, default=10, help="Empleados por proyecto en ProyectoConRelaciones")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados (ver benchmarks.comparar)")
+    args = parser.parse_args()
+    resultado = ejecutar(args.objetos, args.equipo)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    if args.salida:
+        parametros = {clave: resultado.pop(clave) for clave in ("objetos", "equipo", "codificador")}
+        guardar(args.salida, documento("serializacion", parametros, resultado))
+
+
+if __name__ == "__main__":
+    main()
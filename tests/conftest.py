@@ -0,0 +1,32 @@
+"""
+Configuración de las pruebas con pytest.
+
+La configuración de la aplicación se lee al importarla, así que las variables
+de entorno se fijan aquí, antes de que los módulos de prueba importen `app`:
+una base SQLite temporal y sin caché de respuestas, para que cada petición
+llegue a la base de datos.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_directorio = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_directorio.name}/pruebas.db"
+os.environ["DATABASE_URL_LECTURA"] = ""
+os.environ["CACHE_HABILITADO"] = "false"
+os.environ["DB_AUTO_MIGRAR"] = "true"
+os.environ["CAMBIOS_MANTENIMIENTO_SEGUNDOS"] = "0"
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    """Cliente de prueba con la aplicación iniciada (migraciones incluidas)."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        yield cliente
+    _directorio.cleanup()
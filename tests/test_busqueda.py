@@ -0,0 +1,33 @@
+"""
+Búsqueda de texto completo de empleados (ver `app.busqueda`).
+
+Uso:
+    python -m pytest tests
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def empleado_id(cliente):
+    respuesta = cliente.post("/empleado/", json={"nombre": "Peña Muñoz", "especialidad": "Diseñador",
+                                                 "salario": 1000, "estado": "Activo"})
+    assert respuesta.status_code == 201, respuesta.text
+    return respuesta.json()["id"]
+
+
+def _buscar(cliente, q: str) -> list[int]:
+    respuesta = cliente.get("/empleado/buscar", params={"q": q})
+    assert respuesta.status_code == 200, respuesta.text
+    return [empleado["id"] for empleado in respuesta.json()["items"]]
+
+
+@pytest.mark.parametrize("q", ["peña", "PEÑA muñ", "diseñ"])
+def test_busqueda_con_enie(cliente, empleado_id, q):
+    assert empleado_id in _buscar(cliente, q)
+
+
+@pytest.mark.parametrize("q", ["pena", "munoz", "disenador"])
+def test_enie_se_pliega_a_n(cliente, empleado_id, q):
+    # remove_diacritics 2 trata la ñ como una n con tilde: "pena" también encuentra "Peña"
+    assert empleado_id in _buscar(cliente, q)
@@ -0,0 +1,87 @@
+"""
+Número de sentencias SQL de los endpoints de detalle (ver `app.consultas`).
+
+Las relaciones de la respuesta se cargan con opciones de carga anticipada, así
+que cada endpoint ejecuta un número fijo de sentencias, sin importar cuántos
+empleados o proyectos tenga la relación.
+
+Uso:
+    python -m pytest tests
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+
+INTEGRANTES = 5
+# Cada GET de detalle consulta primero las versiones para el ETag (ver `app.etag`)
+SENTENCIAS_ETAG = 1
+
+
+@pytest.fixture(scope="module")
+def datos(cliente):
+    """Un gerente con dos proyectos, y un equipo de INTEGRANTES empleados asignados a ambos."""
+    def crear_empleado(nombre):
+        respuesta = cliente.post("/empleado/", json={"nombre": nombre, "especialidad": "Backend", "salario": 1000,
+                                                    "estado": "Activo"})
+        assert respuesta.status_code == 201, respuesta.text
+        return respuesta.json()["id"]
+
+    def crear_proyecto(nombre, gerente_id):
+        respuesta = cliente.post("/proyecto/", json={"nombre": nombre, "descripcion": "Proyecto de prueba",
+                                                     "presupuesto": 5000, "estado": "Activo",
+                                                     "gerente_id": gerente_id})
+        assert respuesta.status_code == 201, respuesta.text
+        return respuesta.json()["id"]
+
+    gerente_id = crear_empleado("Gerente")
+    proyecto_ids = [crear_proyecto(f"Proyecto {letra}", gerente_id) for letra in "AB"]
+    empleado_ids = [crear_empleado(f"Integrante {letra}") for letra in "ABCDE"[:INTEGRANTES]]
+    for proyecto_id in proyecto_ids:
+        respuesta = cliente.post(f"/proyecto/{proyecto_id}/asignar/batch", json={"empleado_ids": empleado_ids})
+        assert respuesta.status_code == 200, respuesta.text
+    return {"gerente_id": gerente_id, "proyecto_ids": proyecto_ids, "empleado_ids": empleado_ids}
+
+
+def _contar_sentencias(cliente, url: str, **kwargs):
+    sentencias = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        respuesta = cliente.get(url, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    return len(sentencias), respuesta
+
+
+def test_detalle_proyecto(cliente, datos):
+    cantidad, respuesta = _contar_sentencias(cliente, f"/proyecto/{datos['proyecto_ids'][0]}")
+    assert respuesta.status_code == 200, respuesta.text
+    assert len(respuesta.json()["empleados"]) == INTEGRANTES
+    assert respuesta.json()["gerente"]["id"] == datos["gerente_id"]
+    assert cantidad == SENTENCIAS_ETAG + 2
+
+
+def test_detalle_empleado(cliente, datos):
+    cantidad, respuesta = _contar_sentencias(cliente, f"/empleado/{datos['empleado_ids'][0]}")
+    assert respuesta.status_code == 200, respuesta.text
+    assert len(respuesta.json()["proyectos"]) == len(datos["proyecto_ids"])
+    assert cantidad == SENTENCIAS_ETAG + 2
+
+
+def test_proyectos_del_empleado(cliente, datos):
+    cantidad, respuesta = _contar_sentencias(cliente, f"/empleado/{datos['empleado_ids'][0]}/proyectos")
+    assert respuesta.status_code == 200, respuesta.text
+    assert cantidad == SENTENCIAS_ETAG + 3
+
+
+def test_detalle_no_modificado(cliente, datos):
+    url = f"/proyecto/{datos['proyecto_ids'][0]}"
+    etag = cliente.get(url).headers["etag"]
+    cantidad, respuesta = _contar_sentencias(cliente, url, headers={"If-None-Match": etag})
+    assert respuesta.status_code == 304
+    assert cantidad == SENTENCIAS_ETAG
@@ -0,0 +1,41 @@
+"""
+Índice en memoria de asignaciones (ver `app.grafo`).
+
+Uso:
+    python -m pytest tests
+"""
+
+from app.database import engine
+from app.grafo import indice_asignaciones, verificar
+
+
+def _crear_empleado(cliente, nombre: str) -> int:
+    respuesta = cliente.post("/empleado/", json={"nombre": nombre, "especialidad": "Backend", "salario": 1000,
+                                                 "estado": "Activo"})
+    assert respuesta.status_code == 201, respuesta.text
+    return respuesta.json()["id"]
+
+
+def _colaboradores(cliente, empleado_id: int) -> set[int]:
+    respuesta = cliente.get(f"/empleado/{empleado_id}/colaboradores")
+    assert respuesta.status_code == 200, respuesta.text
+    return {colaborador["id"] for colaborador in respuesta.json()["items"]}
+
+
+def test_indice_sigue_el_registro_de_cambios(cliente):
+    gerente_id, uno, dos, tres = (_crear_empleado(cliente, f"Grafo {letra}") for letra in "GABC")
+    respuesta = cliente.post("/proyecto/", json={"nombre": "Proyecto Grafo", "descripcion": "Proyecto de prueba",
+                                                 "presupuesto": 5000, "estado": "Activo", "gerente_id": gerente_id})
+    proyecto_id = respuesta.json()["id"]
+
+    cliente.post(f"/proyecto/{proyecto_id}/asignar/batch", json={"empleado_ids": [uno, dos, tres]})
+    assert _colaboradores(cliente, uno) == {dos, tres}
+
+    cliente.delete(f"/proyecto/{proyecto_id}/desasignar/{dos}")
+    assert _colaboradores(cliente, uno) == {tres}
+
+    cliente.delete(f"/empleado/{tres}")
+    assert _colaboradores(cliente, uno) == set()
+
+    with engine.connect() as conexion:
+        assert verificar(conexion, indice_asignaciones) == []
@@ -0,0 +1,76 @@
+"""
+Importación de CSV en streaming (ver `app.importacion`).
+
+Uso:
+    python -m pytest tests
+"""
+
+import csv
+import json
+
+from sqlalchemy.exc import IntegrityError
+
+from app import importacion
+
+ENCABEZADO = "nombre,especialidad,salario,estado\n"
+
+
+def _importar(cliente, cuerpo: str) -> list[dict]:
+    respuesta = cliente.post("/empleado/import", content=cuerpo.encode(), headers={"Content-Type": "text/csv"})
+    assert respuesta.status_code == 200, respuesta.text
+    eventos = [json.loads(linea) for linea in respuesta.text.splitlines()]
+    assert eventos and eventos[-1]["evento"] == "fin"
+    return eventos
+
+
+def _errores(eventos: list[dict]) -> list[tuple[int, int]]:
+    return [(evento["linea"], evento["codigo"]) for evento in eventos if evento["evento"] == "error"]
+
+
+def _existe(cliente, nombre: str) -> bool:
+    respuesta = cliente.get("/empleado/buscar", params={"q": nombre})
+    return any(empleado["nombre"] == nombre for empleado in respuesta.json()["items"])
+
+
+def test_valor_demasiado_largo(cliente):
+    largo = "x" * (csv.field_size_limit() + 1)
+    eventos = _importar(cliente, f'{ENCABEZADO}Antes Largo,Backend,100,Activo\n"{largo}",Backend,100,Activo\n'
+                                 "Despues Largo,Backend,100,Activo\n")
+    assert _errores(eventos) == [(3, 400)]
+    assert eventos[-1]["creadas"] == 1
+    assert _existe(cliente, "Antes Largo")
+    assert not _existe(cliente, "Despues Largo")
+
+
+def test_fila_mal_formada(cliente):
+    # Un retorno de carro dentro de un valor sin comillas no es CSV válido
+    eventos = _importar(cliente, f"{ENCABEZADO}Antes Retorno,Backend,100,Activo\nMal\rFormada,Backend,100,Activo\n")
+    assert _errores(eventos) == [(3, 400)]
+    assert _existe(cliente, "Antes Retorno")
+
+
+def test_linea_sin_fin(cliente):
+    # El cuerpo no se acumula en memoria esperando un salto de línea que no llega
+    eventos = _importar(cliente, ENCABEZADO + "x" * (importacion._limite_linea(4) + 1))
+    assert _errores(eventos) == [(2, 400)]
+    respuesta = cliente.post("/empleado/import", content=b"x" * (csv.field_size_limit() + 1))
+    assert respuesta.status_code == 400
+
+
+def test_conflicto_concurrente_conserva_errores(cliente, monkeypatch):
+    importar_lote = importacion.IMPORTADORES["empleados"]
+    llamadas = []
+
+    def chocar_una_vez(session, items):
+        llamadas.append(len(items))
+        resultado = importar_lote(session, items)
+        if len(llamadas) == 1:
+            raise IntegrityError("INSERT", {}, Exception("simulado"))
+        return resultado
+
+    monkeypatch.setitem(importacion.IMPORTADORES, "empleados", chocar_una_vez)
+    eventos = _importar(cliente, f"{ENCABEZADO}Primero Conflicto,Backend,100,Activo\nMal 1,Backend,100,Activo\n"
+                                 "Segundo Conflicto,Backend,100,Activo\n")
+    assert _errores(eventos) == [(3, 400)]
+    assert eventos[-1]["creadas"] == 2
+    assert _existe(cliente, "Primero Conflicto") and _existe(cliente, "Segundo Conflicto")